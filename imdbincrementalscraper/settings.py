@@ -41,9 +41,10 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
-    'django_q',
-
+    # Before django_q, its qcluster command is overridden to warm up the cluster before forking the workers
     'movie_scraper_app',
+
+    'django_q',
 ]
 
 MIDDLEWARE = [
@@ -82,10 +83,18 @@ WSGI_APPLICATION = 'imdbincrementalscraper.wsgi.application'
 DATABASES = {
     'default': env.db('DATABASE_URL', default='sqlite:///db.sqlite3')
 }
+# Applied on every new SQLite connection, see movie_scraper_app.db
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # Readers and the writer do not block each other
+    'synchronous': 'NORMAL',  # Durable in WAL mode, syncs on checkpoints only
+    'busy_timeout': 30000,  # Milliseconds to wait for the write lock instead of failing with "database is locked"
+    'temp_store': 'MEMORY',
+    'cache_size': -32000,  # 32 MB page cache per connection
+}
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'movie_scraper_app.renderers.FastJSONRenderer',
     ],
 }
 
@@ -134,6 +143,70 @@ FIRST_LOAD_MOVIE_SIZE = 10
 MOVIES_PAGE_SIZE = 250
 if MOVIES_PAGE_SIZE > 250:
     raise RuntimeError("IMDB maximum movie page size is 250. Set less than or equal to 250")
+# Async engine fetches the movie details of a batch concurrently from a single worker process
+ASYNC_SCRAPING = env.bool('ASYNC_SCRAPING', default=False)
+ASYNC_MAX_IN_FLIGHT = 100  # Maximum concurrent detail requests per batch with the async engine
+
+# Sharded scraping settings. Full scrapes of very large tags are split into release year shards scraped in parallel
+SHARDED_SCRAPING = True
+SHARDED_SCRAPING_MIN_MOVIES = 5000  # Tags with fewer movies use the "See more" chain
+SHARDED_SCRAPING_MAX_PAGES = 4  # Maximum pages per shard
+SHARDED_SCRAPING_MIN_COVERAGE = 0.98  # Fraction of Tag.movies_count the shards must cover
+
+# Movie write settings. Scrape workers hand movies over to a single writer which batches them into large transactions.
+# Requires the writer cluster, buffered movies are not saved without it
+COALESCE_MOVIE_WRITES = env.bool('COALESCE_MOVIE_WRITES', default=False)
+MOVIE_WRITE_QUEUE = 'movie_writes'  # Served by: python manage.py qcluster_queue movie_writes --workers 1
+MOVIE_WRITE_MAX_BATCHES = 50  # Pending writes coalesced per transaction
+
+# Keyword enrichment settings. Keywords pages are fetched after the movies are saved, in a low priority stage
+DEFER_KEYWORD_ENRICHMENT = True
+KEYWORD_ENRICHMENT_QUEUE = 'keyword_enrichment'  # Served by: python manage.py qcluster_queue keyword_enrichment
+KEYWORD_ENRICHMENT_BATCH_SIZE = 100  # Movies per enrichment task
+KEYWORD_ENRICHMENT_SWEEP_INTERVAL_MINUTES = 60  # How often the movies without keywords are queued again
+KEYWORD_ENRICHMENT_SWEEP_MAX_MOVIES = 5000  # Movies queued per sweep
+
+# Parse health settings. The first movies of every batch are checked, a batch whose parsed fields fall below the
+# expected coverage (IMDb markup change) is aborted along with the queued batches of its job, see ParseDriftReport
+PARSE_HEALTH_CHECK = True
+PARSE_HEALTH_SAMPLE_SIZE = 20  # Movies checked per batch, before the rest of the detail pages are fetched
+
+# API settings
+MAX_BATCH_DETAIL_IDS = 250  # Movies per batch detail request, /api/movies/?ids=1,2,3
+
+# Catalog export settings
+EXPORT_CHUNK_SIZE = 2000  # Movies fetched per query by the streaming export
+
+# Tag refresh scheduler settings
+TAG_REFRESH_INTERVAL_MINUTES = 15  # How often the refresh schedule runs
+TAG_REFRESH_REQUESTS_PER_HOUR = 4000  # IMDb request budget spent on refreshes per hour
+TAG_REFRESH_MAX_MOVIES_PER_TAG = 1000  # Top movies re-scraped per tag refresh
+TAG_REFRESH_MIN_STALENESS_HOURS = 24  # Tags scraped more recently than this are not refreshed
+TAG_REFRESH_MAX_STALENESS_HOURS = 24 * 30  # Staleness is capped, never scraped tags count as this old
+TAG_REFRESH_WEIGHTS = {
+    'requests': 1.0,  # Request frequency of the tag
+    'staleness': 1.0,  # Time since last scrape
+    'missing': 1.0,  # Tag.movies_count minus movies held
+}
+
+# Tag sync settings. Genres and keywords counts are synced periodically, only changed tags are written
+TAG_SYNC_INTERVAL_MINUTES = 5  # How often the tag sync schedule runs
+TAG_SYNC_EXPAND_KEYWORDS = False  # Expand "See more keywords" in the browser on scheduled syncs
+TAG_SYNC_REFRESH_GROWN_TAGS = True  # Refresh the tags whose movies count grew
+TAG_SYNC_REFRESH_REQUESTS = 500  # IMDb request budget spent on the refreshes of a sync
+TAG_SYNC_REFRESH_MIN_STALENESS_HOURS = 1  # Grown tags scraped more recently than this are not refreshed
+
+# Worker settings. Q clusters load the scraper backends before forking their workers, see movie_scraper_app.worker
+WORKER_WARM_UP = True
+WORKER_WARM_UP_BROWSER = env.bool('WORKER_WARM_UP_BROWSER', default=False)  # Also start a spare browser per worker
+
+# Profiling settings. Profiled tasks store a TaskProfile with cProfile statistics and collapsed stacks,
+# compared with: python manage.py diff_profiles <id> <id>
+PROFILE_TASKS = []  # Always profiled functions, e.g. ['scrape_batch_task', 'scrape_movies']
+PROFILE_TAGS = []  # Genres or keywords whose scrape tasks are profiled
+PROFILE_MODE = 'cprofile'  # cprofile (every call) or sample (stack sampling only, next to no overhead)
+PROFILE_SAMPLE_INTERVAL_MS = 5  # Interval of the stack samples
+PROFILE_MAX_STORED = 500  # Oldest profiles are removed above it
 
 # Django Q settings
 Q_CLUSTER = {
@@ -145,3 +218,8 @@ Q_CLUSTER = {
     'catch_up': False,  # Whether to execute missed tasks
     'orm': 'default',  # Using the Django ORM as the backend
 }
+
+# Processes sending IMDb requests through the egress pool: the Q workers and the web server. Every process keeps its
+# own egress state, the EGRESS_RATE_PER_SECOND and EGRESS_MAX_IN_FLIGHT of each egress are split between them.
+# Add the workers of the qcluster_queue clusters which scrape, e.g. keyword_enrichment
+EGRESS_PROCESSES = env.int('EGRESS_PROCESSES', default=Q_CLUSTER['workers'] + 1)
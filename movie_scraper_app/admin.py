@@ -1,6 +1,9 @@
 from django.contrib import admin
 
-from .models import Tag, Movies
+from .models import Tag, Movies, ParseDriftReport, ShardedScrape, TaskProfile
 
 admin.site.register(Tag)
 admin.site.register(Movies)
+admin.site.register(ParseDriftReport)
+admin.site.register(ShardedScrape)
+admin.site.register(TaskProfile)
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class MovieScraperAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movie_scraper_app'
+
+    def ready(self):
+        from django.conf import settings
+        from django_q.signals import pre_execute
+
+        from scraper_core.egress import set_egress_processes
+
+        from .db import apply_sqlite_pragmas
+        from .worker import remember_task, warm_up_worker
+        set_egress_processes(settings.EGRESS_PROCESSES)
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid="movie_scraper_app.apply_sqlite_pragmas")
+        pre_execute.connect(warm_up_worker, dispatch_uid="movie_scraper_app.warm_up_worker")
+        pre_execute.connect(remember_task, dispatch_uid="movie_scraper_app.remember_task")
@@ -0,0 +1,97 @@
+""" HTTP conditional requests of the movie API, validators computed from the version stamps of the write path. """
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import Movies, Tag
+
+
+def _etag(*parts):
+    """ Weak entity tag of the given parts, the representation is compressed or not by the web server. """
+    return 'W/"{}"'.format("-".join(str(part) for part in parts))
+
+
+def _timestamp(value):
+    """ Last-Modified timestamp, HTTP dates have a one second resolution. """
+    return int(value.timestamp()) if value else None
+
+
+def _stamp(value):
+    """ Microsecond stamp of an ETag, changes within the same second still change the ETag. """
+    return int(value.timestamp() * 1000000) if value else None
+
+
+def movie_validators(movie_id, representation: str = "json"):
+    """
+    Validators of a movie detail, from an indexed lookup of the movie and of its tags (the tag counts are part of
+    the detail).
+    Args:
+        movie_id (int): Id of the movie.
+        representation (str): Format of the response, e.g. json or api.
+    Returns:
+        tuple: ETag and Last-Modified timestamp, (None, None) when the movie does not exist.
+    """
+    row = (Movies.objects.filter(id=movie_id).annotate(tags_updated_at=Max("tags__updated_at"))
+           .values_list("version", "updated_at", "tags_updated_at").first())
+    if row is None:
+        return None, None
+    version, updated_at, tags_updated_at = row
+    last_modified = max(updated_at, tags_updated_at) if tags_updated_at else updated_at
+    return _etag("movie", movie_id, version, _stamp(tags_updated_at), representation), _timestamp(last_modified)
+
+
+def tag_listing_validators(tag_id, representation: str = "json"):
+    """
+    Validators of the movie listing of a tag.
+    Args:
+        tag_id (int): Id of the tag.
+        representation (str): Format of the response, e.g. json or api.
+    Returns:
+        tuple: ETag and Last-Modified timestamp, (None, None) when the tag does not exist.
+    """
+    row = Tag.objects.filter(id=tag_id).values_list("listing_version", "listing_updated_at").first()
+    if row is None:
+        return None, None
+    listing_version, listing_updated_at = row
+    return _etag("tag", tag_id, listing_version, representation), _timestamp(listing_updated_at)
+
+
+def catalog_validators(representation: str = "json"):
+    """
+    Validators of the unfiltered movie listing, from the indexed latest change, the latest movie id and the movies
+    count, which changes the ETag when movies are deleted. Deleted movies leave no change time, Last-Modified only
+    follows the updates, the ETag is the validator to rely on.
+    Args:
+        representation (str): Format of the response, e.g. json or api.
+    Returns:
+        tuple: ETag and Last-Modified timestamp.
+    """
+    latest = Movies.objects.aggregate(last_id=Max("id"), updated_at=Max("updated_at"), count=Count("id"))
+    return (_etag("movies", latest["last_id"], latest["count"], _stamp(latest["updated_at"]), representation),
+            _timestamp(latest["updated_at"]))
+
+
+def not_modified_response(request, etag, last_modified):
+    """
+    Answers If-None-Match and If-Modified-Since without building the response body.
+    Returns:
+        HttpResponse: 304 Not Modified with the validators, None when the response has to be built.
+    """
+    if etag is None and last_modified is None:
+        return None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Sets ETag and Last-Modified. Caches have to revalidate every time, the movies change during a scrape.
+    """
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -0,0 +1,14 @@
+""" Database connection setup. """
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Applies settings.SQLITE_PRAGMAS on every new SQLite connection, connected to the `connection_created` signal.
+    WAL mode lets the API and the Django Q broker read while the movie writer commits.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value};")
@@ -0,0 +1,129 @@
+""" Streaming export of the movie catalog as NDJSON, CSV, Parquet or Arrow with constant memory. """
+import csv
+import json
+
+from .models import Movies
+
+EXPORT_FIELDS = ["id", "imdb_id", "title", "year", "rating", "summary", "director", "cast", "tags"]
+EXPORT_FORMATS = ["ndjson", "csv", "parquet", "arrow"]
+STREAMING_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+CSV_LIST_SEPARATOR = "|"
+
+
+def iter_movie_chunks(chunk_size: int = 2000, tag_name: str = None):
+    """
+    Iterates the movies in id order with keyset pagination, no COUNT and no deep OFFSET queries.
+    Every chunk costs one query for the movie rows and one for their tag names.
+    Args:
+        chunk_size (int): Movies per chunk.
+        tag_name (str) (Optional): Only export the movies of this genre or keyword.
+    Returns:
+        generator: Lists of movie rows, dicts of EXPORT_FIELDS.
+    """
+    movies = Movies.objects.order_by("id")
+    if tag_name:
+        movies = movies.filter(tags__name=tag_name)
+    through = Movies.tags.through
+    last_id = 0
+    while True:
+        rows = list(movies.filter(id__gt=last_id).values(*EXPORT_FIELDS[:-1])[:chunk_size])
+        if not rows:
+            return
+        movie_ids = [row["id"] for row in rows]
+        tags = {}
+        for movie_id, name in (through.objects.filter(movies_id__in=movie_ids)
+                               .order_by("tag__name").values_list("movies_id", "tag__name")):
+            tags.setdefault(movie_id, []).append(name)
+        for row in rows:
+            row["tags"] = tags.get(row["id"], [])
+        yield rows
+        last_id = movie_ids[-1]
+
+
+def iter_movie_rows(chunk_size: int = 2000, tag_name: str = None):
+    """ Iterates the movie rows of `iter_movie_chunks` one by one. """
+    for rows in iter_movie_chunks(chunk_size, tag_name):
+        yield from rows
+
+
+def iter_ndjson(rows):
+    """ Encodes the movie rows as newline delimited JSON lines. """
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class _Echo:
+    """ File-like object handing back what the csv writer writes, for streaming. """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """ Encodes the movie rows as CSV lines with a header, list fields are joined with CSV_LIST_SEPARATOR. """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            CSV_LIST_SEPARATOR.join(value) if isinstance(value, list) else value
+            for value in (row[field] for field in EXPORT_FIELDS)
+        ])
+
+
+def stream_export(export_format: str, chunk_size: int = 2000, tag_name: str = None):
+    """
+    Streams the catalog in a text format.
+    Args:
+        export_format (str): One of STREAMING_FORMATS.
+        chunk_size (int): Movies fetched per query.
+        tag_name (str) (Optional): Only export the movies of this genre or keyword.
+    Returns:
+        generator: Encoded lines.
+    """
+    rows = iter_movie_rows(chunk_size, tag_name)
+    if export_format == "ndjson":
+        return iter_ndjson(rows)
+    if export_format == "csv":
+        return iter_csv(rows)
+    raise ValueError(f"Unsupported streaming export format: {export_format}. Use one of {list(STREAMING_FORMATS)}")
+
+
+def write_columnar_export(path: str, export_format: str, chunk_size: int = 2000, tag_name: str = None):
+    """
+    Writes the catalog as a Parquet or Arrow IPC file, one record batch per chunk. Requires pyarrow.
+    Args:
+        path (str): Output file path.
+        export_format (str): parquet or arrow.
+        chunk_size (int): Movies per record batch.
+        tag_name (str) (Optional): Only export the movies of this genre or keyword.
+    Returns:
+        int: Number of exported movies.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError(f"{export_format} export requires pyarrow, install it with: pip install pyarrow")
+
+    schema = pa.schema([
+        ("id", pa.int64()), ("imdb_id", pa.string()), ("title", pa.string()), ("year", pa.int32()),
+        ("rating", pa.float64()), ("summary", pa.string()), ("director", pa.list_(pa.string())),
+        ("cast", pa.list_(pa.string())), ("tags", pa.list_(pa.string())),
+    ])
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(path, schema)
+    elif export_format == "arrow":
+        writer = pa.ipc.new_file(path, schema)
+    else:
+        raise ValueError(f"Unsupported columnar export format: {export_format}. Use parquet or arrow")
+    exported = 0
+    try:
+        for rows in iter_movie_chunks(chunk_size, tag_name):
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            exported += len(rows)
+    finally:
+        writer.close()
+    return exported
@@ -0,0 +1,51 @@
+""" Django Management command for comparing two task profiles. """
+import os
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movie_scraper_app.models import TaskProfile
+from scraper_core.profiling import diff_stats, load_stats
+
+
+class Command(BaseCommand):
+    """
+    Django management command to compare the cProfile statistics of two profiled tasks, function by function.
+    Profiles are stored TaskProfile ids or files written by cProfile, e.g. a profile of the same task before a change.
+    """
+    help = 'Compares two task profiles function by function, the largest time changes first.'
+
+    def add_arguments(self, parser):
+        parser.add_argument("before", help="Reference TaskProfile id or cProfile file.")
+        parser.add_argument("after", help="Compared TaskProfile id or cProfile file.")
+        parser.add_argument("--sort", choices=["tottime", "cumtime"], default="tottime", help="Compared time.")
+        parser.add_argument("--limit", type=int, default=20, help="Number of functions.")
+
+    def handle(self, *args, **options):
+        before, after = self._load(options["before"]), self._load(options["after"])
+        rows = diff_stats(before, after, options["sort"], options["limit"])
+        self.stdout.write(f"\033[1;34m{'before':>10} {'after':>10} {'delta':>10} {'calls':>17}  function\033[0m")
+        for row in rows:
+            # ANSI Escape Codes for color codes, red for slower and green for faster functions
+            color = "\033[31m" if row["delta"] > 0 else "\033[32m"
+            calls = f"{row['before_calls']}->{row['after_calls']}"
+            self.stdout.write(f"{row['before']:>10.4f} {row['after']:>10.4f} {color}{row['delta']:>+10.4f}\033[0m "
+                              f"{calls:>17}  {row['function']}")
+        total_before, total_after = before.total_tt, after.total_tt
+        self.stdout.write(f"\033[1;32mTotal: {total_before:.4f}s -> {total_after:.4f}s "
+                          f"({total_after - total_before:+.4f}s)\033[0m")
+
+    @staticmethod
+    def _load(profile: str) -> pstats.Stats:
+        """ Loads the statistics of a TaskProfile id or of a cProfile file. """
+        if os.path.isfile(profile):
+            return pstats.Stats(profile)
+        if not profile.isdigit():
+            raise CommandError(f"{profile} is neither a profile id nor a cProfile file.")
+        task_profile = TaskProfile.objects.filter(id=int(profile)).first()
+        if task_profile is None:
+            raise CommandError(f"Profile {profile} does not exist.")
+        if task_profile.stats is None:
+            raise CommandError(f"Profile {profile} was recorded in {task_profile.mode} mode without cProfile "
+                               f"statistics, see its collapsed stacks instead.")
+        return load_stats(bytes(task_profile.stats))
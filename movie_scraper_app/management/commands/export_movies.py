@@ -0,0 +1,52 @@
+""" Django Management command for exporting the movie catalog. """
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from movie_scraper_app.exporter import EXPORT_FORMATS, STREAMING_FORMATS, stream_export, write_columnar_export
+
+
+class Command(BaseCommand):
+    """
+    Django management command to export the movie catalog as NDJSON, CSV, Parquet or Arrow.
+    Movies are read in keyset paginated chunks, memory stays constant whatever the catalog size.
+    """
+    help = 'Exports the movie catalog as NDJSON, CSV, Parquet or Arrow.'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", help="Export format.")
+        parser.add_argument("--output", default="-", help="Output file, '-' writes NDJSON or CSV to stdout.")
+        parser.add_argument("--tag", help="Only export the movies of this genre or keyword.")
+        parser.add_argument("--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE, help="Movies per query.")
+
+    def handle(self, *args, **options):
+        export_format, output = options["format"], options["output"]
+        try:
+            if export_format not in STREAMING_FORMATS:
+                if output == "-":
+                    raise CommandError(f"{export_format} export requires an --output file.")
+                exported = write_columnar_export(output, export_format, options["chunk_size"], options["tag"])
+            else:
+                lines_count = self._write_lines(output, stream_export(export_format, options["chunk_size"],
+                                                                      options["tag"]))
+                # CSV starts with a header line
+                exported = lines_count - 1 if export_format == "csv" else lines_count
+        except ValueError as e:
+            raise CommandError(str(e))
+        # ANSI Escape Codes for color codes. Status goes to stderr, stdout may carry the export itself.
+        self.stderr.write(f"\033[1;32mExported {exported} movies as {export_format}.\033[0m")
+
+    @staticmethod
+    def _write_lines(output: str, lines) -> int:
+        """ Writes the encoded lines to the output file or stdout, returns the number of lines. """
+        stream = sys.stdout if output == "-" else open(output, "w", encoding="utf-8", newline="")
+        lines_count = 0
+        try:
+            for line in lines:
+                stream.write(line)
+                lines_count += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        return lines_count
@@ -0,0 +1,15 @@
+""" Django Management command starting the Django Q cluster, with the scraper backends loaded before forking. """
+from django_q.management.commands.qcluster import Command as QClusterCommand
+
+from movie_scraper_app.worker import warm_up_cluster
+
+
+class Command(QClusterCommand):
+    """
+    Django Q qcluster command, loads the parser and the HTTP session in the cluster process first so that the
+    forked workers start with them, see movie_scraper_app.worker.
+    """
+
+    def handle(self, *args, **options):
+        warm_up_cluster()
+        super().handle(*args, **options)
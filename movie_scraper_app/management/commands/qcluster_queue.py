@@ -0,0 +1,36 @@
+""" Django Management command for running a Django Q cluster on a dedicated queue. """
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django_q.brokers import get_broker
+from django_q.cluster import Cluster
+from django_q.conf import Conf
+
+from movie_scraper_app.worker import warm_up_cluster
+
+
+class Command(BaseCommand):
+    """
+    Django management command to start a Django Q cluster serving a single named queue, e.g. the
+    low priority keyword enrichment queue, with its own number of workers.
+    """
+    help = 'Starts a Django Q cluster for the given queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument("queue", help="Name of the queue, e.g. settings.KEYWORD_ENRICHMENT_QUEUE.")
+        parser.add_argument("--workers", type=int, help="Number of workers, defaults to Q_CLUSTER workers.")
+        parser.add_argument("--warm-up-browser", action="store_true",
+                            help="Start a spare browser in every worker, for queues of search page scrapes.")
+
+    def handle(self, *args, **options):
+        if options["workers"]:
+            Conf.WORKERS = options["workers"]
+        # Schedules are run by the main qcluster only
+        Conf.SCHEDULER = False
+        # Keyword enrichment and movie writes never drive a browser, the forked workers inherit this setting
+        settings.WORKER_WARM_UP_BROWSER = options["warm_up_browser"]
+        warm_up_cluster()
+        # ANSI Escape Codes for color codes.
+        self.stdout.write(f"\033[1;34mStarting cluster for queue '{options['queue']}' "
+                          f"with {Conf.WORKERS} workers.\033[0m")
+        Cluster(get_broker(options["queue"])).start()
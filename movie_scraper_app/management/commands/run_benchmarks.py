@@ -0,0 +1,72 @@
+""" Django Management command for running the offline scraper benchmarks including the database writes. """
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from movie_scraper_app.models import Movies, Tag
+from scraper_core.benchmarks.runner import run_and_compare
+from scraper_core.benchmarks.suite import cold_peak_memory_kb, run_cold, suite
+from scraper_core.records import MovieRecord
+
+CREATE_OR_UPDATE_MOVIES = 500
+
+
+def _movie_records():
+    """ Movie records as produced by the movie scraper, linked to recorded genres and keywords. """
+    return [MovieRecord(
+        title=f" Benchmark Movie {position}",
+        imdb_id=f"tt{8000000 + position:07d}",
+        year=1990 + position % 30,
+        rating=round(5 + (position % 50) / 10, 1),
+        plot_summary="A banker convicted of uxoricide forms a friendship over a quarter century with a hardened "
+                     "convict, while maintaining his innocence and trying to remain hopeful.",
+        directors=["Frank Darabont"],
+        casts=["Tim Robbins", "Morgan Freeman", "Bob Gunton"],
+        genres=["Drama"],
+        keywords=["prison", "hope", "friendship between men"],
+        detail_fetched=True,
+    ) for position in range(CREATE_OR_UPDATE_MOVIES)]
+
+
+@suite.add("movies_create_or_update", items=CREATE_OR_UPDATE_MOVIES, setup=_movie_records)
+def bench_movies_create_or_update(movie_records):
+    # Every run writes into a rolled back transaction, the benchmark never leaves rows behind
+    with transaction.atomic():
+        for name in ("Drama", "prison", "hope", "friendship between men"):
+            Tag.objects.get_or_create(name=name)
+        Movies.create_or_update(movie_records, tag_name="Drama")
+        transaction.set_rollback(True)
+
+
+DJANGO_VIEWS_SCRIPT = "import django; django.setup(); import movie_scraper_app.views"
+DJANGO_VIEWS_ENV = {"DJANGO_SETTINGS_MODULE": "imdbincrementalscraper.settings"}
+
+
+@suite.add("cold_start_django_views", memory=lambda _: cold_peak_memory_kb(DJANGO_VIEWS_SCRIPT, DJANGO_VIEWS_ENV))
+def bench_cold_start_django_views(_):
+    # Paid by every web process and manage.py invocation, the API imports the scraper adapter
+    run_cold(DJANGO_VIEWS_SCRIPT, env=DJANGO_VIEWS_ENV)
+
+
+class Command(BaseCommand):
+    """
+    Django management command to run the offline benchmark suite, including Movies.create_or_update
+    against the configured database, and compare the results against the stored baseline.
+    """
+    help = 'Runs the offline scraper benchmarks and compares them against the stored baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark.")
+        parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative regression.")
+        parser.add_argument("--only", nargs="*", help="Names of the benchmarks to run.")
+        parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+
+    def handle(self, *args, **options):
+        # ANSI Escape Codes for color codes.
+        self.stdout.write("\033[1;34mRunning: Scraper benchmarks...\033[0m")
+        passed = run_and_compare(suite, repeat=options["repeat"], tolerance=options["tolerance"],
+                                 only=options["only"], update_baseline=options["update_baseline"],
+                                 write=self.stdout.write)
+        if not passed:
+            raise CommandError("Benchmark regressions found against the baseline.")
+        self.stdout.write("\033[1;32mBenchmarks completed.\033[0m")
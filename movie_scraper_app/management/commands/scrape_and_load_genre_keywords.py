@@ -12,11 +12,16 @@ class Command(BaseCommand):
     """
     help = 'Scrapes the Genre and Keywords from IMDb and loads them into the database.'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument("--no-expand-keywords", action="store_true",
+                            help="Only sync the keywords of the search page, no browser is started.")
+
+    def handle(self, *args, **options):
         # ANSI Escape Codes for color codes.
         self.stdout.write("\033[1;34mRunning: Scraping Genre & Keywords...\033[0m")
 
-        # Perform the scraping and updating
-        scrape_genre_and_keywords()
+        # Perform the scraping and updating, only tags whose count changed are written
+        summary = scrape_genre_and_keywords(expand_keywords=not options["no_expand_keywords"])
 
-        self.stdout.write("\033[1;32mSuccessfully scraped and loaded Genres & Keywords.\033[0m")
+        self.stdout.write(f"\033[1;32mSuccessfully scraped and loaded Genres & Keywords. New: {summary['new']}, "
+                          f"Updated: {summary['updated']}, Grown: {len(summary['grown'])}\033[0m")
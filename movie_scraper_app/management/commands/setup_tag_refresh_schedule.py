@@ -0,0 +1,47 @@
+""" Django Management command for registering the periodic tag refresh, tag sync and keyword sweep schedules. """
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django_q.models import Schedule
+
+
+class Command(BaseCommand):
+    """
+    Django management command to create or update the Django Q schedules which refresh
+    stale and popular tags, sync the genre and keyword counts and queue the missing keywords periodically.
+    """
+    help = 'Creates or updates the Django Q schedules for the periodic tag refresh, tag sync and keyword sweep.'
+
+    def handle(self, *args, **kwargs):
+        schedule, created = Schedule.objects.update_or_create(
+            name='tag-refresh',
+            defaults={
+                'func': 'movie_scraper_app.refresh_scheduler.schedule_tag_refreshes',
+                'schedule_type': Schedule.MINUTES,
+                'minutes': settings.TAG_REFRESH_INTERVAL_MINUTES,
+                'repeats': -1,
+            })
+        # ANSI Escape Codes for color codes.
+        self.stdout.write(f"\033[1;32m{'Created' if created else 'Updated'} tag refresh schedule. "
+                          f"Runs every {schedule.minutes} minutes.\033[0m")
+        schedule, created = Schedule.objects.update_or_create(
+            name='tag-sync',
+            defaults={
+                'func': 'movie_scraper_app.movie_scraper_adapter.scrape_genre_and_keywords',
+                'kwargs': f"expand_keywords={settings.TAG_SYNC_EXPAND_KEYWORDS}",
+                'schedule_type': Schedule.MINUTES,
+                'minutes': settings.TAG_SYNC_INTERVAL_MINUTES,
+                'repeats': -1,
+            })
+        self.stdout.write(f"\033[1;32m{'Created' if created else 'Updated'} tag sync schedule. "
+                          f"Runs every {schedule.minutes} minutes.\033[0m")
+        schedule, created = Schedule.objects.update_or_create(
+            name='keyword-enrichment-sweep',
+            defaults={
+                'func': 'movie_scraper_app.movie_scraper_adapter.sweep_keyword_enrichment',
+                'schedule_type': Schedule.MINUTES,
+                'minutes': settings.KEYWORD_ENRICHMENT_SWEEP_INTERVAL_MINUTES,
+                'repeats': -1,
+            })
+        self.stdout.write(f"\033[1;32m{'Created' if created else 'Updated'} keyword enrichment sweep schedule. "
+                          f"Runs every {schedule.minutes} minutes.\033[0m")
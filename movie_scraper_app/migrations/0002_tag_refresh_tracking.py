@@ -0,0 +1,26 @@
+# Generated by Django 4.2.18 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_scraper_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ScrapeStatus',
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='last_scraped_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Timestamp when movies of this tag were last scraped.', null=True),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='request_count',
+            field=models.IntegerField(default=0, help_text='Number of times movies were requested for this tag.'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-19 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_scraper_app', '0002_tag_refresh_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movies',
+            name='imdb_id',
+            field=models.CharField(blank=True, help_text='IMDb title id of the movie, e.g. tt0111161.', max_length=20, null=True, unique=True),
+        ),
+    ]
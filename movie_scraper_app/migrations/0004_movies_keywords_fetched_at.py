@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-19 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_scraper_app', '0003_movies_imdb_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movies',
+            name='keywords_fetched_at',
+            field=models.DateTimeField(blank=True, help_text='Timestamp when the keywords of the movie were linked.', null=True),
+        ),
+    ]
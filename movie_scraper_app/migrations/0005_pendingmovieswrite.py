@@ -0,0 +1,22 @@
+# Generated by Django 4.2.18 on 2026-10-19 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_scraper_app', '0004_movies_keywords_fetched_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingMoviesWrite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag_name', models.CharField(blank=True, help_text='Genre or keyword the movies were scraped for.', max_length=255, null=True)),
+                ('movies_data', models.JSONField(help_text='Scraped movie data, as passed to Movies.create_or_update.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the movies were handed over.')),
+            ],
+        ),
+    ]
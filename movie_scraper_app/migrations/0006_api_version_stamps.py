@@ -0,0 +1,34 @@
+# Generated by Django 4.2.18 on 2026-10-19 03:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_scraper_app', '0005_pendingmovieswrite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movies',
+            name='updated_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='Timestamp when the movie was last changed.'),
+        ),
+        migrations.AddField(
+            model_name='movies',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Incremented whenever the API representation of the movie changes.'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='listing_updated_at',
+            field=models.DateTimeField(blank=True, help_text='Timestamp when the movies listed for this tag last changed.', null=True),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='listing_version',
+            field=models.PositiveIntegerField(default=0, help_text='Incremented whenever the movies listed for this tag change.'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.18 on 2026-10-19 03:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_scraper_app', '0006_api_version_stamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParseDriftReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(db_index=True, help_text='Scrape job of the aborted batch, its queued batches are skipped.', max_length=32)),
+                ('tag_name', models.CharField(blank=True, help_text='Genre or keyword the movies were scraped for.', max_length=255, null=True)),
+                ('stage', models.CharField(help_text='Checked fields, list (search page) or detail (movie page).', max_length=10)),
+                ('failing_fields', models.JSONField(help_text='Fields below their expected coverage.')),
+                ('report', models.JSONField(help_text='Coverage and expected coverage per field, and failing sampled movies.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the batch was aborted.')),
+            ],
+        ),
+    ]
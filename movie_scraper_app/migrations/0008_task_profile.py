@@ -0,0 +1,28 @@
+# Generated by Django 4.2.18 on 2026-10-19 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_scraper_app', '0007_parse_drift_report'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(db_index=True, help_text='Profiled function, e.g. scrape_batch_task.', max_length=100)),
+                ('task_id', models.CharField(blank=True, db_index=True, help_text='Django Q task id, None when not run by a Q worker.', max_length=32, null=True)),
+                ('tag_name', models.CharField(blank=True, help_text='Genre or keyword the movies were scraped for.', max_length=255, null=True)),
+                ('mode', models.CharField(help_text='cprofile or sample.', max_length=10)),
+                ('wall_seconds', models.FloatField(help_text='Wall clock time of the task.')),
+                ('stats', models.BinaryField(blank=True, help_text='Marshalled cProfile statistics, cprofile mode only.', null=True)),
+                ('collapsed_stacks', models.TextField(blank=True, help_text='Sampled call stacks in the collapsed stack format.')),
+                ('top_functions', models.JSONField(help_text='Functions with the most own time.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the task finished.')),
+            ],
+        ),
+    ]
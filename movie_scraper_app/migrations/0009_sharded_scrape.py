@@ -0,0 +1,29 @@
+# Generated by Django 4.2.18 on 2026-10-19 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie_scraper_app', '0008_task_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShardedScrape',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group', models.CharField(help_text='Django Q group of the shard tasks.', max_length=64, unique=True)),
+                ('tag_name', models.CharField(help_text='Genre or keyword scraped through the shards.', max_length=255)),
+                ('tasks_count', models.PositiveIntegerField(help_text='Number of shard tasks.')),
+                ('pending_tasks', models.PositiveIntegerField(help_text='Shard tasks not finished yet.')),
+                ('failed_tasks', models.PositiveIntegerField(default=0, help_text='Shard tasks which failed.')),
+                ('movies_count', models.IntegerField(blank=True, help_text='Tag.movies_count when checked.', null=True)),
+                ('held_movies', models.IntegerField(blank=True, help_text='Movies held for the tag when checked.', null=True)),
+                ('complete', models.BooleanField(blank=True, help_text='True if the held movies cover the tag, None until checked.', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the shard tasks were queued.')),
+                ('checked_at', models.DateTimeField(blank=True, help_text='Timestamp when the coverage was checked.', null=True)),
+            ],
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from scraper_core.records import MovieRecord
 
 
 class Tag(models.Model):
@@ -6,8 +10,15 @@ class Tag(models.Model):
     name = models.CharField(max_length=255, unique=True, db_index=True, help_text="Name of the tag (genre or keyword).")
     movies_count = models.IntegerField(default=0, help_text="Number of movies associated with this tag.")
     is_genre = models.BooleanField(default=True, help_text="True if the tag represents a genre, False for a keyword.")
+    request_count = models.IntegerField(default=0, help_text="Number of times movies were requested for this tag.")
+    last_scraped_at = models.DateTimeField(null=True, blank=True, db_index=True,
+                                           help_text="Timestamp when movies of this tag were last scraped.")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the tag was created.")
     updated_at = models.DateTimeField(auto_now=True, help_text="Timestamp when the tag was last updated.")
+    listing_version = models.PositiveIntegerField(
+        default=0, help_text="Incremented whenever the movies listed for this tag change.")
+    listing_updated_at = models.DateTimeField(null=True, blank=True,
+                                              help_text="Timestamp when the movies listed for this tag last changed.")
 
     def __str__(self):
         """ String representation. """
@@ -27,60 +38,425 @@ class Tag(models.Model):
         tag, created = cls.objects.update_or_create(name=name, defaults={"movies_count": count, "is_genre": is_genre})
         return tag
 
+    @classmethod
+    def bump_listing_versions(cls, tag_ids=(), movie_ids=(), now=None):
+        """
+        Stamps the listings of the given tags and of the tags of the given movies as changed, with a single update.
+        Args:
+            tag_ids (iterable): Tags whose listed movies changed, e.g. newly linked movies.
+            movie_ids (iterable): Movies whose list level fields changed, all their tags are stamped.
+            now (datetime) (Optional): Stamp time, defaults to current time.
+        """
+        tag_ids, movie_ids = list(tag_ids), list(movie_ids)
+        if not tag_ids and not movie_ids:
+            return
+        movie_tag_ids = Movies.tags.through.objects.filter(movies_id__in=movie_ids).values("tag_id")
+        cls.objects.filter(Q(id__in=tag_ids) | Q(id__in=movie_tag_ids)).update(
+            listing_version=F("listing_version") + 1, listing_updated_at=now or timezone.now())
+
+    @classmethod
+    def get_known_counts(cls):
+        """
+        Movies counts of all tags, the reference of the count delta detection of the tag sync.
+        Returns:
+            dict: Tag name to the movies count.
+        """
+        return dict(cls.objects.values_list("name", "movies_count"))
+
+    @classmethod
+    def sync_counts(cls, tags, is_genre):
+        """
+        Creates the new tags and updates the movies count of the changed ones in bulk.
+        Args:
+            tags (list): Changed genres or keywords, dictionaries with name and count.
+            is_genre (bool): True if genres, false if keywords
+        Returns:
+            list: A list of tuples (name, previous count, count) of the updated tags, new tags are not included.
+        """
+        counts = {tag["name"]: tag["count"] for tag in tags}
+        now = timezone.now()
+        existing_tags = list(cls.objects.filter(name__in=counts.keys()))
+        updated = []
+        for tag in existing_tags:
+            updated.append((tag.name, tag.movies_count, counts[tag.name]))
+            tag.movies_count = counts[tag.name]
+            tag.is_genre = is_genre
+            tag.updated_at = now  # Not set by bulk_update
+        existing_names = {tag.name for tag in existing_tags}
+        with transaction.atomic():
+            cls.objects.bulk_update(existing_tags, ["movies_count", "is_genre", "updated_at"])
+            cls.objects.bulk_create([cls(name=name, movies_count=count, is_genre=is_genre)
+                                     for name, count in counts.items() if name not in existing_names])
+        return updated
+
+    @classmethod
+    def record_request(cls, tag_id):
+        """
+        Increments the request counter of a tag, used by the refresh scheduler to rank popular tags.
+        Args:
+            tag_id (int): Id of the requested tag.
+        """
+        cls.objects.filter(id=tag_id).update(request_count=F("request_count") + 1)
+
+    @classmethod
+    def mark_scraped(cls, name):
+        """
+        Stamps the last scraped time of a tag.
+        Args:
+            name (str): Name of the scraped genre or keyword.
+        """
+        cls.objects.filter(name=name).update(last_scraped_at=timezone.now())
+
+
+# Fields of the movie listings, changes to them bump the listing versions of the tags of the movie
+MOVIE_LISTING_FIELDS = ("title", "rating", "year", "summary")
+
 
 class Movies(models.Model):
     """ Represents a movie and its related information, including genres, keywords, and details. """
     title = models.CharField(max_length=255, unique=True, db_index=True, help_text="The title of the movie.")
+    imdb_id = models.CharField(max_length=20, unique=True, null=True, blank=True,
+                               help_text="IMDb title id of the movie, e.g. tt0111161.")
     director = models.JSONField(help_text="JSON field storing director details.")
     cast = models.JSONField(help_text="JSON field storing cast details.")
     rating = models.FloatField(help_text="The movie's rating.")
     year = models.IntegerField(help_text="The year the movie was released.")
     summary = models.TextField(help_text="Plot summary or description of the movie.")
+    keywords_fetched_at = models.DateTimeField(null=True, blank=True,
+                                               help_text="Timestamp when the keywords of the movie were linked.")
     tags = models.ManyToManyField(Tag, related_name='movies',
                                   help_text="Genres and keywords associated with the movie.")
+    version = models.PositiveIntegerField(default=1,
+                                          help_text="Incremented whenever the API representation of the movie changes.")
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True,
+                                      help_text="Timestamp when the movie was last changed.")
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """ Saves the movie, edits of an existing movie (e.g. from the admin) bump its version. """
+        if not self._state.adding:
+            self.version += 1
+            self.updated_at = timezone.now()
+        super().save(*args, **kwargs)
+
+    def _apply_changes(self, values):
+        """
+        Sets the field values, compared as stored so that e.g. a scraped rating "8.0" equals 8.0.
+        Args:
+            values (dict): Field name to the new value.
+        Returns:
+            list: Names of the fields whose value changed.
+        """
+        changed_fields = []
+        for name, value in values.items():
+            value = self._meta.get_field(name).to_python(value)
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed_fields.append(name)
+        return changed_fields
+
     @classmethod
-    def create_or_update(cls, movies_data):
+    def find_known_imdb_ids(cls, movie_records):
+        """
+        Finds the movies of a scraped search list which already exist, matched by imdb id or title.
+        Used by the scrapers to skip the detail pages of known movies with a single query.
+        Args:
+            movie_records (list of MovieRecord): List level movie records with imdb_id and title.
+        Returns:
+            set: imdb ids of the scraped movies which already exist.
+        """
+        imdb_ids = [movie_record.imdb_id for movie_record in movie_records if movie_record.imdb_id]
+        titles = [movie_record.title for movie_record in movie_records]
+        known = cls.objects.filter(Q(imdb_id__in=imdb_ids) | Q(title__in=titles)).values_list("imdb_id", "title")
+        known_imdb_ids = {imdb_id for imdb_id, _ in known if imdb_id}
+        known_titles = {title for _, title in known}
+        return {
+            movie_record.imdb_id for movie_record in movie_records
+            if movie_record.imdb_id and (movie_record.imdb_id in known_imdb_ids or movie_record.title in known_titles)
+        }
+
+    @classmethod
+    def create_or_update(cls, movie_records, tag_name=None):
         """
         create or update movies.
+        Movies scraped without details (already known) only get their list level fields refreshed.
+        Only movies whose values changed are written, their version and the listing versions of their tags are
+        bumped so that the API keeps answering 304 Not Modified for everything else.
         Args:
-            movies_data (list of dict): A list of dictionaries containing movie details.
+            movie_records (list of MovieRecord): Scraped movie records.
+            tag_name (str) (Optional): Genre or keyword the movies were scraped for, linked to all the movies.
         Returns:
             list: A list of movie objects created or updated.
         """
-        # Extract titles to check for existing movies
-        titles = [movie_data["title"] for movie_data in movies_data]
+        # Last occurrence wins if a title is listed twice
+        movie_records = list({movie_record.title: movie_record for movie_record in movie_records}.values())
+        titles = [movie_record.title for movie_record in movie_records]
+        imdb_ids = [movie_record.imdb_id for movie_record in movie_records if movie_record.imdb_id]
         # Get the existing movies to perform updates on
-        existing_movies = cls.objects.filter(title__in=titles)
-        existing_movies_dict = {movie.title: movie for movie in existing_movies}
+        existing_movies = cls.objects.filter(Q(title__in=titles) | Q(imdb_id__in=imdb_ids))
+        existing_by_title = {movie.title: movie for movie in existing_movies}
+        existing_by_imdb_id = {movie.imdb_id: movie for movie in existing_movies if movie.imdb_id}
 
-        movies_to_update = []
-        for movie_data in movies_data:
+        now = timezone.now()
+        movies_to_update, movies_to_create, changed_movies = [], [], []
+        relisted_movie_ids = []
+        movie_tag_names = {}
+        for movie_record in movie_records:
             # Check if the movie already exists
-            existing_movie = existing_movies_dict.get(movie_data["title"])
+            existing_movie = (existing_by_imdb_id.get(movie_record.imdb_id)
+                              or existing_by_title.get(movie_record.title))
             if existing_movie:
-                # Update existing movie
-                existing_movie.director = movie_data["directors"]
-                existing_movie.cast = movie_data["casts"]
-                existing_movie.rating = movie_data["rating"]
-                existing_movie.year = movie_data["year"]
-                existing_movie.summary = movie_data["plot_summary"]
+                # Update list level fields of the existing movie, details only when they were fetched
+                values = {"rating": movie_record.rating, "year": movie_record.year,
+                          "summary": movie_record.plot_summary,
+                          "imdb_id": existing_movie.imdb_id or movie_record.imdb_id}
+                if movie_record.detail_fetched:
+                    values.update({"director": movie_record.directors, "cast": movie_record.casts})
+                if movie_record.keywords_fetched:
+                    values["keywords_fetched_at"] = now
+                changed_fields = existing_movie._apply_changes(values)
+                if changed_fields:
+                    existing_movie.version += 1
+                    existing_movie.updated_at = now
+                    changed_movies.append(existing_movie)
+                    if not set(changed_fields).isdisjoint(MOVIE_LISTING_FIELDS):
+                        relisted_movie_ids.append(existing_movie.id)
                 movies_to_update.append(existing_movie)
-            else:
+                movie = existing_movie
+            elif movie_record.detail_fetched:
                 # Create new movie
                 movie = cls(
-                    title=movie_data["title"],
-                    director=movie_data["directors"],
-                    cast=movie_data["casts"],
-                    rating=movie_data["rating"],
-                    year=movie_data["year"],
-                    summary=movie_data["plot_summary"])
-                movie.save()
-                tags = Tag.objects.filter(
-                    name__in=[tag_name for tag_name in movie_data["genres"] + movie_data["keywords"]])
-                movie.tags.set(list(tags.values_list('id', flat=True)))
+                    title=movie_record.title,
+                    imdb_id=movie_record.imdb_id,
+                    director=movie_record.directors,
+                    cast=movie_record.casts,
+                    rating=movie_record.rating,
+                    year=movie_record.year,
+                    summary=movie_record.plot_summary,
+                    keywords_fetched_at=now if movie_record.keywords_fetched else None,
+                    updated_at=now)
+                movies_to_create.append(movie)
+            else:
+                # Neither known nor detailed, e.g. a movie without a movie page link
+                continue
+            tag_names = set(movie_record.genres).union(movie_record.keywords)
+            if tag_name:
+                tag_names.add(tag_name)
+            movie_tag_names[movie.title] = tag_names
 
+        with transaction.atomic():
+            cls.objects.bulk_update(changed_movies, ["rating", "year", "summary", "imdb_id", "director", "cast",
+                                                     "keywords_fetched_at", "version", "updated_at"])
+            cls.objects.bulk_create(movies_to_create)
+            cls.link_tags(movie_tag_names, now, new_titles={movie.title for movie in movies_to_create})
+            Tag.bump_listing_versions(movie_ids=relisted_movie_ids, now=now)
         print("Movies create and update is completed")
+        return movies_to_update + movies_to_create
+
+    @classmethod
+    def link_tags(cls, movie_tag_names, now=None, new_titles=()):
+        """
+        Links tags to movies in bulk, existing links are kept.
+        The movies and the tag listings which got new links have their versions bumped.
+        Args:
+            movie_tag_names (dict): Movie title to the set of tag names to be linked.
+            now (datetime) (Optional): Stamp time, defaults to current time.
+            new_titles (set) (Optional): Movies created by the same write, they have no links yet and their
+                version stamps are fresh.
+        """
+        all_tag_names = set().union(*movie_tag_names.values()) if movie_tag_names else set()
+        tag_ids = dict(Tag.objects.filter(name__in=all_tag_names).values_list("name", "id"))
+        movie_ids = dict(cls.objects.filter(title__in=movie_tag_names.keys()).values_list("title", "id"))
+        through = cls.tags.through
+        known_movie_ids = [movie_id for title, movie_id in movie_ids.items() if title not in new_titles]
+        existing_links = set(through.objects.filter(movies_id__in=known_movie_ids)
+                             .values_list("movies_id", "tag_id")) if known_movie_ids else set()
+        links = [
+            through(movies_id=movie_ids[title], tag_id=tag_ids[name])
+            for title, tag_names in movie_tag_names.items() if title in movie_ids
+            for name in tag_names if name in tag_ids and (movie_ids[title], tag_ids[name]) not in existing_links
+        ]
+        if not links:
+            return
+        now = now or timezone.now()
+        through.objects.bulk_create(links, ignore_conflicts=True)
+        relinked_movie_ids = {link.movies_id for link in links}.intersection(known_movie_ids)
+        if relinked_movie_ids:
+            cls.objects.filter(id__in=relinked_movie_ids).update(version=F("version") + 1, updated_at=now)
+        Tag.bump_listing_versions(tag_ids={link.tag_id for link in links}, now=now)
+
+    @classmethod
+    def link_keywords(cls, keywords_by_imdb_id):
+        """
+        Links the keyword tags of the deferred enrichment stage and stamps the movies as enriched.
+        Args:
+            keywords_by_imdb_id (dict): imdb id to the list of keywords of the movie.
+        """
+        titles = dict(cls.objects.filter(imdb_id__in=keywords_by_imdb_id.keys()).values_list("imdb_id", "title"))
+        now = timezone.now()
+        with transaction.atomic():
+            cls.link_tags({
+                titles[imdb_id]: set(keywords) for imdb_id, keywords in keywords_by_imdb_id.items() if imdb_id in titles
+            }, now)
+            cls.objects.filter(imdb_id__in=titles.keys()).update(keywords_fetched_at=now, version=F("version") + 1,
+                                                                 updated_at=now)
+
+
+class ShardedScrape(models.Model):
+    """
+    Sharded scrape of a large tag. Counts the finished shard tasks of its Django Q group, whose task results are
+    pruned above Q_CLUSTER save_limit, and stores the coverage of the tag once they are all done.
+    """
+    group = models.CharField(max_length=64, unique=True, help_text="Django Q group of the shard tasks.")
+    tag_name = models.CharField(max_length=255, help_text="Genre or keyword scraped through the shards.")
+    tasks_count = models.PositiveIntegerField(help_text="Number of shard tasks.")
+    pending_tasks = models.PositiveIntegerField(help_text="Shard tasks not finished yet.")
+    failed_tasks = models.PositiveIntegerField(default=0, help_text="Shard tasks which failed.")
+    movies_count = models.IntegerField(null=True, blank=True, help_text="Tag.movies_count when checked.")
+    held_movies = models.IntegerField(null=True, blank=True, help_text="Movies held for the tag when checked.")
+    complete = models.BooleanField(null=True, blank=True,
+                                   help_text="True if the held movies cover the tag, None until checked.")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the shard tasks were queued.")
+    checked_at = models.DateTimeField(null=True, blank=True, help_text="Timestamp when the coverage was checked.")
+
+    def __str__(self):
+        return f"{self.tag_name} | {self.tasks_count - self.pending_tasks}/{self.tasks_count} | {self.complete}"
+
+    @classmethod
+    def task_done(cls, group, success=True):
+        """
+        Counts a finished shard task.
+        Args:
+            group (str): Django Q group of the task.
+            success (bool): False if the task failed.
+        Returns:
+            ShardedScrape: The sharded scrape of the group, None for unknown groups.
+        """
+        cls.objects.filter(group=group, pending_tasks__gt=0).update(
+            pending_tasks=F("pending_tasks") - 1, failed_tasks=F("failed_tasks") + (0 if success else 1))
+        return cls.objects.filter(group=group).first()
+
+    def check_coverage(self, min_coverage):
+        """
+        Stores the coverage of the tag by its held movies. Checked once, by the first caller after the last task.
+        Args:
+            min_coverage (float): Fraction of Tag.movies_count the held movies must cover.
+        Returns:
+            bool: True if this call checked the coverage, False if pending or already checked.
+        """
+        if self.pending_tasks or not type(self).objects.filter(
+                id=self.id, checked_at__isnull=True).update(checked_at=timezone.now()):
+            return False
+        tag = Tag.objects.get(name=self.tag_name)
+        self.movies_count, self.held_movies = tag.movies_count, tag.movies.count()
+        self.complete = self.held_movies >= self.movies_count * min_coverage
+        self.save(update_fields=["movies_count", "held_movies", "complete"])
+        return True
+
+
+class PendingMoviesWrite(models.Model):
+    """ Scraped movies handed over by the scrape workers, written in batches by the single movie writer. """
+    tag_name = models.CharField(max_length=255, null=True, blank=True,
+                                help_text="Genre or keyword the movies were scraped for.")
+    movies_data = models.JSONField(help_text="Scraped movie data, as passed to Movies.create_or_update.")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the movies were handed over.")
+
+    def __str__(self):
+        return f"{self.tag_name} | {len(self.movies_data)} movies"
+
+    @classmethod
+    def flush(cls, max_writes=50):
+        """
+        Writes the oldest pending movies with a single transaction and removes them from the buffer.
+        Args:
+            max_writes (int): Maximum number of pending writes coalesced into the transaction.
+        Returns:
+            list: Movie records of the flushed writes.
+        """
+        pending = list(cls.objects.order_by("id")[:max_writes])
+        if not pending:
+            return []
+        records_by_tag = {}
+        for pending_write in pending:
+            records_by_tag.setdefault(pending_write.tag_name, []).extend(
+                MovieRecord.from_dict(movie_data) for movie_data in pending_write.movies_data)
+        with transaction.atomic():
+            for tag_name, movie_records in records_by_tag.items():
+                Movies.create_or_update(movie_records, tag_name=tag_name)
+            cls.objects.filter(id__in=[pending_write.id for pending_write in pending]).delete()
+        return [movie_record for movie_records in records_by_tag.values() for movie_record in movie_records]
+
+
+class ParseDriftReport(models.Model):
+    """ Drift report of a scrape job aborted by the parse health check, e.g. after an IMDb markup change. """
+    job_id = models.CharField(max_length=32, db_index=True,
+                              help_text="Scrape job of the aborted batch, its queued batches are skipped.")
+    tag_name = models.CharField(max_length=255, null=True, blank=True,
+                                help_text="Genre or keyword the movies were scraped for.")
+    stage = models.CharField(max_length=10, help_text="Checked fields, list (search page) or detail (movie page).")
+    failing_fields = models.JSONField(help_text="Fields below their expected coverage.")
+    report = models.JSONField(help_text="Coverage and expected coverage per field, and failing sampled movies.")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the batch was aborted.")
+
+    def __str__(self):
+        return f"{self.tag_name} | {self.stage} | {', '.join(self.failing_fields)}"
+
+    @classmethod
+    def record(cls, report, job_id, tag_name=None):
+        """
+        Stores the drift report of an aborted batch.
+        Args:
+            report (dict): Drift report of the ParseHealthError.
+            job_id (str): Scrape job of the batch.
+            tag_name (str) (Optional): Genre or keyword of the batch.
+        Returns:
+            ParseDriftReport: The stored report.
+        """
+        return cls.objects.create(job_id=job_id, tag_name=tag_name, stage=report["stage"],
+                                  failing_fields=report["failing_fields"], report=report)
+
+    @classmethod
+    def is_aborted(cls, job_id):
+        """ True if a batch of the scrape job was aborted by the parse health check. """
+        return bool(job_id) and cls.objects.filter(job_id=job_id).exists()
+
+
+class TaskProfile(models.Model):
+    """ Profile of a scrape task run with profiling enabled, see movie_scraper_app.profiling. """
+    task_name = models.CharField(max_length=100, db_index=True, help_text="Profiled function, e.g. scrape_batch_task.")
+    task_id = models.CharField(max_length=32, null=True, blank=True, db_index=True,
+                               help_text="Django Q task id, None when not run by a Q worker.")
+    tag_name = models.CharField(max_length=255, null=True, blank=True,
+                                help_text="Genre or keyword the movies were scraped for.")
+    mode = models.CharField(max_length=10, help_text="cprofile or sample.")
+    wall_seconds = models.FloatField(help_text="Wall clock time of the task.")
+    stats = models.BinaryField(null=True, blank=True, help_text="Marshalled cProfile statistics, cprofile mode only.")
+    collapsed_stacks = models.TextField(blank=True, help_text="Sampled call stacks in the collapsed stack format.")
+    top_functions = models.JSONField(help_text="Functions with the most own time.")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the task finished.")
+
+    def __str__(self):
+        return f"{self.task_name} | {self.tag_name} | {self.wall_seconds:.2f}s"
+
+    @classmethod
+    def store(cls, profiler, task_name, task_id=None, tag_name=None, max_stored=500):
+        """
+        Stores the profile of a task and removes the oldest profiles above `max_stored`.
+        Args:
+            profiler (TaskProfiler): Profiler of the finished task.
+            task_name (str): Profiled function.
+            task_id (str) (Optional): Django Q task id.
+            tag_name (str) (Optional): Genre or keyword of the task.
+            max_stored (int): Maximum number of stored profiles.
+        Returns:
+            TaskProfile: The stored profile.
+        """
+        task_profile = cls.objects.create(
+            task_name=task_name, task_id=task_id, tag_name=tag_name, mode=profiler.mode,
+            wall_seconds=profiler.wall_seconds, stats=profiler.stats_data,
+            collapsed_stacks=profiler.sampler.collapsed(), top_functions=profiler.top_functions())
+        stale_ids = cls.objects.order_by("-id").values_list("id", flat=True)[max_stored:]
+        cls.objects.filter(id__in=list(stale_ids)).delete()
+        return task_profile
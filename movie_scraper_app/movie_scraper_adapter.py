@@ -1,23 +1,44 @@
+import asyncio
+import uuid
+from contextlib import contextmanager
+
+from django_q.brokers import get_broker
 from django_q.tasks import async_task
 from django.conf import settings
 
-from scraper_core.incremental_movie_scraper import IncrementalMovieScraper
+from scraper_core.async_movie_scraper import async_batch_scrape, async_scrape_keywords
+from scraper_core.incremental_movie_scraper import IncrementalMovieScraper, MovieKeywordScraper
 from scraper_core.genre_keywords_scraper import GenreKeywordScraper
+from scraper_core.metrics import metrics
+from scraper_core.parse_health import ParseHealthError, ParseHealthSampler
+from scraper_core.query_shard_planner import QueryShardPlanner, compute_shard_batches, shard_coverage
 
-from movie_scraper_app.models import Movies, Tag
+from movie_scraper_app.models import Movies, ParseDriftReport, PendingMoviesWrite, ShardedScrape, Tag
+from movie_scraper_app.profiling import profiled
 
 
+@profiled
 def scrape_movies(movies_count: int, genre: str = None, keyword: str = None):
     """
     Scrape first batch of movie data and return first cut data to a user and rest of all data
     fetch and update in background asynchronously.
+    A first batch failing the parse health check raises ParseHealthError, no background batch is queued then.
     """
     movie_page_size = settings.MOVIES_PAGE_SIZE
     first_load_movie_size = settings.FIRST_LOAD_MOVIE_SIZE
-    inc_scraper = IncrementalMovieScraper(movies_count, genre, keyword, movie_page_size)
-    initial_movies_data = inc_scraper.scrape_first_batch_data(first_load_movie_size)
+    fetch_keywords = not settings.DEFER_KEYWORD_ENRICHMENT
+    # Batches of the job are skipped once one of them is aborted by the parse health check
+    job_id = uuid.uuid4().hex
+    inc_scraper = IncrementalMovieScraper(movies_count, genre, keyword, movie_page_size, fetch_keywords,
+                                          parse_health=build_parse_health())
+    with record_parse_drift(job_id, genre or keyword):
+        initial_movie_records = inc_scraper.scrape_first_batch_data(first_load_movie_size,
+                                                                    Movies.find_known_imdb_ids)
     # Insert first batch of movies into the database
-    Movies.create_or_update(initial_movies_data)
+    with metrics.timer("create_or_update"):
+        Movies.create_or_update(initial_movie_records, tag_name=genre or keyword)
+    Tag.mark_scraped(genre or keyword)
+    queue_keyword_enrichment(initial_movie_records)
 
     # Compute clicks and parse count required for rest of the movies
     first_load_left_movies = min(movie_page_size, movies_count) - first_load_movie_size
@@ -25,35 +46,324 @@ def scrape_movies(movies_count: int, genre: str = None, keyword: str = None):
         first_load_left_movies, settings.MAX_CLICKS_PER_REQUEST)
     print(f"Clicks and Parse Count: {clicks_and_parse_count}")
 
-    # Submit each iteration as a task to Django Q for parallel execution
+    # Very large tags are scraped through release year shards instead of one deep "See more" chain
+    if use_sharded_scraping(movies_count, genre or keyword):
+        task_id = async_task('movie_scraper_app.movie_scraper_adapter.scrape_shards_task',
+                             movies_count, genre, keyword, clicks_and_parse_count, job_id)
+        print(f"Submitted the sharded scraping asynchronously. {task_id}")
+        return
+    queue_batch_tasks(movies_count, genre, keyword, clicks_and_parse_count, job_id=job_id)
+
+
+def build_parse_health():
+    """ Parse health sampler of the scrape batches, None when the check is disabled. """
+    if not settings.PARSE_HEALTH_CHECK:
+        return None
+    return ParseHealthSampler(settings.PARSE_HEALTH_SAMPLE_SIZE)
+
+
+@contextmanager
+def record_parse_drift(job_id: str, tag_name: str):
+    """
+    Stores the drift report of a batch aborted by the parse health check, the ParseHealthError is re-raised.
+    Args:
+        job_id (str): Scrape job of the batch.
+        tag_name (str): Genre or keyword of the batch.
+    """
+    try:
+        yield
+    except ParseHealthError as e:
+        ParseDriftReport.record(e.report, job_id, tag_name)
+        metrics.inc("scraper_parse_health_aborts_total", stage=e.report["stage"])
+        print(f"Scrape job {job_id} of {tag_name} aborted. {e}")
+        raise
+
+
+def queue_batch_tasks(movies_count: int, genre: str, keyword: str, clicks_and_parse_count: list,
+                      release_years: tuple = None, group: str = None, hook: str = None, job_id: str = None):
+    """
+    Submits each batch as a task to Django Q for parallel execution.
+    Args:
+        movies_count (int): Movies of the search.
+        genre (str) (Optional): Genre of the search.
+        keyword (str) (Optional): Keyword of the search.
+        clicks_and_parse_count (list): A list of tuples (num_of_clicks, parse_movies_data_count).
+        release_years (tuple) (Optional): Release years of the shard searched.
+        group (str) (Optional): Django Q group of the tasks.
+        hook (str) (Optional): Django Q hook called with each finished task.
+        job_id (str) (Optional): Scrape job of the batches, aborted together by the parse health check.
+    Returns:
+        list: Ids of the submitted tasks.
+    """
     task_ids = []
+    movie_page_size = settings.MOVIES_PAGE_SIZE
     for num_of_clicks, parse_movies_data_count in clicks_and_parse_count:
         task_id = async_task('movie_scraper_app.movie_scraper_adapter.scrape_batch_task',
                              movies_count, genre, keyword, movie_page_size, num_of_clicks,
-                             parse_movies_data_count)
+                             parse_movies_data_count, release_years, job_id=job_id, group=group, hook=hook)
         print(f"Submitted the movies for scraping asynchronously. "
               f"{task_id}, Clicks:{num_of_clicks}, Parse Movies Count: {parse_movies_data_count}")
         task_ids.append(task_id)
+    return task_ids
+
+
+def use_sharded_scraping(movies_count: int, tag_name: str):
+    """ Sharding applies to full scrapes of very large tags only, shards do not follow the popularity order. """
+    if not settings.SHARDED_SCRAPING or movies_count < settings.SHARDED_SCRAPING_MIN_MOVIES:
+        return False
+    tag_movies_count = Tag.objects.filter(name=tag_name).values_list("movies_count", flat=True).first()
+    return tag_movies_count is not None and movies_count >= tag_movies_count
+
+
+def scrape_shards_task(movies_count: int, genre: str, keyword: str, clicks_and_parse_count: list,
+                       job_id: str = None):
+    """
+    Scrape shards task plans the release year shards of a large tag and submits one task per shard page.
+    Falls back to the "See more" chain, `clicks_and_parse_count`, when the shards do not cover the tag.
+    Returns:
+        list: A list of tuples (first_year, last_year, movies_count) of the planned shards.
+    """
+    tag_name = genre or keyword
+    planner = QueryShardPlanner(genre, keyword, settings.MOVIES_PAGE_SIZE * settings.SHARDED_SCRAPING_MAX_PAGES)
+    with metrics.timer("plan_shards"):
+        shards = planner.plan()
+    coverage = shard_coverage(shards, movies_count)
+    if coverage < settings.SHARDED_SCRAPING_MIN_COVERAGE:
+        print(f"Shards cover {coverage:.1%} of {tag_name}, falling back to the 'See more' chain.")
+        queue_batch_tasks(movies_count, genre, keyword, clicks_and_parse_count, job_id=job_id)
+        return shards
+
+    shard_batches = [(first_year, last_year, shard_movies_count, batch)
+                     for first_year, last_year, shard_movies_count in shards
+                     for batch in compute_shard_batches(shard_movies_count, settings.MOVIES_PAGE_SIZE)]
+    # The coverage hook counts the finished tasks of the group and checks the tag once they are all done
+    group = f"shards:{uuid.uuid4().hex}"
+    ShardedScrape.objects.create(group=group, tag_name=tag_name, tasks_count=len(shard_batches),
+                                 pending_tasks=len(shard_batches))
+    for first_year, last_year, shard_movies_count, batch in shard_batches:
+        queue_batch_tasks(shard_movies_count, genre, keyword, [batch], (first_year, last_year), group,
+                          'movie_scraper_app.movie_scraper_adapter.check_shard_coverage', job_id)
+    return shards
+
+
+def check_shard_coverage(task):
+    """
+    Django Q hook of the shard tasks. Counts the finished task in its ShardedScrape and, once all the tasks of
+    the group are done, checks that the movies held for the tag cover `Tag.movies_count`.
+    """
+    sharded_scrape = ShardedScrape.task_done(task.group, task.success)
+    if sharded_scrape is not None and not sharded_scrape.pending_tasks:
+        report_shard_coverage(sharded_scrape)
 
 
+def report_shard_coverage(sharded_scrape):
+    """
+    Checks the coverage of a sharded scrape whose shard tasks are all done. While the movie writer still holds
+    movies of the tag, the check is left to the writer, which runs it after flushing them.
+    Args:
+        sharded_scrape (ShardedScrape): Sharded scrape without pending tasks.
+    Returns:
+        bool: True if the coverage was checked by this call.
+    """
+    if settings.COALESCE_MOVIE_WRITES and PendingMoviesWrite.objects.filter(tag_name=sharded_scrape.tag_name).exists():
+        return False
+    if not sharded_scrape.check_coverage(settings.SHARDED_SCRAPING_MIN_COVERAGE):
+        return False
+    coverage = {"tag": sharded_scrape.tag_name, "movies_count": sharded_scrape.movies_count,
+                "held_movies": sharded_scrape.held_movies, "failed_tasks": sharded_scrape.failed_tasks}
+    if sharded_scrape.complete:
+        print(f"Sharded scraping completed. {coverage}")
+    else:
+        metrics.inc("scraper_shard_coverage_gaps_total")
+        print(f"Sharded scraping incomplete. {coverage}")
+    return True
+
+
+@profiled
 def scrape_batch_task(movies_count: int, genre: str, keyword: str, movie_page_size: int,
-                      num_of_clicks: int, parse_movies_data_count: int):
-    """ Scrape batch task is an asynchronous task for scraping movies"""
-    inc_scraper = IncrementalMovieScraper(movies_count, genre, keyword, movie_page_size)
-    movies_data = inc_scraper.batch_scrape(num_of_clicks, parse_movies_data_count, movie_page_size)
-    # Insert all batch of movies into the database
-    Movies.create_or_update(movies_data)
-    print(f"Asynchronous batch scrape data completed.  Movies Data Count: {len(movies_data)}")
-    return movies_data
-
-
-def scrape_genre_and_keywords():
-    """ Scrapes genre and keyword data with core scraper and updates the database."""
-    gk_scraper = GenreKeywordScraper(settings.MOVIES_PAGE_SIZE)
-    scraped_data = gk_scraper.scrape()
-    # Update or create genres
-    for genre in scraped_data.get("genres", []):
-        Tag.create_or_update_tag(name=genre["name"], count=genre["count"], is_genre=True)
-    # Update or create keywords
-    for keyword in scraped_data.get("keywords", []):
-        Tag.create_or_update_tag(name=keyword["name"], count=keyword["count"], is_genre=False)
+                      num_of_clicks: int, parse_movies_data_count: int, release_years: tuple = None,
+                      job_id: str = None):
+    """
+    Scrape batch task is an asynchronous task for scraping movies.
+    Returns a summary of the scraped movies along with the stage timings and counters of this job, stored with
+    the task result. The movies themselves are in the database, they are not kept in the result table.
+    A batch failing the parse health check records a ParseDriftReport and raises ParseHealthError, the queued
+    batches of the same job are then skipped without loading the search page.
+    """
+    if ParseDriftReport.is_aborted(job_id):
+        metrics.inc("scraper_parse_health_skipped_batches_total")
+        print(f"Scrape job {job_id} was aborted by the parse health check, batch skipped.")
+        return {"skipped": True, "job_id": job_id}
+    fetch_keywords = not settings.DEFER_KEYWORD_ENRICHMENT
+    parse_health = build_parse_health()
+    with metrics.job_scope() as job_metrics:
+        with metrics.timer("batch_task"), record_parse_drift(job_id, genre or keyword):
+            if settings.ASYNC_SCRAPING:
+                movie_records = asyncio.run(async_batch_scrape(
+                    movies_count, genre, keyword, movie_page_size, num_of_clicks, parse_movies_data_count,
+                    settings.ASYNC_MAX_IN_FLIGHT, Movies.find_known_imdb_ids, fetch_keywords, release_years,
+                    parse_health))
+            else:
+                inc_scraper = IncrementalMovieScraper(movies_count, genre, keyword, movie_page_size, fetch_keywords,
+                                                      release_years, parse_health)
+                movie_records = inc_scraper.batch_scrape(num_of_clicks, parse_movies_data_count, movie_page_size,
+                                                         Movies.find_known_imdb_ids)
+            if settings.COALESCE_MOVIE_WRITES:
+                # Hand the movies over to the single movie writer, which also queues their keyword enrichment
+                queue_movies_write(movie_records, genre or keyword)
+            else:
+                # Insert all batch of movies into the database, known movies are only linked to the tag
+                with metrics.timer("create_or_update"):
+                    Movies.create_or_update(movie_records, tag_name=genre or keyword)
+                queue_keyword_enrichment(movie_records)
+    print(f"Asynchronous batch scrape data completed.  Movies Data Count: {len(movie_records)}")
+    return {**summarize_movie_records(movie_records), "metrics": job_metrics.summary()}
+
+
+def summarize_movie_records(movie_records):
+    """
+    Compact summary of a scraped batch, stored with the task result instead of the movies.
+    Args:
+        movie_records (list of MovieRecord): Scraped movie records.
+    Returns:
+        dict: Counts of the movies, and the first and last imdb id of the batch.
+    """
+    imdb_ids = sorted(movie_record.imdb_id for movie_record in movie_records if movie_record.imdb_id)
+    return {
+        "movies": len(movie_records),
+        "details_fetched": sum(movie_record.detail_fetched for movie_record in movie_records),
+        "keywords_fetched": sum(movie_record.keywords_fetched for movie_record in movie_records),
+        "imdb_id_range": [imdb_ids[0], imdb_ids[-1]] if imdb_ids else None,
+    }
+
+
+def queue_movies_write(movie_records, tag_name: str):
+    """
+    Buffers scraped movies for the single movie writer and queues a flush on the MOVIE_WRITE_QUEUE.
+    The writer cluster runs one worker, pending writes buffered while it is busy are coalesced into its
+    next transaction.
+    Args:
+        movie_records (list of MovieRecord): Scraped movie records.
+        tag_name (str): Genre or keyword the movies were scraped for.
+    Returns:
+        str: Id of the flush task.
+    """
+    with metrics.timer("queue_movies_write"):
+        PendingMoviesWrite.objects.create(tag_name=tag_name,
+                                          movies_data=[movie_record.as_dict() for movie_record in movie_records])
+    return async_task('movie_scraper_app.movie_scraper_adapter.flush_movies_writes_task',
+                      broker=get_broker(settings.MOVIE_WRITE_QUEUE))
+
+
+def flush_movies_writes_task():
+    """
+    Flush movies writes task is the single movie writer. Writes every pending write, MOVIE_WRITE_MAX_BATCHES
+    per transaction, queues the keyword enrichment of the written movies and checks the coverage of the sharded
+    scrapes whose shard tasks are all done.
+    """
+    writes_count = 0
+    with metrics.job_scope() as job_metrics:
+        while True:
+            with metrics.timer("create_or_update"):
+                movie_records = PendingMoviesWrite.flush(settings.MOVIE_WRITE_MAX_BATCHES)
+            if not movie_records:
+                break
+            writes_count += len(movie_records)
+            queue_keyword_enrichment(movie_records)
+    for sharded_scrape in ShardedScrape.objects.filter(pending_tasks=0, checked_at__isnull=True):
+        report_shard_coverage(sharded_scrape)
+    if writes_count:
+        print(f"Movie writes flushed. Movies: {writes_count}")
+    return {"movies_written": writes_count, "metrics": job_metrics.summary()}
+
+
+def queue_keyword_enrichment(movie_records):
+    """
+    Queues the keyword enrichment of the scraped movies whose keywords pages were deferred.
+    Tasks go to the KEYWORD_ENRICHMENT_QUEUE, served by its own cluster (qcluster_queue) so that keyword
+    fetches never hold back the batches users are waiting on.
+    Args:
+        movie_records (list of MovieRecord): Scraped movie records.
+    Returns:
+        list: Ids of the submitted tasks.
+    """
+    imdb_ids = [movie_record.imdb_id for movie_record in movie_records
+                if movie_record.detail_fetched and not movie_record.keywords_fetched and movie_record.imdb_id]
+    return queue_enrichment_tasks(imdb_ids)
+
+
+def queue_enrichment_tasks(imdb_ids: list):
+    """
+    Submits the keyword enrichment of the movies in tasks of KEYWORD_ENRICHMENT_BATCH_SIZE movies.
+    Args:
+        imdb_ids (list): imdb ids of the movies.
+    Returns:
+        list: Ids of the submitted tasks.
+    """
+    batch_size = settings.KEYWORD_ENRICHMENT_BATCH_SIZE
+    broker = get_broker(settings.KEYWORD_ENRICHMENT_QUEUE)
+    task_ids = []
+    for start in range(0, len(imdb_ids), batch_size):
+        task_ids.append(async_task('movie_scraper_app.movie_scraper_adapter.enrich_keywords_task',
+                                   imdb_ids[start:start + batch_size], broker=broker))
+    if task_ids:
+        print(f"Submitted keyword enrichment. Movies: {len(imdb_ids)}, Tasks: {len(task_ids)}")
+    return task_ids
+
+
+def sweep_keyword_enrichment(max_movies: int = None):
+    """
+    Keyword enrichment sweep is a periodic task queuing the enrichment of the movies whose keywords were never
+    linked: keywords pages which failed, known movies linked without their detail pages and movies saved before the
+    enrichment stage. Skipped while enrichment tasks are queued or running, their movies are not queued twice.
+    Args:
+        max_movies (int) (Optional): Maximum movies queued, defaults to KEYWORD_ENRICHMENT_SWEEP_MAX_MOVIES.
+    Returns:
+        dict: Number of queued movies and tasks, and the enrichment tasks pending when the sweep was skipped.
+    """
+    broker = get_broker(settings.KEYWORD_ENRICHMENT_QUEUE)
+    pending_tasks = broker.queue_size() + broker.lock_size()
+    if pending_tasks:
+        print(f"Keyword enrichment sweep skipped. Pending tasks: {pending_tasks}")
+        return {"queued": 0, "tasks": 0, "pending_tasks": pending_tasks}
+    max_movies = max_movies or settings.KEYWORD_ENRICHMENT_SWEEP_MAX_MOVIES
+    imdb_ids = list(Movies.objects.filter(keywords_fetched_at__isnull=True, imdb_id__isnull=False)
+                    .order_by("id").values_list("imdb_id", flat=True)[:max_movies])
+    task_ids = queue_enrichment_tasks(imdb_ids)
+    return {"queued": len(imdb_ids), "tasks": len(task_ids), "pending_tasks": 0}
+
+
+def enrich_keywords_task(imdb_ids: list):
+    """ Enrich keywords task is a low priority asynchronous task linking the keyword tags of saved movies. """
+    with metrics.job_scope() as job_metrics:
+        with metrics.timer("enrich_keywords_task"):
+            if settings.ASYNC_SCRAPING:
+                keywords = asyncio.run(async_scrape_keywords(imdb_ids, settings.ASYNC_MAX_IN_FLIGHT))
+            else:
+                keywords = MovieKeywordScraper().scrape(imdb_ids)
+            Movies.link_keywords(keywords)
+    print(f"Keyword enrichment completed. Movies: {len(keywords)}/{len(imdb_ids)}")
+    return {"enriched": len(keywords), "requested": len(imdb_ids), "metrics": job_metrics.summary()}
+
+
+def scrape_genre_and_keywords(expand_keywords: bool = True):
+    """
+    Scrapes genre and keyword data with core scraper and updates the tags whose movies count changed.
+    Refreshes of the tags which grew are dispatched through the refresh scheduler.
+    Args:
+        expand_keywords (bool): Expand "See more keywords" in the browser, the frequent scheduled sync skips it.
+    Returns:
+        dict: Number of new and updated tags, and the names of the tags which grew.
+    """
+    gk_scraper = GenreKeywordScraper(settings.MOVIES_PAGE_SIZE, expand_keywords)
+    with metrics.timer("scrape_genre_and_keywords"):
+        changed_tags = gk_scraper.scrape(Tag.get_known_counts())
+    updated_tags = (Tag.sync_counts(changed_tags["genres"], is_genre=True)
+                    + Tag.sync_counts(changed_tags["keywords"], is_genre=False))
+    grown_tag_names = [name for name, previous_count, count in updated_tags if count > previous_count]
+    if grown_tag_names and settings.TAG_SYNC_REFRESH_GROWN_TAGS:
+        # Queued by path, the refresh scheduler imports this module
+        async_task('movie_scraper_app.refresh_scheduler.refresh_grown_tags_task', grown_tag_names)
+    new_tags_count = len(changed_tags["genres"]) + len(changed_tags["keywords"]) - len(updated_tags)
+    print(f"Tag sync completed. New: {new_tags_count}, Updated: {len(updated_tags)}, Grown: {len(grown_tag_names)}")
+    return {"new": new_tags_count, "updated": len(updated_tags), "grown": grown_tag_names}
@@ -0,0 +1,72 @@
+""" Opt-in profiling of the scrape tasks, enabled per task or per tag in the settings or with the profile kwarg. """
+import functools
+import inspect
+
+from django.conf import settings
+
+from scraper_core.profiling import TaskProfiler
+
+from .models import TaskProfile
+from .worker import current_task_id
+
+
+def profile_mode(task_name: str, tag_name: str = None, profile=None):
+    """
+    Profile mode of a task run.
+    Args:
+        task_name (str): Name of the task function.
+        tag_name (str) (Optional): Genre or keyword of the task.
+        profile (bool or str) (Optional): profile kwarg of the task, True for PROFILE_MODE, a mode, or False to
+            skip the profiling enabled in the settings.
+    Returns:
+        str: cprofile or sample, None when the run is not profiled.
+    """
+    if profile is None:
+        profile = task_name in settings.PROFILE_TASKS or (tag_name is not None and tag_name in settings.PROFILE_TAGS)
+    if not profile:
+        return None
+    return settings.PROFILE_MODE if profile is True else profile
+
+
+def _store_profile(profiler: TaskProfiler, task_name: str, tag_name: str = None):
+    """
+    Stores the profile of a task run. A failed store is not fatal, it must not hide the result or the exception
+    of the task.
+    Returns:
+        TaskProfile: Stored profile, None when storing failed.
+    """
+    try:
+        task_profile = TaskProfile.store(profiler, task_name, current_task_id(), tag_name, settings.PROFILE_MAX_STORED)
+    except Exception as e:
+        print(f"Profile of {task_name} could not be stored. {e}")
+        return None
+    print(f"Profile of {task_name} stored. {task_profile.id}, {profiler.wall_seconds:.2f}s")
+    return task_profile
+
+
+def profiled(func):
+    """
+    Profiles the decorated scrape task when enabled, see `profile_mode`. The task gets an extra `profile` kwarg.
+    The profile is stored as a TaskProfile with the Django Q task id, also when the task fails, and its id is
+    added to a dict result as `profile_id`. A failed store leaves the task result or exception unchanged.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, profile=None, **kwargs):
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+        tag_name = arguments.get("genre") or arguments.get("keyword")
+        mode = profile_mode(func.__name__, tag_name, profile)
+        if not mode:
+            return func(*args, **kwargs)
+        profiler = TaskProfiler(mode, settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        try:
+            with profiler:
+                result = func(*args, **kwargs)
+        finally:
+            task_profile = _store_profile(profiler, func.__name__, tag_name)
+        if isinstance(result, dict) and task_profile is not None:
+            result["profile_id"] = task_profile.id
+        return result
+
+    return wrapper
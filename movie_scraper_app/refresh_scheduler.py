@@ -0,0 +1,175 @@
+""" Periodic tag refresh scheduler, ranks tags by popularity and staleness and dispatches refreshes within budget. """
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+from django_q.tasks import async_task
+
+from movie_scraper_app.models import Tag
+from movie_scraper_app.movie_scraper_adapter import scrape_movies
+
+
+def compute_tag_refresh_priority(request_count: int, hours_since_scrape: float, missing_movies: int):
+    """
+    Computes the refresh priority of a tag. Each signal is log scaled so a single huge value can not starve the rest.
+    Args:
+        request_count (int): Number of times movies were requested for the tag.
+        hours_since_scrape (float): Hours elapsed since the tag was last scraped.
+        missing_movies (int): Difference between Tag.movies_count and movies held in the database.
+    Returns:
+        float: Refresh priority, higher is refreshed first.
+    """
+    weights = settings.TAG_REFRESH_WEIGHTS
+    return (weights["requests"] * math.log1p(max(0, request_count))
+            + weights["staleness"] * math.log1p(max(0.0, hours_since_scrape))
+            + weights["missing"] * math.log1p(max(0, missing_movies)))
+
+
+def requests_per_movie():
+    """
+    Detail requests made per scraped movie: the title page, and the keywords page unless it is deferred to the
+    keyword enrichment stage, which does not spend the refresh budget.
+    """
+    return 1 if settings.DEFER_KEYWORD_ENRICHMENT else 2
+
+
+def estimate_refresh_cost(movies_count: int):
+    """
+    Estimates the IMDb requests needed to refresh the given number of movies. Upper bound, the detail pages of
+    movies already held are not fetched again.
+    Args:
+        movies_count (int): Number of movies to be refreshed.
+    Returns:
+        int: Estimated number of requests (list pages plus detail pages).
+    """
+    page_loads = math.ceil(movies_count / settings.MOVIES_PAGE_SIZE)
+    return page_loads + movies_count * requests_per_movie()
+
+
+def max_affordable_movies(request_budget: int):
+    """
+    Computes the maximum number of movies which can be refreshed with the given request budget.
+    Args:
+        request_budget (int): Number of IMDb requests available.
+    Returns:
+        int: Number of movies.
+    """
+    movies_count = max(0, request_budget) // requests_per_movie()
+    while movies_count > 0 and estimate_refresh_cost(movies_count) > request_budget:
+        movies_count -= 1
+    return movies_count
+
+
+def get_refresh_candidates(now=None, min_staleness_hours: float = None):
+    """
+    Gets the tags eligible for refresh, annotated with the number of movies held.
+    Only tags which were requested or scraped before are considered and recently scraped tags are skipped.
+    Args:
+        now (datetime) (Optional): Reference time, defaults to current time.
+        min_staleness_hours (float) (Optional): Tags scraped more recently are skipped,
+            defaults to TAG_REFRESH_MIN_STALENESS_HOURS.
+    Returns:
+        QuerySet: Tags annotated with `held_movies`.
+    """
+    now = now or timezone.now()
+    if min_staleness_hours is None:
+        min_staleness_hours = settings.TAG_REFRESH_MIN_STALENESS_HOURS
+    min_staleness = now - timedelta(hours=min_staleness_hours)
+    return (Tag.objects
+            .filter(Q(request_count__gt=0) | Q(last_scraped_at__isnull=False))
+            .exclude(last_scraped_at__gte=min_staleness)
+            .annotate(held_movies=Count("movies")))
+
+
+def plan_tag_refreshes(tags, request_budget: int, now=None):
+    """
+    Ranks the tags and selects the refresh work which fits into the request budget.
+    Args:
+        tags (iterable): Tags annotated with `held_movies`.
+        request_budget (int): Maximum number of IMDb requests to be spent.
+        now (datetime) (Optional): Reference time, defaults to current time.
+    Returns:
+        list: A list of tuples (tag, movies_count) in priority order.
+    """
+    now = now or timezone.now()
+    max_staleness = settings.TAG_REFRESH_MAX_STALENESS_HOURS
+    ranked = []
+    for tag in tags:
+        if tag.last_scraped_at:
+            hours_since_scrape = min((now - tag.last_scraped_at).total_seconds() / 3600, max_staleness)
+        else:
+            hours_since_scrape = max_staleness
+        missing_movies = max(0, tag.movies_count - tag.held_movies)
+        priority = compute_tag_refresh_priority(tag.request_count, hours_since_scrape, missing_movies)
+        ranked.append((priority, tag))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+
+    plan = []
+    for priority, tag in ranked:
+        movies_count = min(tag.movies_count, settings.TAG_REFRESH_MAX_MOVIES_PER_TAG)
+        if movies_count <= 0:
+            continue
+        # Shrink the refresh to what is left of the budget, popular movies come first on IMDb
+        movies_count = min(movies_count, max_affordable_movies(request_budget))
+        if movies_count <= 0:
+            break
+        request_budget -= estimate_refresh_cost(movies_count)
+        plan.append((tag, movies_count))
+    return plan
+
+
+def schedule_tag_refreshes():
+    """
+    Scheduled entry point (Django Q schedule). Dispatches refresh tasks for the highest priority tags,
+    spending at most the per-run share of TAG_REFRESH_REQUESTS_PER_HOUR.
+    Returns:
+        list: A list of tuples (tag name, movies_count) dispatched in this run.
+    """
+    now = timezone.now()
+    request_budget = settings.TAG_REFRESH_REQUESTS_PER_HOUR * settings.TAG_REFRESH_INTERVAL_MINUTES // 60
+    return dispatch_tag_refreshes(plan_tag_refreshes(get_refresh_candidates(now), request_budget, now))
+
+
+def refresh_grown_tags_task(tag_names: list):
+    """
+    Refresh grown tags task dispatches refreshes of the tags whose movies count grew in the last tag sync,
+    ranked like the periodic refresh within the TAG_SYNC_REFRESH_REQUESTS budget.
+    Returns:
+        list: A list of tuples (tag name, movies_count) dispatched.
+    """
+    now = timezone.now()
+    candidates = (get_refresh_candidates(now, settings.TAG_SYNC_REFRESH_MIN_STALENESS_HOURS)
+                  .filter(name__in=tag_names))
+    return dispatch_tag_refreshes(plan_tag_refreshes(candidates, settings.TAG_SYNC_REFRESH_REQUESTS, now))
+
+
+def dispatch_tag_refreshes(plan):
+    """
+    Queues a refresh task per planned tag.
+    Args:
+        plan (list): A list of tuples (tag, movies_count), see `plan_tag_refreshes`.
+    Returns:
+        list: A list of tuples (tag name, movies_count) dispatched.
+    """
+    dispatched = []
+    for tag, movies_count in plan:
+        # Stamp before dispatch so that the next run does not pick the same tag while it is being refreshed
+        Tag.mark_scraped(tag.name)
+        async_task('movie_scraper_app.refresh_scheduler.refresh_tag_task', tag.id, movies_count)
+        dispatched.append((tag.name, movies_count))
+    print(f"Tag refresh dispatched: {dispatched}")
+    return dispatched
+
+
+def refresh_tag_task(tag_id: int, movies_count: int):
+    """
+    Refresh tag task is an asynchronous task which re-runs `scrape_movies` for the top movies of a tag. The search
+    pages are all loaded again, the detail pages are only fetched for the movies not held yet, held movies get
+    their list level fields (rating, year, summary) refreshed and are linked to the tag.
+    """
+    tag = Tag.objects.get(id=tag_id)
+    pos_kwargs = {'genre': tag.name} if tag.is_genre else {'keyword': tag.name}
+    scrape_movies(movies_count=movies_count, **pos_kwargs)
+    print(f"Tag refresh completed. Tag: {tag.name}, Movies Count: {movies_count}")
@@ -1,3 +1,4 @@
+from django.db.models import DateTimeField
 from rest_framework import serializers
 from .models import Movies
 
@@ -17,3 +18,47 @@ class MovieDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Movies
         fields = '__all__'
+
+
+MOVIE_LIST_FIELDS = MovieListSerializer.Meta.fields
+MOVIE_DETAIL_FIELDS = [field.attname for field in Movies._meta.concrete_fields]
+_DATETIME_FIELDS = [field.attname for field in Movies._meta.concrete_fields if isinstance(field, DateTimeField)]
+_DATETIME_FIELD = serializers.DateTimeField()
+
+
+def serialize_movie_list(queryset):
+    """
+    Fast path of MovieListSerializer, maps values() rows instead of instantiating models and serializer fields.
+    Args:
+        queryset (QuerySet or list): Movies, or a page of `values(*MOVIE_LIST_FIELDS)` rows.
+    Returns:
+        list: Serialized movies.
+    """
+    if hasattr(queryset, "values"):
+        queryset = queryset.values(*MOVIE_LIST_FIELDS)
+    return list(queryset)
+
+
+def serialize_movie_details(movie_ids):
+    """
+    Fast path of MovieDetailSerializer for a batch of movies, two queries whatever the number of movies and tags.
+    Output is the same as MovieDetailSerializer.
+    Args:
+        movie_ids (list): Ids of the movies.
+    Returns:
+        list: Serialized movies in the order of movie_ids, missing ids are skipped.
+    """
+    rows = {row["id"]: row for row in Movies.objects.filter(id__in=movie_ids).values(*MOVIE_DETAIL_FIELDS)}
+    tags = {}
+    for link in (Movies.tags.through.objects.filter(movies_id__in=rows.keys())
+                 .select_related("tag").order_by("id")):
+        tags.setdefault(link.movies_id, []).append(str(link.tag))
+    movies = []
+    for movie_id in dict.fromkeys(movie_ids):
+        row = rows.get(movie_id)
+        if row is None:
+            continue
+        for field in _DATETIME_FIELDS:
+            row[field] = _DATETIME_FIELD.to_representation(row[field]) if row[field] else None
+        movies.append({"id": movie_id, "tags": tags.get(movie_id, []), **row})
+    return movies
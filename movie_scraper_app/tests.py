@@ -1,3 +1,426 @@
-from django.test import TestCase
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from movie_scraper_app import worker
+from movie_scraper_app.exporter import iter_movie_chunks, stream_export
+from movie_scraper_app.models import Movies, ParseDriftReport, PendingMoviesWrite, ShardedScrape, Tag, TaskProfile
+from movie_scraper_app.movie_scraper_adapter import (
+    check_shard_coverage, flush_movies_writes_task, record_parse_drift, scrape_batch_task, summarize_movie_records,
+    sweep_keyword_enrichment, use_sharded_scraping)
+from movie_scraper_app.serializers import MovieDetailSerializer, MovieListSerializer, serialize_movie_details
+from movie_scraper_app.refresh_scheduler import (
+    compute_tag_refresh_priority, estimate_refresh_cost, get_refresh_candidates, plan_tag_refreshes)
+from scraper_core import base
+from scraper_core.parse_health import ParseHealthError, ParseHealthSampler
+from scraper_core.profiling import load_stats
+from scraper_core.records import MovieRecord
+
+
+@override_settings(MOVIES_PAGE_SIZE=250, DEFER_KEYWORD_ENRICHMENT=False, TAG_REFRESH_MAX_MOVIES_PER_TAG=1000,
+                   TAG_REFRESH_MIN_STALENESS_HOURS=24, TAG_REFRESH_MAX_STALENESS_HOURS=720,
+                   TAG_REFRESH_WEIGHTS={'requests': 1.0, 'staleness': 1.0, 'missing': 1.0})
+class TestRefreshScheduler(TestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+
+    def _tag(self, name, movies_count, request_count=0, scraped_hours_ago=None):
+        last_scraped_at = self.now - timedelta(hours=scraped_hours_ago) if scraped_hours_ago is not None else None
+        return Tag.objects.create(name=name, movies_count=movies_count, request_count=request_count,
+                                  last_scraped_at=last_scraped_at)
+
+    def test_priority_grows_with_each_signal(self):
+        base = compute_tag_refresh_priority(1, 1, 1)
+        self.assertGreater(compute_tag_refresh_priority(10, 1, 1), base)
+        self.assertGreater(compute_tag_refresh_priority(1, 10, 1), base)
+        self.assertGreater(compute_tag_refresh_priority(1, 1, 10), base)
+
+    def test_estimate_refresh_cost(self):
+        self.assertEqual(estimate_refresh_cost(10), 21)  # 1 page load + 2 detail requests per movie
+        self.assertEqual(estimate_refresh_cost(251), 504)  # 2 page loads
+        with self.settings(DEFER_KEYWORD_ENRICHMENT=True):
+            self.assertEqual(estimate_refresh_cost(10), 11)  # Keywords pages are fetched by the enrichment stage
+
+    def test_candidates_skip_recent_and_never_requested_tags(self):
+        self._tag("Action", 100, request_count=3)
+        self._tag("Drama", 100, scraped_hours_ago=48)
+        self._tag("Comedy", 100, request_count=5, scraped_hours_ago=1)
+        self._tag("Horror", 100)
+        names = set(get_refresh_candidates(self.now).values_list("name", flat=True))
+        self.assertEqual(names, {"Action", "Drama"})
+
+    def test_grown_tags_use_a_shorter_staleness(self):
+        self._tag("Action", 100, request_count=3, scraped_hours_ago=2)
+        self.assertFalse(get_refresh_candidates(self.now).exists())
+        self.assertEqual(list(get_refresh_candidates(self.now, 1).values_list("name", flat=True)), ["Action"])
+
+    def test_plan_ranks_popular_tags_first(self):
+        self._tag("Action", 10, request_count=50, scraped_hours_ago=48)
+        self._tag("Drama", 10, request_count=1, scraped_hours_ago=48)
+        plan = plan_tag_refreshes(get_refresh_candidates(self.now), 1000, self.now)
+        self.assertEqual([(tag.name, count) for tag, count in plan], [("Action", 10), ("Drama", 10)])
+
+    def test_plan_stays_within_budget(self):
+        self._tag("Action", 5000, request_count=50, scraped_hours_ago=48)
+        self._tag("Drama", 5000, request_count=1, scraped_hours_ago=48)
+        plan = plan_tag_refreshes(get_refresh_candidates(self.now), 300, self.now)
+        # 149 movies cost 1 page load + 298 detail requests
+        self.assertEqual([(tag.name, count) for tag, count in plan], [("Action", 149)])
+        self.assertLessEqual(sum(estimate_refresh_cost(count) for _, count in plan), 300)
+
+
+class TestTagSync(TestCase):
+
+    def test_only_changed_tags_are_written(self):
+        Tag.objects.create(name="Drama", movies_count=100)
+        Tag.objects.create(name="Crime", movies_count=50)
+        updated = Tag.sync_counts([{"name": "Drama", "count": 120}, {"name": "Horror", "count": 10}], is_genre=True)
+        self.assertEqual(updated, [("Drama", 100, 120)])
+        self.assertEqual(Tag.get_known_counts(), {"Drama": 120, "Crime": 50, "Horror": 10})
+
+
+class TestMoviesCreateOrUpdate(TestCase):
+
+    def setUp(self):
+        for name in ("Drama", "Crime", "prison"):
+            Tag.objects.create(name=name)
+
+    def _movie_record(self, title, imdb_id, rating="8.0", detail_fetched=True, **details):
+        movie_record = MovieRecord(title=title, imdb_id=imdb_id, year="1994", rating=rating, plot_summary="Summary")
+        if detail_fetched:
+            movie_record.set_details(["Director"], ["Cast"], ["Drama"])
+            movie_record.keywords = ["prison"]
+            for field, value in details.items():
+                setattr(movie_record, field, value)
+        return movie_record
+
+    def test_find_known_imdb_ids_matches_id_or_title(self):
+        Movies.create_or_update([self._movie_record(" Known", "tt1")])
+        Movies.objects.create(title=" Legacy", director=[], cast=[], rating=7, year=1990, summary="")
+        movie_records = [self._movie_record(" Known", "tt1"), self._movie_record(" Legacy", "tt2"),
+                         self._movie_record(" New", "tt3")]
+        self.assertEqual(Movies.find_known_imdb_ids(movie_records), {"tt1", "tt2"})
+
+    def test_known_movies_get_linked_and_list_fields_refreshed(self):
+        Movies.create_or_update([self._movie_record(" Known", "tt1")], tag_name="Drama")
+        Movies.create_or_update([self._movie_record(" Known", "tt1", rating="9.1", detail_fetched=False)],
+                                tag_name="Crime")
+        movie = Movies.objects.get(imdb_id="tt1")
+        self.assertEqual(movie.rating, 9.1)
+        self.assertEqual(movie.director, ["Director"])  # Details kept
+        self.assertEqual(set(movie.tags.values_list("name", flat=True)), {"Drama", "Crime", "prison"})
+
+    def test_new_movies_are_created_with_tags(self):
+        Movies.create_or_update([self._movie_record(" New", "tt3"), self._movie_record(" Other", "tt4")],
+                                tag_name="Crime")
+        self.assertEqual(Movies.objects.count(), 2)
+        self.assertEqual(set(Movies.objects.get(imdb_id="tt3").tags.values_list("name", flat=True)),
+                         {"Drama", "Crime", "prison"})
+
+    def test_pending_writes_are_coalesced(self):
+        pending_writes = [("Drama", [self._movie_record(" New", "tt3")]),
+                          ("Crime", [self._movie_record(" New", "tt3"), self._movie_record(" Other", "tt4")]),
+                          ("Drama", [self._movie_record(" Last", "tt5")])]
+        for tag_name, movie_records in pending_writes:
+            PendingMoviesWrite.objects.create(tag_name=tag_name,
+                                              movies_data=[movie_record.as_dict() for movie_record in movie_records])
+        self.assertEqual(len(PendingMoviesWrite.flush(max_writes=2)), 3)
+        self.assertEqual(PendingMoviesWrite.objects.count(), 1)
+        self.assertEqual(set(Movies.objects.get(imdb_id="tt3").tags.values_list("name", flat=True)),
+                         {"Drama", "Crime", "prison"})
+        self.assertEqual(PendingMoviesWrite.flush(), [self._movie_record(" Last", "tt5")])
+        self.assertEqual(PendingMoviesWrite.flush(), [])
+        self.assertEqual(Movies.objects.count(), 3)
+
+    def test_batch_summary_is_compact(self):
+        movie_records = [self._movie_record(" New", "tt3"), self._movie_record(" Known", "tt1", detail_fetched=False),
+                         MovieRecord(title=" No link")]
+        self.assertEqual(summarize_movie_records(movie_records),
+                         {"movies": 3, "details_fetched": 1, "keywords_fetched": 0, "imdb_id_range": ["tt1", "tt3"]})
+        self.assertIsNone(summarize_movie_records([])["imdb_id_range"])
+
+    def test_link_keywords_stamps_enriched_movies(self):
+        Movies.create_or_update([self._movie_record(" New", "tt3", keywords=[])], tag_name="Drama")
+        self.assertIsNone(Movies.objects.get(imdb_id="tt3").keywords_fetched_at)
+        Movies.link_keywords({"tt3": ["prison"], "tt404": ["prison"]})
+        movie = Movies.objects.get(imdb_id="tt3")
+        self.assertIsNotNone(movie.keywords_fetched_at)
+        self.assertEqual(set(movie.tags.values_list("name", flat=True)), {"Drama", "prison"})
+
+    @override_settings(KEYWORD_ENRICHMENT_BATCH_SIZE=1)
+    def test_sweep_queues_movies_without_keywords_once(self):
+        Movies.create_or_update([self._movie_record(" New", "tt3", keywords=[]),
+                                 self._movie_record(" Other", "tt4", keywords=[])], tag_name="Drama")
+        Movies.link_keywords({"tt4": []})
+        self.assertEqual(sweep_keyword_enrichment(), {"queued": 1, "tasks": 1, "pending_tasks": 0})
+        # Queued tasks are not queued again
+        self.assertEqual(sweep_keyword_enrichment(), {"queued": 0, "tasks": 0, "pending_tasks": 1})
+
+
+@override_settings(WORKER_WARM_UP=True, WORKER_WARM_UP_BROWSER=False)
+class TestWorkerWarmUp(TestCase):
+
+    def test_cluster_is_warmed_up_before_forking(self):
+        worker._warmed_up = False
+        base._http_session = None
+        worker.warm_up_cluster()
+        session = base._http_session
+        self.assertIsNotNone(session)
+        # Without the spare browser, the workers have nothing left to warm up
+        worker.warm_up_worker(sender="django_q")
+        self.assertFalse(worker._warmed_up)
+        self.assertIs(base.get_http_session(), session)
+
+
+class TestConditionalRequests(TestCase):
+
+    def setUp(self):
+        Tag.objects.create(name="Drama")
+        Movies.create_or_update([self._movie_record(" Movie", "tt1")], tag_name="Drama")
+        self.movie = Movies.objects.get(imdb_id="tt1")
+
+    def _movie_record(self, title, imdb_id, rating="8.0"):
+        movie_record = MovieRecord(title=title, imdb_id=imdb_id, year="1994", rating=rating, plot_summary="Summary")
+        movie_record.set_details(["Director"], ["Cast"], ["Drama"])
+        return movie_record
+
+    def test_unchanged_movies_keep_their_validators(self):
+        detail = self.client.get(f"/api/movie/{self.movie.id}")
+        listing = self.client.get("/api/movies/?tag=Drama")
+        self.assertEqual(detail["Cache-Control"], "no-cache")
+        # A refresh scraping the same values changes nothing
+        Movies.create_or_update([self._movie_record(" Movie", "tt1")], tag_name="Drama")
+        response = self.client.get(f"/api/movie/{self.movie.id}", HTTP_IF_NONE_MATCH=detail["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], detail["ETag"])
+        response = self.client.get("/api/movies/?tag=Drama", HTTP_IF_NONE_MATCH=listing["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_bump_the_movie_and_listing_versions(self):
+        detail = self.client.get(f"/api/movie/{self.movie.id}")
+        listing = self.client.get("/api/movies/?tag=Drama")
+        catalog = self.client.get("/api/movies/")
+        Movies.create_or_update([self._movie_record(" Movie", "tt1", rating="9.0")], tag_name="Drama")
+        self.assertEqual(Movies.objects.get(id=self.movie.id).version, self.movie.version + 1)
+        for url, response in ((f"/api/movie/{self.movie.id}", detail), ("/api/movies/?tag=Drama", listing),
+                              ("/api/movies/", catalog)):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+        # New movies of the tag change the listing only
+        listing = self.client.get("/api/movies/?tag=Drama")
+        detail = self.client.get(f"/api/movie/{self.movie.id}")
+        Movies.create_or_update([self._movie_record(" Other", "tt2")], tag_name="Drama")
+        self.assertEqual(self.client.get("/api/movies/?tag=Drama", HTTP_IF_NONE_MATCH=listing["ETag"]).status_code,
+                         200)
+        self.assertEqual(self.client.get(f"/api/movie/{self.movie.id}",
+                                         HTTP_IF_NONE_MATCH=detail["ETag"]).status_code, 304)
+
+    def test_deleted_movies_change_the_catalog_etag(self):
+        Movies.create_or_update([self._movie_record(" Other", "tt2")], tag_name="Drama")
+        catalog = self.client.get("/api/movies/")
+        self.assertEqual(self.client.get("/api/movies/", HTTP_IF_NONE_MATCH=catalog["ETag"]).status_code, 304)
+        # Not the latest movie, the latest id and change time stay the same
+        self.movie.delete()
+        response = self.client.get("/api/movies/", HTTP_IF_NONE_MATCH=catalog["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], catalog["ETag"])
+
+
+class TestParseDrift(TestCase):
+
+    def test_aborted_job_skips_its_queued_batches(self):
+        movie_records = [MovieRecord(title=f" Movie {position}", imdb_id=f"tt{position}", movie_info_url="/title/")
+                         for position in range(10)]
+        with self.assertRaises(ParseHealthError):
+            with record_parse_drift("job1", "Drama"):
+                ParseHealthSampler(5).check_list(movie_records)
+        report = ParseDriftReport.objects.get(job_id="job1")
+        self.assertEqual((report.tag_name, report.stage), ("Drama", "list"))
+        self.assertEqual(report.failing_fields, ["year", "plot_summary"])
+        self.assertEqual(report.report["coverage"]["title"], 1)
+        # Returns before the scraper is built, no browser is started
+        self.assertEqual(scrape_batch_task(1000, "Drama", None, 250, 1, 250, job_id="job1"),
+                         {"skipped": True, "job_id": "job1"})
+        self.assertFalse(ParseDriftReport.is_aborted("job2"))
+        self.assertFalse(ParseDriftReport.is_aborted(None))
+
+
+@override_settings(PROFILE_TASKS=[], PROFILE_TAGS=[], PROFILE_MODE="cprofile", PROFILE_MAX_STORED=2)
+class TestTaskProfiling(TestCase):
+
+    def setUp(self):
+        # Batches of an aborted job return right away, no browser is started
+        ParseDriftReport.objects.create(job_id="job1", tag_name="Drama", stage="list", failing_fields=["year"],
+                                        report={})
+
+    def _scrape_batch(self, **kwargs):
+        return scrape_batch_task(1000, "Drama", None, 250, 1, 250, job_id="job1", **kwargs)
+
+    def test_profiling_is_opt_in(self):
+        self.assertEqual(self._scrape_batch(), {"skipped": True, "job_id": "job1"})
+        self.assertFalse(TaskProfile.objects.exists())
+        result = self._scrape_batch(profile=True)
+        task_profile = TaskProfile.objects.get(id=result["profile_id"])
+        self.assertEqual((task_profile.task_name, task_profile.tag_name, task_profile.mode),
+                         ("scrape_batch_task", "Drama", "cprofile"))
+        self.assertTrue(any(name == "is_aborted" for _, _, name in load_stats(bytes(task_profile.stats)).stats))
+        self.assertTrue(task_profile.top_functions)
+        with override_settings(PROFILE_TAGS=["Drama"]):
+            self.assertIn("profile_id", self._scrape_batch())
+            self.assertNotIn("profile_id", self._scrape_batch(profile=False))
+        with override_settings(PROFILE_TASKS=["scrape_batch_task"]):
+            result = self._scrape_batch(profile="sample")
+        self.assertIsNone(TaskProfile.objects.get(id=result["profile_id"]).stats)
+        # The oldest profiles are pruned
+        self.assertEqual(TaskProfile.objects.count(), 2)
+
+    def test_failed_profile_store_does_not_hide_the_task_outcome(self):
+        with mock.patch.object(TaskProfile, "store", side_effect=RuntimeError("database is locked")):
+            self.assertEqual(self._scrape_batch(profile=True), {"skipped": True, "job_id": "job1"})
+            with mock.patch("movie_scraper_app.movie_scraper_adapter.ParseDriftReport.is_aborted",
+                            side_effect=ValueError("task failure")):
+                with self.assertRaisesRegex(ValueError, "task failure"):
+                    self._scrape_batch(profile=True)
+        self.assertFalse(TaskProfile.objects.exists())
+
+    def test_diff_profiles_command(self):
+        before, after = self._scrape_batch(profile=True), self._scrape_batch(profile=True)
+        output = StringIO()
+        call_command("diff_profiles", str(before["profile_id"]), str(after["profile_id"]), "--limit", "1000",
+                     stdout=output)
+        self.assertIn("is_aborted", output.getvalue())
+        self.assertIn("Total:", output.getvalue())
+        sampled = self._scrape_batch(profile="sample")
+        with self.assertRaises(CommandError):
+            call_command("diff_profiles", str(before["profile_id"]), str(sampled["profile_id"]), stdout=output)
+
+
+class TestDatabaseSetup(TestCase):
+
+    def test_sqlite_pragmas_are_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous;")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout;")
+            self.assertEqual(cursor.fetchone()[0], 30000)
+
+
+@override_settings(SHARDED_SCRAPING=True, SHARDED_SCRAPING_MIN_MOVIES=5000)
+class TestShardedScraping(TestCase):
+
+    def test_only_full_scrapes_of_large_tags_are_sharded(self):
+        Tag.objects.create(name="Drama", movies_count=20000)
+        Tag.objects.create(name="prison", movies_count=3000)
+        self.assertTrue(use_sharded_scraping(20000, "Drama"))
+        self.assertFalse(use_sharded_scraping(1000, "Drama"))  # Refresh of the top movies
+        self.assertFalse(use_sharded_scraping(3000, "prison"))
+
+    def test_coverage_is_checked_once_all_shard_tasks_are_done(self):
+        drama = Tag.objects.create(name="Drama", movies_count=2)
+        Movies.objects.create(title=" Movie", imdb_id="tt1", director=[], cast=[], rating=8.0, year=1994,
+                              summary="Summary").tags.add(drama)
+        ShardedScrape.objects.create(group="shards:1", tag_name="Drama", tasks_count=3, pending_tasks=3)
+        for success in (True, False):
+            check_shard_coverage(SimpleNamespace(group="shards:1", success=success))
+            self.assertIsNone(ShardedScrape.objects.get(group="shards:1").checked_at)
+        check_shard_coverage(SimpleNamespace(group="shards:1", success=True))
+        sharded_scrape = ShardedScrape.objects.get(group="shards:1")
+        self.assertEqual((sharded_scrape.pending_tasks, sharded_scrape.failed_tasks), (0, 1))
+        self.assertEqual((sharded_scrape.held_movies, sharded_scrape.movies_count, sharded_scrape.complete),
+                         (1, 2, False))
+        self.assertFalse(sharded_scrape.check_coverage(0.98))  # Checked once
+
+    @override_settings(COALESCE_MOVIE_WRITES=True)
+    def test_coverage_is_checked_after_the_writer_flush(self):
+        Tag.objects.create(name="Drama", movies_count=1)
+        ShardedScrape.objects.create(group="shards:1", tag_name="Drama", tasks_count=1, pending_tasks=1)
+        # The last shard task only handed its movies over to the writer
+        PendingMoviesWrite.objects.create(tag_name="Drama", movies_data=[
+            MovieRecord(title=" Movie", imdb_id="tt1", year=1994, rating=8.0, plot_summary="Summary",
+                        detail_fetched=True, keywords_fetched=True).as_dict()])
+        check_shard_coverage(SimpleNamespace(group="shards:1", success=True))
+        self.assertIsNone(ShardedScrape.objects.get(group="shards:1").checked_at)
+        flush_movies_writes_task()
+        sharded_scrape = ShardedScrape.objects.get(group="shards:1")
+        self.assertEqual((sharded_scrape.held_movies, sharded_scrape.complete), (1, True))
+
+
+class TestMovieExport(TestCase):
+
+    def setUp(self):
+        drama = Tag.objects.create(name="Drama")
+        for position in range(5):
+            movie = Movies.objects.create(title=f" Movie {position}", imdb_id=f"tt{position}", director=["Director"],
+                                          cast=["Cast, Jr.", "Other"], rating=8.0, year=1994, summary="Summary")
+            if position % 2:
+                movie.tags.add(drama)
+
+    def test_chunks_cover_the_catalog_in_id_order(self):
+        chunks = list(iter_movie_chunks(chunk_size=2))
+        self.assertEqual([len(rows) for rows in chunks], [2, 2, 1])
+        rows = [row for rows in chunks for row in rows]
+        self.assertEqual([row["imdb_id"] for row in rows], ["tt0", "tt1", "tt2", "tt3", "tt4"])
+        self.assertEqual(rows[1]["tags"], ["Drama"])
+        self.assertEqual(rows[0]["tags"], [])
+
+    def test_ndjson_and_csv_streams(self):
+        lines = list(stream_export("ndjson", chunk_size=2, tag_name="Drama"))
+        self.assertEqual([json.loads(line)["imdb_id"] for line in lines], ["tt1", "tt3"])
+        rows = list(csv.reader("".join(stream_export("csv", chunk_size=2)).splitlines()))
+        self.assertEqual(rows[0][:3], ["id", "imdb_id", "title"])
+        self.assertEqual(rows[2][-2:], ["Cast, Jr.|Other", "Drama"])
+        self.assertEqual(len(rows), 6)
+
+    def test_export_endpoint_rejects_unknown_format(self):
+        self.assertEqual(self.client.get("/api/movies/export?format=xml").status_code, 400)
+        response = self.client.get("/api/movies/export?format=csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 6)
+
+
+class TestMovieSerialization(TestCase):
+
+    def setUp(self):
+        drama = Tag.objects.create(name="Drama", movies_count=10)
+        prison = Tag.objects.create(name="prison", movies_count=2, is_genre=False)
+        self.movies = []
+        for position in range(3):
+            movie = Movies.objects.create(title=f" Movie {position}", imdb_id=f"tt{position}", director=["Director"],
+                                          cast=["Cast"], rating=8.5, year=1994, summary="Summary",
+                                          keywords_fetched_at=timezone.now() if position else None)
+            movie.tags.add(drama, prison)
+            self.movies.append(movie)
+
+    def test_fast_details_match_the_serializer(self):
+        with self.assertNumQueries(2):
+            details = serialize_movie_details([movie.id for movie in self.movies])
+        self.assertEqual(details, [dict(MovieDetailSerializer(movie).data) for movie in self.movies])
+
+    def test_scraper_failures_are_server_errors(self):
+        Tag.objects.create(name="Horror", movies_count=100)
+        report = {"stage": "list", "failing_fields": ["year"], "coverage": {"year": 0}}
+        with mock.patch("movie_scraper_app.views.scrape_movies", side_effect=ParseHealthError(report)):
+            response = self.client.get("/api/movies/?tag=Horror")
+        self.assertEqual(response.status_code, 500)
+
+    def test_list_and_batch_detail_endpoints(self):
+        response = self.client.get("/api/movies/?limit=2&offset=0")
+        self.assertEqual(response.json()["data"]["results"],
+                         [dict(MovieListSerializer(movie).data) for movie in self.movies[:2]])
+        ids = f"{self.movies[2].id},{self.movies[0].id},999"
+        response = self.client.get(f"/api/movies/?ids={ids}")
+        self.assertEqual([movie["imdb_id"] for movie in response.json()["data"]], ["tt2", "tt0"])
+        response = self.client.get("/api/movies/?ids=1,x")
+        self.assertEqual((response.status_code, response.json()["message"]),
+                         (400, "Invalid movie ids: 1,x. Expected comma separated integers."))
+        self.assertEqual(self.client.get(f"/api/movie/{self.movies[1].id}").json()["data"]["tags"],
+                         ["Drama | 10 | Tag:Genre", "prison | 2 | Tag:Keyword"])
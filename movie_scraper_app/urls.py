@@ -1,8 +1,10 @@
 from django.urls import path
 
-from .views import MovieListView, MovieDetailView
+from .views import MovieListView, MovieDetailView, MovieExportView, MetricsView
 
 urlpatterns = [
     path('api/movies/', MovieListView.as_view(), name='movie-list'),
     path('api/movie/<int:id>', MovieDetailView.as_view(), name='movie-detail'),
+    path('api/movies/export', MovieExportView.as_view(), name='movie-export'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
@@ -1,29 +1,59 @@
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.generics import ListAPIView, RetrieveAPIView
 
+from scraper_core.metrics import metrics
+
+from .conditional import (
+    catalog_validators, movie_validators, not_modified_response, set_validators, tag_listing_validators)
+from .exporter import STREAMING_FORMATS, stream_export
 from .models import Movies, Tag
 from .movie_scraper_adapter import scrape_movies
-from .serializers import MovieListSerializer, MovieDetailSerializer
+from .serializers import (
+    MovieListSerializer, MovieDetailSerializer, serialize_movie_details, serialize_movie_list)
 
 
 class MovieListView(ListAPIView):
-    """ List movies with pagination and filtering by tag """
+    """ List movies with pagination and filtering by tag, or the details of a batch of movies with ?ids=1,2,3 """
     serializer_class = MovieListSerializer
     pagination_class = LimitOffsetPagination
 
+    def get_tag(self):
+        """ Tag of the ?tag= filter, matched by name and recorded as requested. None without a matching tag. """
+        if not hasattr(self, "_tag"):
+            self._tag = None
+            tag_filter = self.request.query_params.get('tag', None)
+            if tag_filter:
+                self._tag = Tag.objects.filter(name__icontains=tag_filter).first()
+                if self._tag:
+                    Tag.record_request(self._tag.id)
+        return self._tag
+
+    def get_validators(self):
+        """ ETag and Last-Modified of the listing, of the tag listing when filtered by tag. """
+        representation = self.request.accepted_renderer.format
+        if self.request.query_params.get('tag', None):
+            tag = self.get_tag()
+            return tag_listing_validators(tag.id, representation) if tag else (None, None)
+        return catalog_validators(representation)
+
     def get_queryset(self):
         """ Get movies, optionally filtered by tag. """
         tag_filter = self.request.query_params.get('tag', None)
         if tag_filter:
-            tag = Tag.objects.filter(name__icontains=tag_filter)
+            tag = self.get_tag()
             if tag:
-                tag = tag.first()
                 filtered_movies = Movies.objects.filter(tags=tag)
                 if filtered_movies.exists():
+                    metrics.inc("scraper_cache_hits_total", cache="tag_listing")
                     return filtered_movies
                 else:
+                    metrics.inc("scraper_cache_misses_total", cache="tag_listing")
                     pos_kwargs = {'genre': tag.name} if tag.is_genre else {'keyword': tag.name}
                     scrape_movies(movies_count=tag.movies_count, **pos_kwargs)
                     return Movies.objects.filter(tags=tag)
@@ -32,12 +62,32 @@ class MovieListView(ListAPIView):
 
     def list(self, request, *args, **kwargs):
         try:
-            response = super().list(request, *args, **kwargs)
-            return Response({
+            if "ids" in request.query_params:
+                return self.list_details(request.query_params["ids"])
+            # Repeat polls are answered from the version stamps, the listing is neither queried nor serialized
+            not_modified = not_modified_response(request, *self.get_validators())
+            if not_modified is not None:
+                return not_modified
+            # Rows are mapped from values(), see serialize_movie_list
+            queryset = self.filter_queryset(self.get_queryset()).values(*MovieListSerializer.Meta.fields)
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                data = self.get_paginated_response(serialize_movie_list(page)).data
+            else:
+                data = serialize_movie_list(queryset)
+            # Validators are read again, a cache miss scrapes the first movies of the tag
+            return set_validators(Response({
                 "status": "SUCCESS",
                 "message": "Available Movies fetched successfully. More movies are adding in the background.",
-                "data": response.data
-            })
+                "data": data
+            }), *self.get_validators())
+        except ValidationError as e:
+            # Invalid ?ids= only, scraper failures of a cache miss are server errors
+            return Response({
+                "status": "FAILED",
+                "message": str(e.detail[0]),
+                "data": []
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 "status": "FAILED",
@@ -45,6 +95,28 @@ class MovieListView(ListAPIView):
                 "data": []
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def list_details(self, ids):
+        """
+        Batch detail lookup, the details of up to MAX_BATCH_DETAIL_IDS movies with the same two queries.
+        Args:
+            ids (str): Comma separated movie ids.
+        Returns:
+            Response: Details of the found movies in the requested order.
+        Raises:
+            ValidationError: The ids are not comma separated integers, or too many.
+        """
+        try:
+            movie_ids = [int(movie_id) for movie_id in ids.split(",") if movie_id.strip()]
+        except ValueError:
+            raise ValidationError(f"Invalid movie ids: {ids}. Expected comma separated integers.")
+        if len(movie_ids) > settings.MAX_BATCH_DETAIL_IDS:
+            raise ValidationError(f"At most {settings.MAX_BATCH_DETAIL_IDS} movie ids can be fetched at once.")
+        return Response({
+            "status": "SUCCESS",
+            "message": "Movie details fetched successfully.",
+            "data": serialize_movie_details(movie_ids)
+        })
+
 
 class MovieDetailView(RetrieveAPIView):
     """ List movies with pagination and filtering by tag """
@@ -56,15 +128,46 @@ class MovieDetailView(RetrieveAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         try:
-            response = super().retrieve(request, *args, **kwargs)
-            return Response({
+            validators = movie_validators(self.kwargs.get('id'), request.accepted_renderer.format)
+            not_modified = not_modified_response(request, *validators)
+            if not_modified is not None:
+                return not_modified
+            movies = serialize_movie_details([self.kwargs.get('id')])
+            if not movies:
+                raise Movies.DoesNotExist("Movies matching query does not exist.")
+            return set_validators(Response({
                 "status": "SUCCESS",
                 "message": "Movie detail fetched successfully.",
-                "data": response.data
-            })
+                "data": movies[0]
+            }), *validators)
         except Exception as e:
             return Response({
                 "status": "FAILED",
                 "message": str(e),
                 "data": []
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MetricsView(View):
+    """ Exposes the in-process scraper metrics in Prometheus text format """
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(metrics.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class MovieExportView(View):
+    """ Streams the full movie catalog, or the movies of a tag, as NDJSON or CSV """
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get("format", "ndjson")
+        if export_format not in STREAMING_FORMATS:
+            return JsonResponse({
+                "status": "FAILED",
+                "message": f"Unsupported export format: {export_format}. Use one of {list(STREAMING_FORMATS)}",
+                "data": []
+            }, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            stream_export(export_format, settings.EXPORT_CHUNK_SIZE, request.GET.get("tag")),
+            content_type=STREAMING_FORMATS[export_format])
+        response["Content-Disposition"] = f'attachment; filename="movies.{export_format}"'
+        return response
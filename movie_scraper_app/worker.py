@@ -0,0 +1,55 @@
+""" Django Q worker setup. """
+from django.conf import settings
+
+_warmed_up = False
+
+
+def warm_up_cluster():
+    """
+    Loads the parser and the HTTP session in the cluster process, before the workers are forked. Every worker
+    starts with them loaded, so even its first task does not pay for them. Called by qcluster and qcluster_queue.
+    """
+    if not settings.WORKER_WARM_UP:
+        return
+    from scraper_core.base import warm_up
+
+    warm_up(browser=False)
+
+
+def warm_up_worker(sender, func=None, task=None, **kwargs):
+    """
+    Starts a spare browser in a worker process once, with WORKER_WARM_UP_BROWSER, connected to the Django Q
+    `pre_execute` signal. Browsers cannot be shared by forked processes, the spare is started when the worker
+    takes its first task, outside of the task timeout, and is quit when the worker exits, e.g. on recycle.
+    """
+    global _warmed_up
+    if _warmed_up or not settings.WORKER_WARM_UP or not settings.WORKER_WARM_UP_BROWSER:
+        return
+    _warmed_up = True
+    from multiprocessing.util import Finalize
+
+    from scraper_core.base import SeleniumBase, warm_up
+    from scraper_core.constants import HEADLESS_MODE
+
+    try:
+        warm_up(browser=True, headless=HEADLESS_MODE)
+    except Exception as e:
+        # A failed warm up is not fatal, the scrapers start their backends on first use
+        print(f"Worker warm up failed. {e}")
+        return
+    # Run by the exit of the worker process, atexit handlers are not
+    Finalize(None, SeleniumBase.quit_spare, exitpriority=10)
+
+
+_current_task_id = None
+
+
+def remember_task(sender, func=None, task=None, **kwargs):
+    """ Keeps the id of the task the worker is about to run, connected to the Django Q `pre_execute` signal. """
+    global _current_task_id
+    _current_task_id = task.get("id") if task else None
+
+
+def current_task_id():
+    """ Id of the Django Q task being run by this worker process, None outside of Q workers. """
+    return _current_task_id
@@ -0,0 +1,211 @@
+""" Asyncio scraping engine, keeps hundreds of detail requests in flight from a single process.
+    aiohttp is imported when the first scraper session opens.
+"""
+import asyncio
+from typing import TYPE_CHECKING
+
+from .base import BaseScraper, retry_after_seconds
+from .constants import BASE_URL, USER_AGENT
+from .egress import get_egress_pool
+from .incremental_movie_scraper import IncrementalMovieScraper, MovieScraper
+from .metrics import metrics
+from .parse_health import ParseHealthError, ParseHealthSampler
+from .records import MovieRecord
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+class AsyncBaseScraper:
+    """
+    Async counterpart of BaseScraper, fetches pages through a shared aiohttp session.
+    Use it as an async context manager so that the session is opened and closed with the scraper.
+    """
+
+    def __init__(self, base_url: str, max_in_flight: int = 100):
+        """
+        Initialize the scraper with a base URL.
+        Args:
+            base_url (str): The base URL to be used for scraping.
+            max_in_flight (int): Maximum number of concurrent requests.
+        """
+        self.base_url = base_url
+        self.max_in_flight = max_in_flight
+        self.headers = {"User-Agent": USER_AGENT}
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        import aiohttp
+
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._session = aiohttp.ClientSession(
+            headers=self.headers, connector=aiohttp.TCPConnector(limit=self.max_in_flight))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+
+    get_soup = BaseScraper.get_soup
+
+    async def fetch_page(self, endpoint: str = "") -> "BeautifulSoup":
+        """
+        Fetches the HTML content of a page and returns a BeautifulSoup object.
+        Args:
+            endpoint (str): The URL endpoint to fetch (optional).
+        Returns:
+            BeautifulSoup: Parsed HTML content.
+        """
+        import aiohttp
+
+        url = f"{self.base_url}{endpoint}"
+        egress_pool = get_egress_pool()
+        egress = status = retry_after = None
+        try:
+            async with self._semaphore:
+                egress = await egress_pool.acquire_async()
+                with metrics.timer("fetch_page"):
+                    async with self._session.get(url, proxy=egress.proxy,
+                                                 headers={"User-Agent": egress.user_agent}) as response:
+                        content = await response.read()
+            status, retry_after = response.status, retry_after_seconds(response.headers)
+            metrics.inc("scraper_http_requests_total", status=response.status)
+            metrics.inc("scraper_http_response_bytes_total", len(content))
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            return self.get_soup(content)
+        except aiohttp.ClientError as e:
+            if not isinstance(e, aiohttp.ClientResponseError):
+                metrics.inc("scraper_http_requests_total", status="error")
+            raise ValueError(f"Error fetching page: {url}. Details: {e}")
+        except Exception as e:
+            raise ValueError(f"Internal Server Error while fetching the page, {str(e)}")
+        finally:
+            if egress is not None:
+                egress_pool.release(egress, status, retry_after)
+
+
+class AsyncIncrementalMovieScraper(AsyncBaseScraper):
+    """
+    Async variant of IncrementalMovieScraper. The search page still goes through Selenium (in a thread),
+    the movie and keyword pages of a batch are fetched concurrently.
+    """
+
+    def __init__(self, movies_count: int, genre: str = None, keyword: str = None, movie_page_size: int = 250,
+                 max_in_flight: int = 100, fetch_keywords: bool = True, release_years: tuple = None,
+                 parse_health: ParseHealthSampler = None):
+        super().__init__(BASE_URL, max_in_flight)
+        # Sync scraper drives the browser and owns the parsers, shared by both engines
+        self._scraper = IncrementalMovieScraper(movies_count, genre, keyword, movie_page_size, fetch_keywords,
+                                                release_years, parse_health)
+
+    async def batch_scrape(self, num_of_clicks: int, parse_movies_data_count: int, movie_page_size: int,
+                           known_movies_lookup=None):
+        """
+        Scrape movies for the given batch size.
+        Args:
+            num_of_clicks (int): Number of batches to fetch. Each batch corresponds to clicking the "See more" button.
+            parse_movies_data_count(int): Number of movies to be parsed for this request
+            movie_page_size(int): Number of movies per page
+            known_movies_lookup (callable) (Optional): Returns the imdb ids of already known movies, called in
+                an executor thread as it usually queries the database.
+        Returns:
+            list: List of movie records.
+        """
+        loop = asyncio.get_running_loop()
+        movie_records = await loop.run_in_executor(
+            None, self._scraper._load_movies_list, num_of_clicks, movie_page_size, parse_movies_data_count)
+        with metrics.timer("parse_movies"):
+            return await self._parse_movies_details(movie_records, known_movies_lookup)
+
+    async def _parse_movies_details(self, movie_records: list, known_movies_lookup=None):
+        """
+        Fetches the details of the movies which are not known yet concurrently. With a parse health check the
+        first movies are fetched and checked before the rest of the batch is requested.
+        Args:
+            movie_records (list): List level movie records.
+            known_movies_lookup (callable) (Optional): Returns the imdb ids of already known movies.
+        Returns:
+            list: List of movie records, in the order of the search page.
+        Raises:
+            ParseHealthError: The parse health check of the first movies failed.
+        """
+        parse_health = self._scraper.parse_health
+        try:
+            if parse_health:
+                parse_health.check_list(movie_records)
+            known_imdb_ids = await asyncio.get_running_loop().run_in_executor(
+                None, self._scraper._lookup_known_movies, movie_records, known_movies_lookup)
+            detail_records = self._scraper._detail_records(movie_records, known_imdb_ids)
+            sample_size = parse_health.sample_size if parse_health else 0
+            print("Scraping movie details ...")
+            if sample_size and detail_records:
+                await asyncio.gather(*(self._parse_movie_detail_info(movie_record)
+                                       for movie_record in detail_records[:sample_size]))
+                parse_health.check_details(detail_records[:sample_size])
+            await asyncio.gather(*(self._parse_movie_detail_info(movie_record)
+                                   for movie_record in detail_records[sample_size:]))
+            metrics.inc("scraper_movies_parsed_total", len(movie_records))
+        except ParseHealthError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Movie data parsing Issue. {e}")
+        print(f"Scraped movie details successfully")
+        return movie_records
+
+    async def _parse_movie_detail_info(self, movie_record: MovieRecord):
+        """
+        Fetches the movie page and the keywords page concurrently and completes the movie record.
+        Args:
+            movie_record (MovieRecord): List level movie record with the movie page URL.
+        Returns:
+            MovieRecord: The completed movie record.
+        """
+        movie_info_url = movie_record.movie_info_url
+        with metrics.timer("movie_detail"):
+            if not self._scraper.fetch_keywords:
+                movie_record.set_details(*self._scraper._parse_movie_page(await self.fetch_page(movie_info_url)))
+                return movie_record
+            movie_soup, keywords_soup = await asyncio.gather(
+                self.fetch_page(movie_info_url),
+                self.fetch_page(self._scraper._keywords_endpoint(movie_info_url)))
+        movie_record.set_details(*self._scraper._parse_movie_page(movie_soup))
+        movie_record.set_keywords(self._scraper._parse_keywords_page(keywords_soup))
+        return movie_record
+
+
+async def async_batch_scrape(movies_count: int, genre: str, keyword: str, movie_page_size: int,
+                             num_of_clicks: int, parse_movies_data_count: int, max_in_flight: int = 100,
+                             known_movies_lookup=None, fetch_keywords: bool = True, release_years: tuple = None,
+                             parse_health: ParseHealthSampler = None):
+    """
+    Async batch entry point, scrapes a batch with the async engine.
+    Returns:
+        list: List of movie records.
+    """
+    async with AsyncIncrementalMovieScraper(movies_count, genre, keyword, movie_page_size, max_in_flight,
+                                            fetch_keywords, release_years, parse_health) as scraper:
+        return await scraper.batch_scrape(num_of_clicks, parse_movies_data_count, movie_page_size,
+                                          known_movies_lookup)
+
+
+async def async_scrape_keywords(imdb_ids: list, max_in_flight: int = 100):
+    """
+    Async counterpart of MovieKeywordScraper.scrape, fetches the keywords pages concurrently.
+    Failed pages are skipped, the movies stay without keywords until they are enriched again.
+    Args:
+        imdb_ids (list): imdb ids of the movies.
+        max_in_flight (int): Maximum number of concurrent requests.
+    Returns:
+        dict: imdb id to the list of keywords of the movie.
+    """
+    async with AsyncBaseScraper(BASE_URL, max_in_flight) as scraper:
+        soups = await asyncio.gather(*(
+            scraper.fetch_page(MovieScraper._keywords_endpoint(MovieScraper._movie_info_url(imdb_id)))
+            for imdb_id in imdb_ids), return_exceptions=True)
+    keywords = {}
+    for imdb_id, soup in zip(imdb_ids, soups):
+        if isinstance(soup, Exception):
+            print(f"Keywords scrape failed for {imdb_id}. {soup}")
+        else:
+            keywords[imdb_id] = MovieScraper._parse_keywords_page(soup)
+    return keywords
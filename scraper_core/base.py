@@ -1,14 +1,32 @@
-""" Base scraper module, single point of interaction with IMDB website through BS4 and selenium."""
+""" Base scraper module, single point of interaction with IMDB website through BS4 and selenium.
+    requests, BS4 and selenium are imported on first use, processes which never scrape do not pay for them.
+"""
 import os
+import threading
+from typing import TYPE_CHECKING
 
-import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from .constants import USER_AGENT
+from .egress import Egress, get_egress_pool
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> "requests.Session":
+    """ Process wide HTTP session, keeps the connections to IMDb alive between the requests of the scrapers. """
+    global _http_session
+    if _http_session is None:
+        import requests
+
+        with _http_session_lock:
+            if _http_session is None:
+                _http_session = requests.Session()
+    return _http_session
 
 
 class BaseScraper:
@@ -24,19 +42,17 @@ class BaseScraper:
             base_url (str): The base URL to be used for scraping.
         """
         self.base_url = base_url
-        self.headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
-            )
-        }
+        self.headers = {"User-Agent": USER_AGENT}
 
     @classmethod
     def get_soup(cls, page_source):
         """ Gets Beautiful soup object for given page source"""
-        return BeautifulSoup(page_source, "html.parser")
+        from bs4 import BeautifulSoup
+
+        with metrics.timer("get_soup"):
+            return BeautifulSoup(page_source, "html.parser")
 
-    def fetch_page(self, endpoint: str = "") -> BeautifulSoup:
+    def fetch_page(self, endpoint: str = "") -> "BeautifulSoup":
         """
         Fetches the HTML content of a page and returns a BeautifulSoup object.
         Args:
@@ -44,21 +60,45 @@ class BaseScraper:
         Returns:
             BeautifulSoup: Parsed HTML content.
         """
+        import requests
+
         url = f"{self.base_url}{endpoint}"
+        egress_pool = get_egress_pool()
+        egress = egress_pool.acquire()
+        status = retry_after = None
         try:
-            response = requests.get(url, headers=self.headers)
+            with metrics.timer("fetch_page"):
+                response = egress.session.get(url, headers={**self.headers, "User-Agent": egress.user_agent})
+            status, retry_after = response.status_code, retry_after_seconds(response.headers)
+            metrics.inc("scraper_http_requests_total", status=response.status_code)
+            metrics.inc("scraper_http_response_bytes_total", len(response.content))
             response.raise_for_status()  # Raise an exception for HTTP errors
             return self.get_soup(response.content)
         except requests.exceptions.RequestException as e:
+            if e.response is None:
+                metrics.inc("scraper_http_requests_total", status="error")
             raise ValueError(f"Error fetching page: {url}. Details: {e}")
         except Exception as e:
             raise ValueError(f"Internal Server Error while fetching the page, {str(e)}")
+        finally:
+            egress_pool.release(egress, status, retry_after)
+
+
+def retry_after_seconds(headers) -> float:
+    """ Retry-After header of a throttled response in seconds, None when absent or an HTTP date. """
+    retry_after = headers.get("Retry-After")
+    return float(retry_after) if retry_after and retry_after.isdigit() else None
 
 
 class SeleniumBase:
     """
     Base class for handling Selenium WebDriver interactions.
+    The browser is started on first use, or taken over from `warm_up` when a spare browser is ready.
+    Every browser goes out through one egress of the egress pool, its page loads take tokens of that egress.
     """
+    _spare_driver = None
+    _spare_egress = None
+    _spare_driver_lock = threading.Lock()
 
     def __init__(self, base_url: str, headless: bool = True):
         """
@@ -68,29 +108,93 @@ class SeleniumBase:
             headless (bool): Run in headless mode (no GUI).
         """
         self.base_url = base_url
+        self.headless = headless
+        self.egress = None
+        self._driver = None
+
+    @property
+    def driver(self):
+        """ Chrome WebDriver, started on first access. """
+        if self._driver is None:
+            with SeleniumBase._spare_driver_lock:
+                spare_driver, spare_egress = SeleniumBase._spare_driver, SeleniumBase._spare_egress
+                SeleniumBase._spare_driver = SeleniumBase._spare_egress = None
+            egress_pool = get_egress_pool()
+            if spare_driver is not None and (spare_egress is None or not spare_egress.is_ejected(egress_pool.clock())):
+                self._driver, self.egress = spare_driver, spare_egress
+            else:
+                if spare_driver is not None:
+                    spare_driver.quit()  # Its egress was ejected since the warm up
+                self.egress = egress_pool.pick()
+                with metrics.timer("selenium_startup"):
+                    self._driver = self._start_driver(self.headless, self.egress)
+        return self._driver
+
+    @classmethod
+    def warm_up(cls, headless: bool = True):
+        """
+        Starts a spare browser, taken over by the next SeleniumBase instead of starting its own.
+        Args:
+            headless (bool): Run in headless mode (no GUI).
+        """
+        with cls._spare_driver_lock:
+            if cls._spare_driver is not None:
+                return
+        egress = get_egress_pool().pick()
+        with metrics.timer("selenium_startup"):
+            driver = cls._start_driver(headless, egress)
+        with cls._spare_driver_lock:
+            if cls._spare_driver is None:
+                cls._spare_driver, cls._spare_egress = driver, egress
+                return
+        driver.quit()
+
+    @classmethod
+    def quit_spare(cls):
+        """ Quits the spare browser of `warm_up` if it was not taken over, e.g. when the worker process exits. """
+        with cls._spare_driver_lock:
+            spare_driver = cls._spare_driver
+            cls._spare_driver = cls._spare_egress = None
+        if spare_driver is not None:
+            spare_driver.quit()
+
+    @classmethod
+    def _start_driver(cls, headless: bool, egress: Egress = None):
+        """
+        Starts the Chrome WebDriver.
+        Args:
+            headless (bool): Run in headless mode (no GUI).
+            egress (Egress) (Optional): Egress of the browser, its proxy and user agent are applied.
+                Chrome does not take proxy credentials from the URL, browser proxies have to allow the workers.
+        Returns:
+            WebDriver: The started driver.
+        """
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
         chrome_options = Options()
         if headless:
             chrome_options.add_argument("--headless")
             chrome_options.add_argument("--window-size=1920x1080")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--no-sandbox")
+        if egress is not None and egress.proxy:
+            chrome_options.add_argument(f"--proxy-server={egress.proxy}")
 
         chrome_driver_path = os.environ.get("CHROME_DRIVER_PATH")
         if chrome_driver_path is None:
             # Try to identify the default driver path automatically
-            self.driver = webdriver.Chrome(options=chrome_options)
+            driver = webdriver.Chrome(options=chrome_options)
         else:
             service = Service(chrome_driver_path)
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver = webdriver.Chrome(service=service, options=chrome_options)
 
-        self.driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-            'userAgent': (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
-            )
-        })
+        driver.execute_cdp_cmd('Network.setUserAgentOverride',
+                               {'userAgent': egress.user_agent if egress is not None else USER_AGENT})
         # Maximize the Chrome window for better page visibility
-        self.driver.maximize_window()
+        driver.maximize_window()
+        return driver
 
     def load_page(self, endpoint: str):
         """
@@ -98,15 +202,28 @@ class SeleniumBase:
         Args:
             endpoint (str): endpoint of the page to load.
         """
-        self.driver.get(f"{self.base_url}{endpoint}")
+        driver = self.driver
+        egress_pool = get_egress_pool()
+        # The browser does not expose the HTTP status, a loaded page counts as a success
+        egress = egress_pool.acquire(self.egress)
+        status = None
+        try:
+            with metrics.timer("page_load"):
+                driver.get(f"{self.base_url}{endpoint}")
+            status = 200
+        finally:
+            egress_pool.release(egress, status)
 
-    def click_element(self, by: By, value: str):
+    def click_element(self, by: str, value: str):
         """
         Click an element on the webpage.
         Args:
-            by (By): Locator strategy (e.g., By.ID, By.XPATH).
+            by (str): Locator strategy (e.g., By.ID, By.XPATH).
             value (str): Locator value.
         """
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         try:
             # Wait until the element is visible and clickable
             WebDriverWait(self.driver, 10).until(
@@ -135,7 +252,21 @@ class SeleniumBase:
         Returns:
             str: HTML content of the page.
         """
-        return self.driver.page_source
+        with metrics.timer("page_source"):
+            page_source = self.driver.page_source
+        metrics.inc("scraper_page_source_bytes_total", len(page_source))
+        return page_source
+
+    def execute_script(self, script: str, *args):
+        """
+        Runs a script in the loaded page.
+        Args:
+            script (str): JavaScript function body, receives args as `arguments`.
+        Returns:
+            The value returned by the script.
+        """
+        with metrics.timer("execute_script"):
+            return self.driver.execute_script(script, *args)
 
     def scroll_down_once(self):
         """
@@ -144,5 +275,22 @@ class SeleniumBase:
         self.driver.execute_script("window.scrollBy(0, window.innerHeight);")
 
     def close(self):
-        """Close the Selenium WebDriver."""
-        self.driver.quit()
+        """Close the Selenium WebDriver, if it was started."""
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+
+def warm_up(browser: bool = True, headless: bool = True):
+    """
+    Loads the parser and the HTTP session, and optionally starts a spare browser, so that the first scrape
+    of a fresh worker process does not pay for them.
+    Args:
+        browser (bool): Also import selenium and start a spare browser.
+        headless (bool): Run the spare browser in headless mode (no GUI).
+    """
+    with metrics.timer("warm_up"):
+        BaseScraper.get_soup("<html><body></body></html>")
+        get_http_session()
+        if browser:
+            SeleniumBase.warm_up(headless)
@@ -0,0 +1 @@
+""" Offline benchmark suite for the scraper hot path, run against a recorded IMDb fixture corpus. """
@@ -0,0 +1,22 @@
+""" Runs the offline benchmark suite: python -m scraper_core.benchmarks [--update-baseline] """
+import argparse
+import sys
+
+from .runner import run_and_compare
+from .suite import suite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the offline scraper benchmarks against the fixture corpus.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark.")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative regression.")
+    parser.add_argument("--only", nargs="*", help="Names of the benchmarks to run.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    args = parser.parse_args()
+    passed = run_and_compare(suite, repeat=args.repeat, tolerance=args.tolerance, only=args.only,
+                             update_baseline=args.update_baseline)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
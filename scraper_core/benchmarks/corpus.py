@@ -0,0 +1,80 @@
+""" Recorded IMDb fixture corpus: search, title and keyword pages, plus synthetic large search pages. """
+import os
+import re
+from functools import lru_cache
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+SEARCH_PAGE = "search_page.html"
+TITLE_PAGE = "title_page.html"
+KEYWORDS_PAGE = "keywords_page.html"
+
+_ROW_PATTERN = re.compile(r'<li class="ipc-metadata-list-summary-item">.*?</li>(?=\s*(?:<li|</ul>))', re.S)
+_TITLE_PATTERN = re.compile(r'(<h3 class="ipc-title__text">)\d+\. ([^<]*)(</h3>)')
+_TITLE_ID_PATTERN = re.compile(r"tt\d{7,8}")
+
+
+@lru_cache(maxsize=None)
+def load_fixture(name: str) -> str:
+    """
+    Loads a recorded page from the corpus.
+    Args:
+        name (str): File name of the page inside the corpus directory.
+    Returns:
+        str: HTML content of the page.
+    """
+    with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as fixture:
+        return fixture.read()
+
+
+@lru_cache(maxsize=None)
+def search_page_rows() -> tuple:
+    """ Movie rows (li HTML) of the recorded search page. """
+    return tuple(_ROW_PATTERN.findall(load_fixture(SEARCH_PAGE)))
+
+
+def build_search_row(position: int) -> str:
+    """
+    Builds the search row for the given position by cycling through the recorded rows.
+    Title ids and titles are made unique per position so that the rows behave like distinct movies.
+    Args:
+        position (int): Zero based position of the row in the search list.
+    Returns:
+        str: HTML of the movie row.
+    """
+    rows = search_page_rows()
+    row = rows[position % len(rows)]
+    cycle = position // len(rows)
+    if cycle:
+        row = _TITLE_ID_PATTERN.sub(f"tt{9000000 + position:07d}", row)
+    suffix = f" {cycle + 1}" if cycle else ""
+    return _TITLE_PATTERN.sub(lambda m: f"{m.group(1)}{position + 1}. {m.group(2)}{suffix}{m.group(3)}", row)
+
+
+def build_search_rows(start: int, rows_count: int) -> str:
+    """
+    Builds consecutive movie rows of the search list.
+    Args:
+        start (int): Zero based position of the first row.
+        rows_count (int): Number of movie rows.
+    Returns:
+        str: HTML of the movie rows.
+    """
+    return "\n".join(build_search_row(position) for position in range(start, start + rows_count))
+
+
+@lru_cache(maxsize=8)
+def build_search_page(rows_count: int) -> str:
+    """
+    Builds a synthetic search page holding the given number of movie rows, as IMDb renders it after
+    clicking "See more" several times.
+    Args:
+        rows_count (int): Number of movie rows.
+    Returns:
+        str: HTML content of the page.
+    """
+    page = load_fixture(SEARCH_PAGE)
+    recorded_rows = search_page_rows()
+    start = page.index(recorded_rows[0])
+    end = page.index(recorded_rows[-1]) + len(recorded_rows[-1])
+    return f"{page[:start]}{build_search_rows(0, rows_count)}{page[end:]}"
@@ -0,0 +1,81 @@
+""" Offline stand-ins for the scrapers, serving pages from the fixture corpus instead of IMDb and Chrome. """
+import json
+import re
+
+from scraper_core.base import BaseScraper
+from scraper_core.constants import BASE_URL, MOVIE_URL
+from scraper_core.genre_keywords_scraper import GenreKeywordScraper
+from scraper_core.incremental_movie_scraper import MovieScraper, _EXTRACT_MOVIES_SCRIPT
+from scraper_core.parse_health import ParseHealthSampler
+
+from .corpus import load_fixture, SEARCH_PAGE, TITLE_PAGE, KEYWORDS_PAGE
+
+
+class OfflineBrowser:
+    """ Browser stand-in with the SeleniumBase interface, always rendering the given page source. """
+
+    def __init__(self, page_source: str):
+        self.page_source = page_source
+
+    def load_page(self, endpoint: str):
+        pass
+
+    def click_element(self, by, value: str):
+        pass
+
+    def scroll_down_once(self):
+        pass
+
+    def get_page_source(self) -> str:
+        return self.page_source
+
+    def execute_script(self, script: str, *args):
+        if script != _EXTRACT_MOVIES_SCRIPT:
+            raise ValueError("Offline browser only runs the movies extraction script")
+        return extract_movies_rows(self.page_source, *args)
+
+    def close(self):
+        pass
+
+
+def extract_movies_rows(page_source: str, parse_movies_data_count: int) -> str:
+    """ BeautifulSoup stand-in of `_EXTRACT_MOVIES_SCRIPT`, returns the same JSON rows the browser does. """
+    movie_items = MovieScraper._find_movie_items(page_source, parse_movies_data_count)
+    return json.dumps([MovieScraper._movie_item_fields(movie_item) for movie_item in movie_items])
+
+
+class OfflineFetchMixin:
+    """ Serves title and keyword pages from the corpus. """
+
+    def fetch_page(self, endpoint: str = ""):
+        if endpoint.rstrip("/").endswith("keywords"):
+            return self.get_soup(load_fixture(KEYWORDS_PAGE))
+        if re.search(r"title/tt\d+", endpoint):
+            return self.get_soup(load_fixture(TITLE_PAGE))
+        return self.get_soup(load_fixture(SEARCH_PAGE))
+
+
+class OfflineMovieScraper(OfflineFetchMixin, MovieScraper):
+    """ Movie scraper parsing the given search page and the recorded title and keyword pages. """
+
+    def __init__(self, search_page: str, genre: str = "Drama", keyword: str = None, fetch_keywords: bool = True,
+                 in_browser_extraction: bool = False, parse_health: ParseHealthSampler = None):
+        BaseScraper.__init__(self, BASE_URL)
+        self.genre = genre
+        self.keyword = keyword
+        self.fetch_keywords = fetch_keywords
+        self.release_years = None
+        self.in_browser_extraction = in_browser_extraction
+        self.parse_health = parse_health
+        self._selenium = OfflineBrowser(search_page)
+
+
+class OfflineGenreKeywordScraper(OfflineFetchMixin, GenreKeywordScraper):
+    """ Genre and keyword scraper reading the accordions of the recorded search page. """
+
+    def __init__(self, movie_page_size: int = 250, expand_keywords: bool = True):
+        BaseScraper.__init__(self, BASE_URL)
+        self.movie_page_size = movie_page_size
+        self.expand_keywords = expand_keywords
+        self.endpoint = f"{MOVIE_URL}&count={self.movie_page_size}"
+        self.selenium = OfflineBrowser(load_fixture(SEARCH_PAGE))
@@ -0,0 +1,160 @@
+""" Benchmark runner measuring throughput and peak memory, and comparing the results against a stored baseline. """
+import contextlib
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+class Benchmark:
+    """ A benchmark case, `func` is timed with the context returned by the untimed `setup`. """
+
+    def __init__(self, name: str, func, items: int = 1, setup=None, memory=None):
+        """
+        Args:
+            name (str): Unique name of the benchmark.
+            func (callable): Benchmarked function, called with the setup context.
+            items (int): Units processed per call, used to compute throughput.
+            setup (callable) (Optional): Prepares the context passed to `func`.
+            memory (callable) (Optional): Called with the setup context instead of tracing `func`, returns the peak
+                memory in KiB. For work done outside of this process, e.g. the child process of a cold start.
+        """
+        self.name = name
+        self.func = func
+        self.items = items
+        self.setup = setup
+        self.memory = memory
+
+    def run(self, repeat: int) -> dict:
+        """
+        Runs the benchmark.
+        Args:
+            repeat (int): Number of timed runs, the median is reported.
+        Returns:
+            dict: median seconds, throughput (items per second) and peak traced memory in KiB.
+        """
+        # Progress prints of the scrapers are silenced, they would flood the report
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            context = self.setup() if self.setup else None
+            # Warm up run, fills the fixture caches and lazy imports
+            self.func(context)
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                self.func(context)
+                timings.append(time.perf_counter() - start)
+            seconds = statistics.median(timings)
+
+            # Memory is traced in a separate run, tracing slows down the timed runs
+            if self.memory:
+                peak_memory_kb = self.memory(context)
+            else:
+                tracemalloc.start()
+                try:
+                    self.func(context)
+                    peak_memory_kb = tracemalloc.get_traced_memory()[1] / 1024
+                finally:
+                    tracemalloc.stop()
+        return {
+            "seconds": round(seconds, 6),
+            "throughput": round(self.items / seconds, 2) if seconds else 0.0,
+            "peak_memory_kb": round(peak_memory_kb, 1),
+        }
+
+
+class BenchmarkSuite:
+    """ Ordered collection of benchmarks. """
+
+    def __init__(self):
+        self.benchmarks = []
+
+    def add(self, name: str, items: int = 1, setup=None, memory=None):
+        """ Decorator registering the decorated function as a benchmark. """
+        def decorator(func):
+            self.benchmarks.append(Benchmark(name, func, items, setup, memory))
+            return func
+        return decorator
+
+    def run(self, repeat: int = 5, only=None, write=print) -> dict:
+        """
+        Runs the benchmarks.
+        Args:
+            repeat (int): Number of timed runs per benchmark.
+            only (list) (Optional): Names of the benchmarks to run, defaults to all.
+            write (callable): Output function for the report lines.
+        Returns:
+            dict: Results keyed by benchmark name.
+        """
+        results = {}
+        for benchmark in self.benchmarks:
+            if only and benchmark.name not in only:
+                continue
+            result = benchmark.run(repeat)
+            results[benchmark.name] = result
+            write(f"{benchmark.name:<40} {result['seconds'] * 1000:>10.2f} ms "
+                  f"{result['throughput']:>12.2f} items/s {result['peak_memory_kb']:>10.1f} KiB peak")
+        return results
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    """ Loads the stored baseline results, empty if there is no baseline yet. """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(results: dict, path: str = BASELINE_PATH):
+    """ Stores the results as the new baseline. """
+    with open(path, "w", encoding="utf-8") as baseline:
+        json.dump(results, baseline, indent=2, sort_keys=True)
+        baseline.write("\n")
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compares the results against the baseline.
+    Args:
+        results (dict): Current results keyed by benchmark name.
+        baseline (dict): Baseline results keyed by benchmark name.
+        tolerance (float): Allowed relative slowdown or memory growth, e.g. 0.3 for 30%.
+    Returns:
+        list: Regression messages, empty when there is no regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if result["throughput"] < expected["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput']:.2f} items/s, "
+                               f"baseline {expected['throughput']:.2f} items/s")
+        if result["peak_memory_kb"] > expected["peak_memory_kb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {result['peak_memory_kb']:.1f} KiB, "
+                               f"baseline {expected['peak_memory_kb']:.1f} KiB")
+    return regressions
+
+
+def run_and_compare(suite: BenchmarkSuite, repeat: int = 5, tolerance: float = 0.3, only=None,
+                    update_baseline: bool = False, baseline_path: str = BASELINE_PATH, write=print) -> bool:
+    """
+    Runs the suite and compares against the baseline, or stores the results as the new baseline.
+    Returns:
+        bool: True if there is no regression.
+    """
+    results = suite.run(repeat=repeat, only=only, write=write)
+    if update_baseline:
+        baseline = load_baseline(baseline_path)
+        baseline.update(results)
+        save_baseline(baseline, baseline_path)
+        write(f"Baseline updated: {baseline_path}")
+        return True
+    regressions = compare_with_baseline(results, load_baseline(baseline_path), tolerance)
+    for regression in regressions:
+        write(f"REGRESSION {regression}")
+    if not regressions:
+        write("No regressions against the baseline.")
+    return not regressions
@@ -0,0 +1,108 @@
+""" Benchmarks of the parsing hot path and of the worker cold start. """
+import json
+import os
+import subprocess
+import sys
+
+from scraper_core.base import BaseScraper
+from scraper_core.incremental_movie_scraper import MovieScraper
+from scraper_core.records import MovieRecord
+from scraper_core.utils import convert_to_integer
+
+from .corpus import build_search_page, load_fixture, SEARCH_PAGE
+from .offline import OfflineMovieScraper, OfflineGenreKeywordScraper, extract_movies_rows
+from .runner import BenchmarkSuite
+
+LARGE_SEARCH_PAGE_ROWS = 2500
+PARSED_TAIL_MOVIES = 100
+MOVIE_COUNTS = ["7", "789", "9.8K", "64K", "381K", "1.2M", "125K", "2.9K", "22", "1B"] * 1000
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+suite = BenchmarkSuite()
+
+
+@suite.add("get_soup_search_page", items=12)
+def bench_get_soup_search_page(_):
+    BaseScraper.get_soup(load_fixture(SEARCH_PAGE))
+
+
+@suite.add("get_soup_search_page_2500", items=LARGE_SEARCH_PAGE_ROWS,
+           setup=lambda: build_search_page(LARGE_SEARCH_PAGE_ROWS))
+def bench_get_soup_large_search_page(page):
+    BaseScraper.get_soup(page)
+
+
+@suite.add("parse_movies_2500_tail", items=PARSED_TAIL_MOVIES,
+           setup=lambda: build_search_page(LARGE_SEARCH_PAGE_ROWS))
+def bench_parse_movies(page):
+    OfflineMovieScraper(page)._parse_movies(page, PARSED_TAIL_MOVIES)
+
+
+@suite.add("movies_list_page_source_2500_tail", items=PARSED_TAIL_MOVIES,
+           setup=lambda: build_search_page(LARGE_SEARCH_PAGE_ROWS))
+def bench_movies_list_page_source(page):
+    OfflineMovieScraper(page)._parse_movies_list(page, PARSED_TAIL_MOVIES)
+
+
+@suite.add("movies_list_extracted_rows_python_2500_tail", items=PARSED_TAIL_MOVIES,
+           setup=lambda: extract_movies_rows(build_search_page(LARGE_SEARCH_PAGE_ROWS), PARSED_TAIL_MOVIES))
+def bench_movies_list_extracted(payload):
+    # Python side only of the in browser extraction: decoding the rows `_EXTRACT_MOVIES_SCRIPT` returns. The script
+    # itself runs in Chrome and is not timed, compare with movies_list_page_source_2500_tail for the parser side only
+    [MovieScraper._movie_record(*row) for row in json.loads(payload)]
+
+
+@suite.add("parse_movie_detail_info", setup=lambda: OfflineMovieScraper(load_fixture(SEARCH_PAGE)))
+def bench_parse_movie_detail_info(scraper):
+    scraper._parse_movie_detail_info(MovieRecord(movie_info_url="/title/tt0111161/?ref_=sr_t_1"))
+
+
+@suite.add("extract_genres", setup=lambda: OfflineGenreKeywordScraper().get_soup(load_fixture(SEARCH_PAGE)))
+def bench_extract_genres(soup):
+    OfflineGenreKeywordScraper()._extract_genres(soup)
+
+
+@suite.add("extract_keywords")
+def bench_extract_keywords(_):
+    scraper = OfflineGenreKeywordScraper()
+    scraper._parse_keywords(scraper.get_soup(scraper._get_keywords_extended_page()))
+
+
+@suite.add("convert_to_integer", items=len(MOVIE_COUNTS))
+def bench_convert_to_integer(_):
+    for value in MOVIE_COUNTS:
+        convert_to_integer(value)
+
+
+def run_cold(script: str, env: dict = None):
+    """ Runs the script in a fresh interpreter, nothing is imported or cached yet. """
+    subprocess.run([sys.executable, "-c", script], cwd=PROJECT_DIR, check=True, env={**os.environ, **(env or {})})
+
+
+def cold_peak_memory_kb(script: str, env: dict = None) -> float:
+    """
+    Runs the script in a fresh interpreter traced from its start, the peak memory is measured in the child process.
+    Returns:
+        float: Peak traced memory of the child in KiB.
+    """
+    script = f"{script}\nimport tracemalloc\nprint(tracemalloc.get_traced_memory()[1])"
+    output = subprocess.run([sys.executable, "-X", "tracemalloc", "-c", script], cwd=PROJECT_DIR, check=True,
+                            env={**os.environ, **(env or {})}, capture_output=True, text=True).stdout
+    return int(output.split()[-1]) / 1024
+
+
+IMPORT_SCRAPERS_SCRIPT = ("import scraper_core.incremental_movie_scraper, scraper_core.genre_keywords_scraper, "
+                          "scraper_core.async_movie_scraper, scraper_core.query_shard_planner")
+WARM_UP_SCRIPT = "from scraper_core.base import warm_up; warm_up(browser=False)"
+
+
+@suite.add("cold_start_import_scrapers", memory=lambda _: cold_peak_memory_kb(IMPORT_SCRAPERS_SCRIPT))
+def bench_cold_start_import_scrapers(_):
+    # Paid by every process importing the scrapers, selenium and the parser are loaded on first use
+    run_cold(IMPORT_SCRAPERS_SCRIPT)
+
+
+@suite.add("cold_start_warm_up", memory=lambda _: cold_peak_memory_kb(WARM_UP_SCRIPT))
+def bench_cold_start_warm_up(_):
+    # Worker warm up without the browser, which needs Chrome
+    run_cold(WARM_UP_SCRIPT)
@@ -1,9 +1,40 @@
 """ Scraper configuration module to keep scraper related configs.
     Change here in case of IMDB source changes the endpoint/URL.
 """
+import os
 
-BASE_URL = "https://www.imdb.com/"
+# Overridable to point the scrapers at a local IMDb stand-in, e.g. http://127.0.0.1:8765/
+BASE_URL = os.environ.get("IMDB_BASE_URL", "https://www.imdb.com/")
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+)
 MOVIE_URL = f"search/title/?title_type=feature"
+FIRST_RELEASE_YEAR = 1874  # Earliest release year on IMDb, first year of the query shards
 HEADLESS_MODE = True
+# Extract the needed fields of the search page in the browser instead of transferring the page source
+IN_BROWSER_EXTRACTION = True
 
-#
+# Egress pool settings, see egress.py. Requests are spread over the direct connection and the proxies of EGRESS_PROXIES
+# (comma separated proxy URLs), every egress sends its own user agent profile and has its own rate budget.
+EGRESS_PROXIES = [proxy.strip() for proxy in os.environ.get("EGRESS_PROXIES", "").split(",") if proxy.strip()]
+EGRESS_DIRECT = os.environ.get("EGRESS_DIRECT", "True").lower() in ("1", "true", "yes")  # Always on without proxies
+EGRESS_RATE_PER_SECOND = float(os.environ.get("EGRESS_RATE_PER_SECOND", 0))  # Per egress, 0 is unlimited
+EGRESS_BURST = 5  # Requests an idle egress sends at once
+# Processes sending requests through the same egresses, e.g. the Q workers. The budgets are per process state,
+# the rate, burst and in flight limit of every egress are split between the processes
+EGRESS_PROCESSES = int(os.environ.get("EGRESS_PROCESSES", 1))
+EGRESS_MAX_IN_FLIGHT = int(os.environ.get("EGRESS_MAX_IN_FLIGHT", 0))  # Concurrent requests per egress, 0 is unlimited
+EGRESS_ACQUIRE_TIMEOUT = 60  # Seconds a request waits for an egress with budget left before it fails
+EGRESS_EJECT_BELOW = 0.5  # Health score (smoothed success rate) below which an egress is ejected
+EGRESS_EJECT_SECONDS = 30  # First ejection, doubled on every repeated ejection of the egress
+EGRESS_MAX_EJECT_SECONDS = 600
+EGRESS_USER_AGENTS = [
+    USER_AGENT,
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/114.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/16.5 Safari/605.1.15",
+]
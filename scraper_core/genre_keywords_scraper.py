@@ -1,39 +1,57 @@
 """ Scraps Genres, Keywords and total movie counts """
-
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseScraper, SeleniumBase
 from .constants import BASE_URL, MOVIE_URL, HEADLESS_MODE
+from .metrics import metrics
 from .utils import convert_to_integer
 
+_KEYWORDS_EXPAND_XPATH = '//*[@id="keywordsAccordion"]/div[1]/label/span[2]'
+# Relative to the keywords accordion, unlike an absolute path it survives layout changes around the filters
+_KEYWORDS_SEE_MORE_XPATH = "//div[@id='accordion-item-keywordsAccordion']//button[contains(@class, 'ipc-see-more')]"
+
 
 class GenreKeywordScraper(BaseScraper):
     """
     Scraper for extracting genres and keywords from IMDb.
+    Genres and the top keywords come with the search page fetched over HTTP, the browser is only needed for the
+    keywords behind "See more keywords" and runs concurrently with the HTTP fetch.
     """
 
-    def __init__(self, movie_page_size: int = 250):
+    def __init__(self, movie_page_size: int = 250, expand_keywords: bool = True):
         """
         Initialize the scraper to get the genres, keywords and total movie counts.
         Args:
             movie_page_size(int): maximum movies per page
+            expand_keywords (bool): Expand "See more keywords" in the browser. When False only the keywords of
+                the search page are scraped, no browser is started.
         """
         super().__init__(BASE_URL)
 
         self.movie_page_size = movie_page_size
+        self.expand_keywords = expand_keywords
         self.endpoint = f"{MOVIE_URL}&count={self.movie_page_size}"
         self.selenium = SeleniumBase(BASE_URL, HEADLESS_MODE)
 
-    def scrape(self) -> dict:
+    def scrape(self, known_counts: dict = None) -> dict:
         """
         Scrapes genres and keywords from the IMDb page.
+        Args:
+            known_counts (dict) (Optional): Tag name to the movies count of the last run. When given, only the
+                tags whose count changed or which are new are returned.
         Returns:
             dict: A dictionary containing genres and keywords
         """
-        soup = self.fetch_page(self.endpoint)
-        genres = self._extract_genres(soup)
-        keywords = self._extract_keywords()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            expanded_page = executor.submit(self._get_keywords_extended_page) if self.expand_keywords else None
+            soup = self.fetch_page(self.endpoint)
+            with metrics.timer("extract_genres"):
+                genres = self._extract_genres(soup)
+            with metrics.timer("extract_keywords"):
+                keywords = self._extract_keywords(soup, expanded_page)
+        if known_counts is not None:
+            genres = changed_tags(genres, known_counts)
+            keywords = changed_tags(keywords, known_counts)
         return {"genres": genres, "keywords": keywords}
 
     def _extract_genres(self, soup) -> list:
@@ -63,16 +81,36 @@ class GenreKeywordScraper(BaseScraper):
             raise ValueError(f"Error extracting genres from scraped gener data: {e}")
         return genres
 
-    def _extract_keywords(self) -> list:
+    def _extract_keywords(self, soup, expanded_page=None) -> list:
         """
-        Extracts keywords from the IMDb page.
+        Extracts keywords from the IMDb page. Keywords of the expanded panel are preferred, the keywords of the
+        search page are kept when the browser fails.
+        Args:
+            soup (BeautifulSoup): Parsed HTML content of the search page.
+            expanded_page (Future) (Optional): Page source with the keywords panel expanded.
+        Returns:
+            list: A list of dictionaries with keyword names and movies count.
+        """
+        keywords = self._parse_keywords(soup)
+        if expanded_page is None:
+            return keywords
+        try:
+            return self._parse_keywords(self.get_soup(expanded_page.result())) or keywords
+        except Exception as e:
+            print(f"Keywords panel expansion failed, keeping the {len(keywords)} keywords of the search page. {e}")
+            return keywords
+
+    @classmethod
+    def _parse_keywords(cls, soup) -> list:
+        """
+        Parses the keywords accordion.
+        Args:
+            soup (BeautifulSoup): Parsed HTML content.
         Returns:
             list: A list of dictionaries with keyword names and movies count.
         """
         keywords = []
         try:
-            page_source = self._get_keywords_extended_page()
-            soup = self.get_soup(page_source)
             keyword_section = soup.find("div", id="accordion-item-keywordsAccordion")
             if keyword_section:
                 buttons = keyword_section.find_all("button")
@@ -83,24 +121,39 @@ class GenreKeywordScraper(BaseScraper):
                     k_count = convert_to_integer(count_span.text) if count_span else 0
                     if keyword_name and k_count > 0:
                         keywords.append({"name": keyword_name, "count": k_count})
+        except Exception as e:
+            raise ValueError(f"Error extracting keywords from scraped gener data: {e}")
+        return keywords
+
+    def _get_keywords_extended_page(self):
+        """ Loads all keywords """
+        from selenium.common.exceptions import NoSuchElementException, TimeoutException
+        from selenium.webdriver.common.by import By
+
+        try:
+            with metrics.timer("expand_keywords"):
+                self.selenium.load_page(self.endpoint)
+                # Click expand all button to expand the filters accordian
+                self.selenium.click_element(By.XPATH, _KEYWORDS_EXPAND_XPATH)
+                # Click "See more keywords" button to load all possible keywords present
+                self.selenium.click_element(By.XPATH, _KEYWORDS_SEE_MORE_XPATH)
+                self.selenium.scroll_down_once()
+                return self.selenium.get_page_source()
         except NoSuchElementException as e:
             raise ValueError(f"Element not found in extract_keywords. {e}")
         except TimeoutException as e:
             raise ValueError(f"Command Timeout in extract_keywords. {e}")
-        except Exception as e:
-            raise ValueError(f"Error extracting keywords from scraped gener data: {e}")
         finally:
             self.selenium.close()  # Close the driver
-        return keywords
 
-    def _get_keywords_extended_page(self):
-        """ Loads all keywords """
-        self.selenium.load_page(self.endpoint)
-        # Click expand all button to expand the filters accordian
-        self.selenium.click_element(By.XPATH, '//*[@id="keywordsAccordion"]/div[1]/label/span[2]')
-        # Click "See more keywords" button to load all possible keywords present
-        self.selenium.click_element(By.XPATH, '/html/body/div[2]/main/div[2]/div[3]/section/section/div/section/'
-                                              'section/div[2]/div/section/div[2]/div[1]/section/div/div[14]/div[2]/'
-                                              'div/div/button')
-        self.selenium.scroll_down_once()
-        return self.selenium.get_page_source()
+
+def changed_tags(tags: list, known_counts: dict) -> list:
+    """
+    Filters the scraped tags down to the ones whose movies count changed since the last run.
+    Args:
+        tags (list): Scraped genres or keywords, dictionaries with name and count.
+        known_counts (dict): Tag name to the movies count of the last run.
+    Returns:
+        list: The new tags and the tags whose count changed.
+    """
+    return [tag for tag in tags if known_counts.get(tag["name"]) != tag["count"]]
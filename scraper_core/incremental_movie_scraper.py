@@ -1,27 +1,58 @@
 """ Scraps movies with handling multiple pagination. """
+import json
 import math
-
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+import re
 
 from .base import BaseScraper, SeleniumBase
-from .constants import BASE_URL, MOVIE_URL, HEADLESS_MODE
+from .constants import BASE_URL, MOVIE_URL, HEADLESS_MODE, IN_BROWSER_EXTRACTION
+from .metrics import metrics
+from .parse_health import ParseHealthError, ParseHealthSampler
+from .records import MovieRecord
+
+_IMDB_ID_PATTERN = re.compile(r"tt\d+")
+
+# Runs in the page, returns the list level fields of the last `arguments[0]` movies as compact JSON rows of
+# [title, year, rating, plot_summary, movie_info_url]. Selectors mirror `_parse_movie_item`.
+_EXTRACT_MOVIES_SCRIPT = """
+var items = Array.prototype.slice.call(document.querySelectorAll('li.ipc-metadata-list-summary-item'));
+function text(item, selector) { var node = item.querySelector(selector); return node ? node.textContent : null; }
+return JSON.stringify(items.slice(-arguments[0]).map(function (item) {
+  var link = item.querySelector('a.ipc-lockup-overlay.ipc-focusable');
+  return [text(item, 'h3.ipc-title__text'), text(item, 'span.sc-300a8231-7'),
+          text(item, 'span.ipc-rating-star--rating'), text(item, 'div.ipc-html-content-inner-div'),
+          link ? link.getAttribute('href') : null];
+}));
+"""
 
 
 class MovieScraper(BaseScraper):
     """ Scraper for extracting movies from IMDb for given Genre or keyword. """
 
-    def __init__(self, genre: str = None, keyword: str = None):
+    def __init__(self, genre: str = None, keyword: str = None, fetch_keywords: bool = True,
+                 release_years: tuple = None, in_browser_extraction: bool = IN_BROWSER_EXTRACTION,
+                 parse_health: ParseHealthSampler = None):
         """
         Initialize the scraper to get the genres, keywords and total movie counts.
         Args:
             genre (str) (Optional): Movies to be scraped for Genre
             keyword (str) (Optional): Movies to be scraped for keyword
+            fetch_keywords (bool): Fetch the keywords page of every movie. When False the keywords are left
+                for a later enrichment stage and the movies are returned with `keywords_fetched` False.
+            release_years (tuple) (Optional): First and last release year, restricts the search to a shard
+                of the genre or keyword, see `QueryShardPlanner`.
+            in_browser_extraction (bool): Extract the list level fields of the movies in the browser instead of
+                transferring and parsing the whole page source.
+            parse_health (ParseHealthSampler) (Optional): Checks the parsed fields of the first movies of every
+                batch, the batch is aborted with ParseHealthError when the IMDb markup changed.
         """
         super().__init__(BASE_URL)
 
         self.genre = genre
         self.keyword = keyword
+        self.fetch_keywords = fetch_keywords
+        self.release_years = release_years
+        self.in_browser_extraction = in_browser_extraction
+        self.parse_health = parse_health
 
         self._selenium = SeleniumBase(BASE_URL, HEADLESS_MODE)
 
@@ -29,12 +60,24 @@ class MovieScraper(BaseScraper):
         """
         Prepares scrape URL for fetching the movies for given genre or keyword
         """
-        if self.genre:
-            return f"{MOVIE_URL}&count={movie_page_size}&genres={self.genre}"
-        elif self.keyword:
-            return f"{MOVIE_URL}&count={movie_page_size}&keywords={self.keyword}"
+        return self._search_endpoint(movie_page_size, self.genre, self.keyword, self.release_years)
+
+    @classmethod
+    def _search_endpoint(cls, movie_page_size: int, genre: str = None, keyword: str = None,
+                         release_years: tuple = None):
+        """
+        Search URL of the movies for given genre or keyword, optionally restricted to the release years.
+        """
+        if genre:
+            endpoint = f"{MOVIE_URL}&count={movie_page_size}&genres={genre}"
+        elif keyword:
+            endpoint = f"{MOVIE_URL}&count={movie_page_size}&keywords={keyword}"
         else:
             raise ValueError("Either Genre or Keyword is required to fetch the movies")
+        if release_years:
+            first_year, last_year = release_years
+            endpoint = f"{endpoint}&release_date={first_year}-01-01,{last_year}-12-31"
+        return endpoint
 
     def _click_see_more(self, num_of_clicks: int):
         """
@@ -42,80 +85,267 @@ class MovieScraper(BaseScraper):
         Args:
             num_of_clicks (int): Number of times to click the "See more" button.
         """
+        from selenium.common.exceptions import NoSuchElementException, TimeoutException
+        from selenium.webdriver.common.by import By
+
         for i in range(num_of_clicks):
             try:
-                self._selenium.click_element(By.XPATH, "//span[contains(@class, 'single-page-see-more-button')]/button")
+                with metrics.timer("click_see_more"):
+                    self._selenium.click_element(
+                        By.XPATH, "//span[contains(@class, 'single-page-see-more-button')]/button")
             except NoSuchElementException:
                 raise ValueError(f"Incremental movie scraper, 'See more' button not found after {i} clicks.")
             except TimeoutException:
                 raise ValueError(f"Incremental movie scraper, Timeout occurred while clicking the 'See more' button.")
 
-    def batch_scrape(self, num_of_clicks: int, parse_movies_data_count: int, movie_page_size: int):
+    def batch_scrape(self, num_of_clicks: int, parse_movies_data_count: int, movie_page_size: int,
+                     known_movies_lookup=None):
         """
         Scrape movies for the given batch size.
         Args:
             num_of_clicks (int): Number of batches to fetch. Each batch corresponds to clicking the "See more" button.
             parse_movies_data_count(int): Number of movies to be parsed for this request
             movie_page_size(int): Number of movies per page
+            known_movies_lookup (callable) (Optional): Called with the list level movie records, returns the imdb ids
+                of the movies already known. Details of known movies are not fetched.
+        """
+        movie_records = self._load_movies_list(num_of_clicks, movie_page_size, parse_movies_data_count)
+        # Parse the movies
+        with metrics.timer("parse_movies"):
+            return self._parse_movies_details(movie_records, known_movies_lookup)
+
+    def _load_search_page(self, num_of_clicks: int, movie_page_size: int, extract):
+        """
+        Loads the search page in the browser, clicks "See more" and extracts the page content.
+        Args:
+            num_of_clicks (int): Number of times to click the "See more" button.
+            movie_page_size(int): Number of movies per page
+            extract (callable): Called once the movies are loaded, returns the content of the page.
+        Returns:
+            The content returned by extract.
         """
         try:
             endpoint = self._prepare_endpoint(movie_page_size)
             self._selenium.load_page(endpoint)
             # Click the "See more" button num_of_pages times
             self._click_see_more(num_of_clicks)
-            page_source = self._selenium.get_page_source()
+            return extract()
         except Exception as e:
             raise ValueError(f"Batch Scrape issue. {e}")
         finally:
             self._selenium.close()  # Close the Selenium driver
-        # Parse the movies
-        return self._parse_movies(page_source, parse_movies_data_count)
 
-    def _parse_movies(self, page_source: str, parse_movies_data_count: int):
+    def _load_search_page_source(self, num_of_clicks: int, movie_page_size: int):
+        """
+        Loads the search page in the browser, clicks "See more" and returns the page source.
+        Args:
+            num_of_clicks (int): Number of times to click the "See more" button.
+            movie_page_size(int): Number of movies per page
+        Returns:
+            str: HTML content of the page.
+        """
+        return self._load_search_page(num_of_clicks, movie_page_size, self._selenium.get_page_source)
+
+    def _load_movies_list(self, num_of_clicks: int, movie_page_size: int, parse_movies_data_count: int):
+        """
+        Loads the search page and returns the list level data of the last movies. With in browser extraction
+        only the needed fields of these movies leave the browser, otherwise the page source is parsed.
+        Args:
+            num_of_clicks (int): Number of times to click the "See more" button.
+            movie_page_size(int): Number of movies per page
+            parse_movies_data_count(int): number of movies to be parsed from end
+        Returns:
+            list: List level movie records, see `_parse_movie_item`.
+        """
+        if not self.in_browser_extraction:
+            page_source = self._load_search_page_source(num_of_clicks, movie_page_size)
+            with metrics.timer("parse_movies_list"):
+                return self._parse_movies_list(page_source, parse_movies_data_count)
+        rows = self._load_search_page(num_of_clicks, movie_page_size,
+                                      lambda: self._extract_movies_rows(parse_movies_data_count))
+        print(f"Extracted movies list successfully. Total: {len(rows)}")
+        return [self._movie_record(*row) for row in rows]
+
+    def _extract_movies_rows(self, parse_movies_data_count: int):
+        """ Runs the extraction script in the loaded page, returns the rows of the last movies. """
+        with metrics.timer("extract_movies_list"):
+            payload = self._selenium.execute_script(_EXTRACT_MOVIES_SCRIPT, parse_movies_data_count)
+        metrics.inc("scraper_extracted_bytes_total", len(payload))
+        return json.loads(payload)
+
+    def _parse_movies(self, page_source: str, parse_movies_data_count: int, known_movies_lookup=None):
         """
         Parse movies with the BeautifulSoup.
         Args:
             page_source (HTML): HTML content of the page.
             parse_movies_data_count(int): number of movies to be parsed from end
+            known_movies_lookup (callable) (Optional): Returns the imdb ids of already known movies.
+        Returns:
+            list: List of movie records. Records with `detail_fetched` False only have the list level fields.
+        """
+        try:
+            movie_records = self._parse_movies_list(page_source, parse_movies_data_count)
+        except Exception as e:
+            raise ValueError(f"Movie data parsing Issue. {e}")
+        return self._parse_movies_details(movie_records, known_movies_lookup)
+
+    def _parse_movies_details(self, movie_records: list, known_movies_lookup=None):
+        """
+        Completes the list level movie records with the detail pages of the movies which are not known yet.
+        Args:
+            movie_records (list): List level movie records.
+            known_movies_lookup (callable) (Optional): Returns the imdb ids of already known movies.
         Returns:
-            list: List of parsed movie data.
+            list: List of movie records. Records with `detail_fetched` False only have the list level fields.
+        Raises:
+            ParseHealthError: The parse health check of the first movies failed, no further detail page is fetched.
         """
         try:
-            soup = self.get_soup(page_source)
-            movies = []
-            movie_items = soup.find_all("li", class_="ipc-metadata-list-summary-item")[-parse_movies_data_count:]
-            print(f"Scraped movies list successfully. Total: {len(movie_items)}")
+            if self.parse_health:
+                self.parse_health.check_list(movie_records)
+            known_imdb_ids = self._lookup_known_movies(movie_records, known_movies_lookup)
+            detail_records = self._detail_records(movie_records, known_imdb_ids)
+            sample_size = min(self.parse_health.sample_size, len(detail_records)) if self.parse_health else 0
             print("Scraping movie details ...")
-            for movie_item in movie_items:
-                title_tag = movie_item.find("h3", class_="ipc-title__text")
-                year_tag = movie_item.find("span", class_="sc-300a8231-7")
-                rating_tag = movie_item.find("span", class_="ipc-rating-star--rating")
-                summary_tag = movie_item.find("div", class_="ipc-html-content-inner-div")
-                movie_info_tag = movie_item.find("a", class_="ipc-lockup-overlay ipc-focusable")
-                title = title_tag.text.split('.')[1] if title_tag else "N/A"
-                year = year_tag.text if year_tag and year_tag.text.isdigit() else 0
-                rating = rating_tag.text.strip() if rating_tag else 0
-                plot_summary = summary_tag.text if summary_tag else "N/A"
-                movie_info_data = self._parse_movie_detail_info(
-                    movie_info_tag.attrs.get("href")) if movie_info_tag else {}
-                movies.append({
-                    **{"title": title, "year": year, "rating": rating, "plot_summary": plot_summary},
-                    **movie_info_data
-                })
+            for position, movie_record in enumerate(detail_records, 1):
+                self._parse_movie_detail_info(movie_record)
+                if position == sample_size:
+                    self.parse_health.check_details(detail_records[:sample_size])
+            metrics.inc("scraper_movies_parsed_total", len(movie_records))
+        except ParseHealthError:
+            raise
         except Exception as e:
             raise ValueError(f"Movie data parsing Issue. {e}")
         print(f"Scraped movie details successfully")
-        return movies
+        return movie_records
+
+    @classmethod
+    def _parse_movies_list(cls, page_source: str, parse_movies_data_count: int):
+        """
+        Parses the list level fields of the movies of the search page.
+        Args:
+            page_source (HTML): HTML content of the page.
+            parse_movies_data_count(int): number of movies to be parsed from end
+        Returns:
+            list: List level movie records, see `_parse_movie_item`.
+        """
+        movie_items = cls._find_movie_items(page_source, parse_movies_data_count)
+        print(f"Scraped movies list successfully. Total: {len(movie_items)}")
+        return [cls._parse_movie_item(movie_item) for movie_item in movie_items]
+
+    @classmethod
+    def _detail_records(cls, movie_records: list, known_imdb_ids: set):
+        """ Movie records whose detail pages are fetched, the movies with a movie page which are not known yet. """
+        return [movie_record for movie_record in movie_records
+                if movie_record.movie_info_url and movie_record.imdb_id not in known_imdb_ids]
 
-    def _parse_movie_detail_info(self, movie_info_url: str):
+    @classmethod
+    def _lookup_known_movies(cls, movie_records: list, known_movies_lookup=None):
         """
-        Parses movie details including directors, casts, genres, and keywords from the given movie page URL.
+        Looks up the movies of the list which are already known, their detail pages are not fetched.
         Args:
-            movie_info_url (str): The URL of the movie details page.
+            movie_records (list): List level movie records.
+            known_movies_lookup (callable) (Optional): Returns the imdb ids of already known movies.
         Returns:
-            dict: A dictionary containing directors, casts, genres, and keywords.
+            set: imdb ids of the known movies.
+        """
+        if not known_movies_lookup:
+            return set()
+        known_imdb_ids = set(known_movies_lookup(movie_records))
+        metrics.inc("scraper_known_movies_total", len(known_imdb_ids))
+        print(f"Known movies, linked without fetching details: {len(known_imdb_ids)}")
+        return known_imdb_ids
+
+    @classmethod
+    def _find_movie_items(cls, page_source: str, parse_movies_data_count: int):
+        """
+        Finds the movie list items of the search page.
+        Args:
+            page_source (HTML): HTML content of the page.
+            parse_movies_data_count(int): number of movies to be parsed from end
+        Returns:
+            list: The last `parse_movies_data_count` movie items.
+        """
+        soup = cls.get_soup(page_source)
+        return soup.find_all("li", class_="ipc-metadata-list-summary-item")[-parse_movies_data_count:]
+
+    @classmethod
+    def _parse_movie_item(cls, movie_item):
+        """
+        Parses the list level fields of a movie item of the search page.
+        Args:
+            movie_item (Tag): Movie list item.
+        Returns:
+            MovieRecord: title, year, rating, plot_summary, imdb_id and the movie_info_url of the movie page.
+        """
+        return cls._movie_record(*cls._movie_item_fields(movie_item))
+
+    @classmethod
+    def _movie_item_fields(cls, movie_item):
+        """
+        Raw texts of a movie item, the same row `_EXTRACT_MOVIES_SCRIPT` returns from the browser.
+        Args:
+            movie_item (Tag): Movie list item.
+        Returns:
+            tuple: title, year, rating, plot_summary and movie_info_url, None for missing elements.
+        """
+        title_tag = movie_item.find("h3", class_="ipc-title__text")
+        year_tag = movie_item.find("span", class_="sc-300a8231-7")
+        rating_tag = movie_item.find("span", class_="ipc-rating-star--rating")
+        summary_tag = movie_item.find("div", class_="ipc-html-content-inner-div")
+        movie_info_tag = movie_item.find("a", class_="ipc-lockup-overlay ipc-focusable")
+        return (
+            title_tag.text if title_tag else None,
+            year_tag.text if year_tag else None,
+            rating_tag.text if rating_tag else None,
+            summary_tag.text if summary_tag else None,
+            movie_info_tag.attrs.get("href") if movie_info_tag else None,
+        )
+
+    @classmethod
+    def _movie_record(cls, title: str, year: str, rating: str, plot_summary: str, movie_info_url: str):
+        """
+        Builds the list level movie record from the raw texts of a movie item, None for missing elements.
+        Shared by the page source parser and the in browser extraction.
+        Returns:
+            MovieRecord: title, year, rating, plot_summary, imdb_id and the movie_info_url of the movie page.
+        """
+        imdb_id = _IMDB_ID_PATTERN.search(movie_info_url) if movie_info_url else None
+        # Positional arguments, the record is built once per listed movie
+        return MovieRecord(
+            title.split('.')[1] if title is not None else "N/A",
+            year if year and year.isdigit() else 0,
+            rating.strip() if rating is not None else 0,
+            plot_summary if plot_summary is not None else "N/A",
+            imdb_id.group(0) if imdb_id else None,
+            movie_info_url,
+        )
+
+    def _parse_movie_detail_info(self, movie_record: MovieRecord):
+        """
+        Completes the movie record with directors, casts, genres, and keywords (unless deferred) from its
+        movie page and keywords page.
+        Args:
+            movie_record (MovieRecord): List level movie record with the movie page URL.
+        Returns:
+            MovieRecord: The completed movie record.
+        """
+        with metrics.timer("movie_detail"):
+            movie_record.set_details(*self._parse_movie_page(self.fetch_page(movie_record.movie_info_url)))
+            if self.fetch_keywords:
+                soup = self.fetch_page(self._keywords_endpoint(movie_record.movie_info_url))
+                movie_record.set_keywords(self._parse_keywords_page(soup))
+        return movie_record
+
+    @classmethod
+    def _parse_movie_page(cls, soup):
+        """
+        Parses directors, casts and genres of the movie page.
+        Args:
+            soup (BeautifulSoup): Parsed movie page.
+        Returns:
+            tuple: directors, casts and genres.
         """
-        soup = self.fetch_page(movie_info_url)
         # Extract directors
         director_span = soup.find("span", text="Director")
         directors = [
@@ -133,19 +363,63 @@ class MovieScraper(BaseScraper):
         # Extract genre
         genre_section = soup.find("div", {"data-testid": "interests"})
         genres = [genre.get_text(strip=True) for genre in genre_section.find_all("a")] if genre_section else []
+        return directors, casts, genres
+
+    @classmethod
+    def _keywords_endpoint(cls, movie_info_url: str):
+        """ Endpoint of the keywords page of the given movie page URL. """
+        return f"{movie_info_url.split('?')[0]}keywords/"
+
+    @classmethod
+    def _movie_info_url(cls, imdb_id: str):
+        """ Movie page URL of the given imdb id. """
+        return f"/title/{imdb_id}/"
 
-        # Extract Keywords
-        soup = self.fetch_page(f"{movie_info_url.split('?')[0]}keywords/")
+    @classmethod
+    def _parse_keywords_page(cls, soup):
+        """
+        Parses the keywords page of a movie.
+        Args:
+            soup (BeautifulSoup): Parsed keywords page.
+        Returns:
+            list: Keywords of the movie.
+        """
         keys = soup.find_all("li", {"data-testid": "list-summary-item"})
-        keywords = [key.get_text(strip=True) for k in keys for key in k.find_all("a")]
-        return {"directors": directors, "casts": casts, "genres": genres, "keywords": keywords}
+        return [key.get_text(strip=True) for k in keys for key in k.find_all("a")]
+
+
+class MovieKeywordScraper(BaseScraper):
+    """ Scraper for the keywords of already saved movies, the deferred enrichment stage of the movie scraper. """
+
+    def __init__(self):
+        super().__init__(BASE_URL)
+
+    def scrape(self, imdb_ids: list):
+        """
+        Scrapes the keywords pages of the given movies. Failed pages are skipped, the movies stay without keywords
+        until they are enriched again, e.g. by the periodic keyword enrichment sweep.
+        Args:
+            imdb_ids (list): imdb ids of the movies.
+        Returns:
+            dict: imdb id to the list of keywords of the movie.
+        """
+        keywords = {}
+        for imdb_id in imdb_ids:
+            try:
+                with metrics.timer("movie_keywords"):
+                    soup = self.fetch_page(MovieScraper._keywords_endpoint(MovieScraper._movie_info_url(imdb_id)))
+                keywords[imdb_id] = MovieScraper._parse_keywords_page(soup)
+            except ValueError as e:
+                print(f"Keywords scrape failed for {imdb_id}. {e}")
+        return keywords
 
 
 class IncrementalMovieScraper(MovieScraper):
     """ Incremental Movie scraper extending movie scraper. """
 
-    def __init__(self, movies_count: int, genre: str = None, keyword: str = None, movie_page_size: int = 250):
-        super().__init__(genre, keyword)
+    def __init__(self, movies_count: int, genre: str = None, keyword: str = None, movie_page_size: int = 250,
+                 fetch_keywords: bool = True, release_years: tuple = None, parse_health: ParseHealthSampler = None):
+        super().__init__(genre, keyword, fetch_keywords, release_years, parse_health=parse_health)
 
         self.movies_count = movies_count
         self.movie_page_size = movie_page_size
@@ -184,15 +458,15 @@ class IncrementalMovieScraper(MovieScraper):
                 requests.append((0, first_load_left_movies))
         return requests
 
-    def scrape_first_batch_data(self, first_load_movies: int):
+    def scrape_first_batch_data(self, first_load_movies: int, known_movies_lookup=None):
         """
         Scrapes the first batch of movie data without performing any clicks. This batch fetches either
         the first `first_load_movies` movies or the total available movies, whichever is smaller.
         Args:
             first_load_movies (int): The number of movies to be fetched in the first batch scrape.
+            known_movies_lookup (callable) (Optional): Returns the imdb ids of already known movies.
         Returns:
-            list: A list containing the movie data for the first batch, fetched without any clicks.
+            list: A list containing the movie records of the first batch, fetched without any clicks.
         """
         parse_movies_data_count = min(self.movies_count, first_load_movies)
-        movie_data = self.batch_scrape(0, parse_movies_data_count, parse_movies_data_count)
-        return movie_data
+        return self.batch_scrape(0, parse_movies_data_count, parse_movies_data_count, known_movies_lookup)
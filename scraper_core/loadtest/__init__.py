@@ -0,0 +1 @@
+""" Offline load testing against a local IMDb stand-in server. """
@@ -0,0 +1,100 @@
+"""
+Offline load testing against a local IMDb stand-in.
+    python -m scraper_core.loadtest serve --port 8765 --latency-ms 50 --throttle-rate 0.02
+    python -m scraper_core.loadtest fetch --requests 2000 --concurrency 16 --latency-ms 50
+    python -m scraper_core.loadtest fetch --requests 600 --concurrency 16 --client-rate 20 --proxies 4 --egress-rate 20
+    python -m scraper_core.loadtest batch --batches 4 --concurrency 2 --clicks 1 --parse-count 100
+"""
+import argparse
+import json
+import os
+
+from .fake_imdb import FakeImdbConfig, FakeImdbServer
+from .fake_proxy import FakeProxyServer
+
+
+def _add_server_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="Port of the stand-in server, 0 picks a free port.")
+    parser.add_argument("--total-movies", type=int, default=5000, help="Movies available for every search.")
+    parser.add_argument("--page-size", type=int, default=250, help="Movies appended by a 'See more' click.")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latency added to every response.")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random latency added on top.")
+    parser.add_argument("--error-rate", type=float, default=0, help="Probability of HTTP 500 responses.")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Probability of HTTP 429 responses.")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs.")
+    parser.add_argument("--client-rate", type=float, default=0,
+                        help="Requests per second tolerated per client (HTTP 429 above), 0 for no limit.")
+
+
+def _start_server(args) -> FakeImdbServer:
+    config = FakeImdbConfig(args.total_movies, args.page_size, args.latency_ms, args.jitter_ms,
+                            args.error_rate, args.throttle_rate, args.seed, client_rate=args.client_rate)
+    server = FakeImdbServer(args.host, args.port, config)
+    # The scrapers read the base URL from the environment at import time
+    os.environ["IMDB_BASE_URL"] = server.base_url
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load testing against a local IMDb stand-in.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Runs the stand-in server until interrupted.")
+    _add_server_arguments(serve)
+    fetch = commands.add_parser("fetch", help="Load test of fetch_page on title and keyword pages.")
+    _add_server_arguments(fetch)
+    fetch.add_argument("--requests", type=int, default=1000)
+    fetch.add_argument("--concurrency", type=int, default=8)
+    fetch.add_argument("--proxies", type=int, default=0,
+                       help="Egresses through local proxy stand-ins, every proxy is a distinct client.")
+    fetch.add_argument("--egress-rate", type=float, default=0, help="Requests per second budget of every egress.")
+    batch = commands.add_parser("batch", help="Load test of batch_scrape through Chrome.")
+    _add_server_arguments(batch)
+    batch.add_argument("--batches", type=int, default=4)
+    batch.add_argument("--concurrency", type=int, default=2)
+    batch.add_argument("--clicks", type=int, default=1)
+    batch.add_argument("--parse-count", type=int, default=100)
+    args = parser.parse_args()
+
+    server = _start_server(args)
+    if args.command == "serve":
+        print(f"Fake IMDb serving at {server.base_url}, export IMDB_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    from .runner import fetch_page_load, batch_scrape_load
+
+    server.start_in_background()
+    proxies = []
+    try:
+        if args.command == "fetch":
+            from scraper_core.egress import EgressPool, get_egress_pool, set_egress_pool
+
+            proxies = [FakeProxyServer(args.host, identity=f"proxy{position}")
+                       for position in range(1, args.proxies + 1)]
+            for proxy in proxies:
+                proxy.start_in_background()
+            set_egress_pool(EgressPool.from_config([proxy.proxy_url for proxy in proxies], direct=not proxies,
+                                                   rate=args.egress_rate))
+            report = fetch_page_load(server.base_url, args.requests, args.concurrency)
+            report["egresses"] = get_egress_pool().snapshot()
+        else:
+            report = batch_scrape_load(args.batches, args.concurrency, args.clicks, args.parse_count,
+                                       args.page_size)
+        report["server"] = server.stats.as_dict()
+        print(json.dumps(report, indent=2))
+    finally:
+        for proxy in proxies:
+            proxy.shutdown()
+            proxy.server_close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
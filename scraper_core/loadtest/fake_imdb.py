@@ -0,0 +1,225 @@
+""" Local IMDb stand-in server serving the fixture corpus, with configurable latency, errors and throttling. """
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from scraper_core.benchmarks.corpus import build_search_page, build_search_rows, load_fixture, TITLE_PAGE, KEYWORDS_PAGE
+
+_LIST_OPENING = "detailed-list-view"
+_TOTAL_PATTERN = re.compile(r"1-\d+ of [\d,]+")
+_TITLE_PATH = re.compile(r"^/title/tt\d+/?$")
+_KEYWORDS_PATH = re.compile(r"^/title/tt\d+/keywords/?$")
+_RELEASE_DATE = re.compile(r"^(\d{4})-\d{2}-\d{2},(\d{4})-\d{2}-\d{2}$")
+
+# Mimics the IMDb "See more" button, appends the next rows fetched from the stand-in server
+_SEE_MORE_SCRIPT = """<script>
+(function () {
+  var button = document.querySelector('.single-page-see-more-button button');
+  var list = document.querySelector('ul.detailed-list-view');
+  var loaded = list.children.length, total = %(total)d, pageSize = %(page_size)d, firstRow = %(first_row)d;
+  function toggle() { if (loaded >= total) { button.parentNode.style.display = 'none'; } }
+  button.addEventListener('click', function () {
+    button.disabled = true;
+    fetch('/_fake/rows?start=' + (firstRow + loaded) + '&count=' + Math.min(pageSize, total - loaded))
+      .then(function (response) { return response.ok ? response.text() : ''; })
+      .then(function (rows) {
+        list.insertAdjacentHTML('beforeend', rows);
+        loaded = list.children.length;
+        button.disabled = false;
+        toggle();
+      })
+      .catch(function () { button.disabled = false; });
+  });
+  toggle();
+})();
+</script>"""
+
+
+class FakeImdbConfig:
+    """ Behaviour of the stand-in server. """
+
+    def __init__(self, total_movies: int = 5000, page_size: int = 250, latency_ms: float = 0,
+                 latency_jitter_ms: float = 0, error_rate: float = 0, throttle_rate: float = 0, seed: int = None,
+                 first_year: int = 1900, last_year: int = 2024, client_rate: float = 0):
+        """
+        Args:
+            total_movies (int): Movies available for every search query.
+            page_size (int): Movies appended by one "See more" click.
+            latency_ms (float): Latency added to every response.
+            latency_jitter_ms (float): Random latency added on top of latency_ms.
+            error_rate (float): Probability of answering with HTTP 500.
+            throttle_rate (float): Probability of answering with HTTP 429.
+            seed (int) (Optional): Random seed, for reproducible runs.
+            first_year (int): Release year of the first movie, movies are spread evenly up to last_year
+                so that `release_date` filtered searches return disjoint slices of the rows.
+            last_year (int): Release year of the last movie.
+            client_rate (float): Requests per second tolerated from every client, IMDb style throttling with
+                HTTP 429 above it. Clients are told apart by X-Forwarded-For, set by the proxy stand-ins.
+                0 for no limit.
+        """
+        self.total_movies = total_movies
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.first_year = first_year
+        self.last_year = last_year
+        self.client_rate = client_rate
+
+    def release_date_rows(self, release_date: str) -> tuple:
+        """
+        Rows matching the IMDb `release_date` filter, e.g. "1990-01-01,1994-12-31".
+        Args:
+            release_date (str) (Optional): Value of the filter, all rows when empty.
+        Returns:
+            tuple: Zero based position of the first row and the number of rows.
+        """
+        match = _RELEASE_DATE.match(release_date or "")
+        if not match:
+            return 0, self.total_movies
+        years = self.last_year - self.first_year + 1
+        start, stop = (max(0, min(self.total_movies, -(-(year - self.first_year) * self.total_movies // years)))
+                       for year in (int(match.group(1)), int(match.group(2)) + 1))
+        return start, max(0, stop - start)
+
+
+class FakeImdbStats:
+    """ Thread safe counters of the served responses. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = {}
+        self.clients = {}
+        self.bytes_sent = 0
+
+    def record(self, route: str, status: int, size: int, client: str = None):
+        with self._lock:
+            key = f"{route}:{status}"
+            self.responses[key] = self.responses.get(key, 0) + 1
+            self.bytes_sent += size
+            if client:
+                self.clients[client] = self.clients.get(client, 0) + 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"responses": dict(self.responses), "clients": dict(self.clients), "bytes_sent": self.bytes_sent}
+
+
+def render_search_page(rows_count: int, total: int, page_size: int, first_row: int = 0) -> str:
+    """
+    Renders the search page with the first rows of the list and a working "See more" button.
+    Args:
+        rows_count (int): Number of rows rendered initially (IMDb `count` parameter).
+        total (int): Total movies of the query.
+        page_size (int): Rows appended per "See more" click.
+        first_row (int): Position of the first row of the query among all the rows.
+    Returns:
+        str: HTML content of the page.
+    """
+    rows_count = min(rows_count, total)
+    page = build_search_page(0)
+    list_start = page.index(">", page.index(_LIST_OPENING)) + 1
+    page = f"{page[:list_start]}{build_search_rows(first_row, rows_count)}{page[list_start:]}"
+    page = _TOTAL_PATTERN.sub(f"1-{rows_count} of {total:,}", page, count=1)
+    script = _SEE_MORE_SCRIPT % {"total": total, "page_size": page_size, "first_row": first_row}
+    return page.replace("</body>", f"{script}\n</body>", 1)
+
+
+class FakeImdbHandler(BaseHTTPRequestHandler):
+    """ Routes search, title, keywords and "See more" requests to the fixture corpus. """
+    server_version = "FakeIMDb/1.0"
+
+    def do_GET(self):
+        config = self.server.config
+        url = urlsplit(self.path)
+        path = re.sub(r"/{2,}", "/", url.path)
+        query = parse_qs(url.query)
+
+        if path == "/_fake/stats":
+            return self._send("stats", 200, json.dumps(self.server.stats.as_dict()), "application/json")
+
+        delay = config.latency_ms + config.random.uniform(0, config.latency_jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        if not self.server.allow_client(self._client()):
+            return self._send("throttled", 429, "Too Many Requests", headers={"Retry-After": "1"})
+        roll = config.random.random()
+        if roll < config.throttle_rate:
+            return self._send("throttled", 429, "Too Many Requests", headers={"Retry-After": "1"})
+        if roll < config.throttle_rate + config.error_rate:
+            return self._send("error", 500, "Internal Server Error")
+
+        if path.rstrip("/") == "/search/title":
+            rows_count = int(query.get("count", ["50"])[0])
+            first_row, total = config.release_date_rows(query.get("release_date", [""])[0])
+            body = render_search_page(rows_count, total, config.page_size, first_row)
+            return self._send("search", 200, body)
+        if path == "/_fake/rows":
+            start = int(query.get("start", ["0"])[0])
+            rows_count = max(0, min(int(query.get("count", ["50"])[0]), config.total_movies - start))
+            return self._send("rows", 200, build_search_rows(start, rows_count))
+        if _KEYWORDS_PATH.match(path):
+            return self._send("keywords", 200, load_fixture(KEYWORDS_PAGE))
+        if _TITLE_PATH.match(path):
+            return self._send("title", 200, load_fixture(TITLE_PAGE))
+        return self._send("not_found", 404, "Not Found")
+
+    def _client(self) -> str:
+        """ Identity of the client, the proxy stand-ins forward it as X-Forwarded-For. """
+        return self.headers.get("X-Forwarded-For") or self.client_address[0]
+
+    def _send(self, route: str, status: int, body: str, content_type: str = "text/html; charset=utf-8",
+              headers: dict = None):
+        content = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+        self.server.stats.record(route, status, len(content), self._client())
+
+    def log_message(self, format, *args):
+        """ Silenced, access logs would dominate the load test output. """
+
+
+class FakeImdbServer(ThreadingHTTPServer):
+    """ Threaded stand-in server, `base_url` is meant for the IMDB_BASE_URL environment variable. """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: FakeImdbConfig = None):
+        super().__init__((host, port), FakeImdbHandler)
+        self.config = config or FakeImdbConfig()
+        self.stats = FakeImdbStats()
+        self._client_buckets = {}
+        self._client_buckets_lock = threading.Lock()
+
+    def allow_client(self, client: str) -> bool:
+        """ Takes a request token of the client, False when the client exceeds `client_rate`. """
+        if not self.config.client_rate:
+            return True
+        # Imported here, scraper_core.constants must not be loaded before the runner sets IMDB_BASE_URL
+        from scraper_core.egress import TokenBucket
+
+        with self._client_buckets_lock:
+            if client not in self._client_buckets:
+                self._client_buckets[client] = TokenBucket(self.config.client_rate, self.config.client_rate)
+            return self._client_buckets[client].try_acquire()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start_in_background(self) -> threading.Thread:
+        """ Serves on a daemon thread, returns the thread. """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
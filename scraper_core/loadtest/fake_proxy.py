@@ -0,0 +1,77 @@
+""" Local forward proxy stand-in, relays plain HTTP requests under its own client identity. """
+import http.client
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Response headers relayed to the client, the body is always sent with its own Content-Length
+_RELAYED_HEADERS = ("Content-Type", "Retry-After")
+
+
+class FakeProxyHandler(BaseHTTPRequestHandler):
+    """ Relays GET requests with an absolute URL, as sent by HTTP clients configured with a proxy. """
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.scheme != "http":
+            return self._send(400, b"Only plain HTTP requests are relayed", {})
+        path = f"{url.path or '/'}?{url.query}" if url.query else url.path or "/"
+        headers = {name: value for name, value in self.headers.items()
+                   if name.lower() not in ("host", "connection", "proxy-connection", "proxy-authorization")}
+        # The stand-in server tells the clients apart by X-Forwarded-For, like IMDb by the source address
+        headers["X-Forwarded-For"] = self.server.identity
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+        except OSError as e:
+            return self._send(502, f"Bad Gateway. {e}".encode("utf-8"), {})
+        finally:
+            connection.close()
+        self.server.record_relayed()
+        self._send(response.status, body, {name: response.getheader(name) for name in _RELAYED_HEADERS
+                                           if response.getheader(name)})
+
+    def _send(self, status: int, body: bytes, headers: dict):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """ Silenced, access logs would dominate the load test output. """
+
+
+class FakeProxyServer(ThreadingHTTPServer):
+    """ Threaded proxy stand-in, `proxy_url` is meant for an egress of the egress pool. """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, identity: str = None):
+        """
+        Args:
+            host (str): Listening address.
+            port (int): Listening port, 0 picks a free port.
+            identity (str) (Optional): Client identity forwarded to the upstream, defaults to the proxy address.
+        """
+        super().__init__((host, port), FakeProxyHandler)
+        self.identity = identity or self.proxy_url
+        self.relayed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def proxy_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_relayed(self):
+        with self._lock:
+            self.relayed += 1
+
+    def start_in_background(self) -> threading.Thread:
+        """ Serves on a daemon thread, returns the thread. """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,104 @@
+""" Load drivers hitting the IMDb stand-in server, reporting throughput and latency. """
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scraper_core.base import BaseScraper
+from scraper_core.metrics import metrics
+
+
+def percentile(values: list, fraction: float) -> float:
+    """ Nearest rank percentile of the given values. """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def build_report(latencies: list, errors: dict, elapsed: float) -> dict:
+    """
+    Builds the load test report.
+    Args:
+        latencies (list): Latencies in seconds of the successful operations.
+        errors (dict): Error message to occurrence count.
+        elapsed (float): Wall clock time of the whole run.
+    Returns:
+        dict: Throughput, latency percentiles and errors.
+    """
+    completed = len(latencies)
+    return {
+        "completed": completed,
+        "failed": sum(errors.values()),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(completed / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.5) * 1000, 2),
+            "p90": round(percentile(latencies, 0.9) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        },
+        "errors": errors,
+        "stages": metrics.summary()["stages"],
+    }
+
+
+def run_load(operation, operations_count: int, concurrency: int) -> dict:
+    """
+    Runs the operation concurrently and measures it.
+    Args:
+        operation (callable): Called with the operation index.
+        operations_count (int): Number of operations.
+        concurrency (int): Number of operations in flight.
+    Returns:
+        dict: Load test report.
+    """
+    latencies = []
+    errors = {}
+
+    def timed(index):
+        start = time.perf_counter()
+        try:
+            operation(index)
+        except Exception as e:
+            # Group by HTTP status when the scraper failed on an HTTP error, messages differ per URL
+            response = getattr(e.__context__, "response", None)
+            error = f"HTTP {response.status_code}" if response is not None else type(e.__context__ or e).__name__
+            errors[error] = errors.get(error, 0) + 1
+        else:
+            latencies.append(time.perf_counter() - start)
+
+    metrics.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(operations_count)))
+    return build_report(latencies, errors, time.perf_counter() - start)
+
+
+def fetch_page_load(base_url: str, requests_count: int, concurrency: int) -> dict:
+    """
+    Load test of `BaseScraper.fetch_page` on title and keyword pages, the detail fan-out of a batch.
+    """
+    scraper = BaseScraper(base_url)
+
+    def operation(index):
+        title_id = f"tt{9000000 + index // 2:07d}"
+        scraper.fetch_page(f"/title/{title_id}/keywords/" if index % 2 else f"/title/{title_id}/?ref_=sr_t_1")
+
+    return run_load(operation, requests_count, concurrency)
+
+
+def batch_scrape_load(batches_count: int, concurrency: int, num_of_clicks: int, parse_movies_data_count: int,
+                      movie_page_size: int = 250) -> dict:
+    """
+    Load test of `MovieScraper.batch_scrape` (Chrome, "See more" clicks and detail fan-out).
+    IMDB_BASE_URL must point to the stand-in server before scraper_core.constants is imported.
+    """
+    from scraper_core.incremental_movie_scraper import IncrementalMovieScraper
+
+    def operation(index):
+        inc_scraper = IncrementalMovieScraper(movie_page_size * (num_of_clicks + 1), genre="Drama",
+                                              movie_page_size=movie_page_size)
+        inc_scraper.batch_scrape(num_of_clicks, parse_movies_data_count, movie_page_size)
+
+    return run_load(operation, batches_count, concurrency)
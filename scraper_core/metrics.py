@@ -0,0 +1,146 @@
+""" In-process metrics for the scraping hot path, stage timers and counters exposed in Prometheus text format. """
+import threading
+import time
+from contextlib import contextmanager
+
+
+class MetricsRegistry:
+    """
+    Thread safe registry aggregating counters and stage timers of the current process.
+    Job scopes opened on a thread receive a copy of every sample recorded on that thread,
+    which gives per-job summaries while the process wide totals keep growing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {}
+        self._timers = {}
+
+    def _scopes(self):
+        """ Job scopes opened on the current thread. """
+        if not hasattr(self._local, "scopes"):
+            self._local.scopes = []
+        return self._local.scopes
+
+    def _add_counter(self, key, value):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def _add_timer(self, key, seconds):
+        with self._lock:
+            count, total, maximum = self._timers.get(key, (0, 0.0, 0.0))
+            self._timers[key] = (count + 1, total + seconds, max(maximum, seconds))
+
+    def inc(self, name: str, value=1, **labels):
+        """
+        Increments a counter.
+        Args:
+            name (str): Metric name, e.g. scraper_http_requests_total.
+            value (int|float): Increment value.
+            labels: Metric labels, values are stored as strings so a label may mix types.
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        self._add_counter(key, value)
+        for scope in self._scopes():
+            scope._add_counter(key, value)
+
+    def observe(self, stage: str, seconds: float):
+        """
+        Records the duration of a scraping stage.
+        Args:
+            stage (str): Stage name, e.g. fetch_page.
+            seconds (float): Elapsed time in seconds.
+        """
+        self._add_timer(stage, seconds)
+        for scope in self._scopes():
+            scope._add_timer(stage, seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """ Context manager timing the enclosed block as the given stage. """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    @contextmanager
+    def job_scope(self):
+        """
+        Context manager collecting the samples recorded by the current thread into a separate registry.
+        Yields:
+            MetricsRegistry: Registry holding only the samples of the enclosed block.
+        """
+        scope = MetricsRegistry()
+        scopes = self._scopes()
+        scopes.append(scope)
+        try:
+            yield scope
+        finally:
+            scopes.remove(scope)
+
+    def summary(self) -> dict:
+        """
+        Summarizes the registry as a plain dictionary, suitable for storing with a task result.
+        Returns:
+            dict: Stage timings and counters.
+        """
+        with self._lock:
+            stages = {
+                stage: {"count": count, "seconds": round(total, 4), "max_seconds": round(maximum, 4)}
+                for stage, (count, total, maximum) in self._timers.items()
+            }
+            counters = {}
+            for (name, labels), value in self._counters.items():
+                label_text = ",".join(f"{k}={v}" for k, v in labels)
+                counters[f"{name}{{{label_text}}}" if label_text else name] = value
+        return {"stages": stages, "counters": counters}
+
+    def reset(self):
+        """ Clears all the samples. """
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def render_prometheus(self) -> str:
+        """
+        Renders the registry in the Prometheus text exposition format.
+        Returns:
+            str: Metrics text.
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = sorted(self._timers.items())
+        lines = []
+        last_name = None
+        for (name, labels), value in counters:
+            if name != last_name:
+                lines.append(f"# TYPE {name} counter")
+                last_name = name
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        if timers:
+            lines.append("# TYPE scraper_stage_seconds summary")
+            for stage, (count, total, _) in timers:
+                labels = _format_labels((("stage", stage),))
+                lines.append(f"scraper_stage_seconds_count{labels} {count}")
+                lines.append(f"scraper_stage_seconds_sum{labels} {total:.6f}")
+            lines.append("# TYPE scraper_stage_seconds_max gauge")
+            for stage, (_, _, maximum) in timers:
+                lines.append(f"scraper_stage_seconds_max{_format_labels((('stage', stage),))} {maximum:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels) -> str:
+    """ Formats label pairs as a Prometheus label set. """
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+# Process wide registry used by the scrapers, the adapter and the metrics endpoint
+metrics = MetricsRegistry()
@@ -0,0 +1,105 @@
+""" Parse health check of the scraped movies, detects IMDb markup changes from the first movies of a batch. """
+from .metrics import metrics
+
+# Parsed check of every movie record field, the parsers fall back to "N/A", 0 or empty lists on missing elements
+_PARSED_CHECKS = {
+    "title": lambda movie_record: movie_record.title != "N/A",
+    "imdb_id": lambda movie_record: bool(movie_record.imdb_id),
+    "year": lambda movie_record: bool(movie_record.year),
+    "rating": lambda movie_record: bool(movie_record.rating),
+    "plot_summary": lambda movie_record: movie_record.plot_summary != "N/A",
+    "directors": lambda movie_record: bool(movie_record.directors),
+    "casts": lambda movie_record: bool(movie_record.casts),
+    "genres": lambda movie_record: bool(movie_record.genres),
+    "keywords": lambda movie_record: bool(movie_record.keywords),
+}
+# Minimum fraction of the sampled movies with the field parsed. Unreleased and obscure movies legitimately
+# miss a rating, a year or keywords, these fields are reported but not checked.
+LIST_FIELD_COVERAGE = {"title": 0.8, "imdb_id": 0.8, "year": 0.3, "plot_summary": 0.3}
+DETAIL_FIELD_COVERAGE = {"genres": 0.5, "directors": 0.2, "casts": 0.2}
+LIST_FIELDS = ["title", "imdb_id", "year", "rating", "plot_summary"]
+DETAIL_FIELDS = ["directors", "casts", "genres", "keywords"]
+REPORT_SAMPLES = 5  # Failing movies included in the drift report
+
+
+class ParseHealthError(ValueError):
+    """ Raised when the parsed fields of the sampled movies fall below the expected coverage. """
+
+    def __init__(self, report: dict):
+        """
+        Args:
+            report (dict): Drift report of the failed check, see `ParseHealthSampler.check`.
+        """
+        self.report = report
+        super().__init__(f"Parse health check failed, {report['stage']} fields {report['failing_fields']} "
+                         f"below the expected coverage. Coverage: {report['coverage']}")
+
+
+class ParseHealthSampler:
+    """
+    Validates the first movies of a batch against the expected field coverage. The list level fields are checked
+    before any detail page is fetched, the detail fields once the first `sample_size` detail pages are parsed,
+    so that a layout change aborts the batch before the rest of its detail requests and its database writes.
+    """
+
+    def __init__(self, sample_size: int = 20, list_coverage: dict = None, detail_coverage: dict = None):
+        """
+        Args:
+            sample_size (int): Number of movies checked per batch.
+            list_coverage (dict) (Optional): Field to minimum coverage of the search page fields,
+                defaults to LIST_FIELD_COVERAGE.
+            detail_coverage (dict) (Optional): Field to minimum coverage of the movie page fields,
+                defaults to DETAIL_FIELD_COVERAGE.
+        """
+        self.sample_size = sample_size
+        self.list_coverage = LIST_FIELD_COVERAGE if list_coverage is None else list_coverage
+        self.detail_coverage = DETAIL_FIELD_COVERAGE if detail_coverage is None else detail_coverage
+
+    def check_list(self, movie_records: list):
+        """ Checks the list level fields of the first movies of the batch. """
+        return self.check("list", movie_records[:self.sample_size], LIST_FIELDS, self.list_coverage)
+
+    def check_details(self, movie_records: list):
+        """ Checks the detail fields of the first movies whose detail pages were fetched. """
+        # Keywords are only reported when the keywords pages were not deferred
+        keywords_fetched = all(movie_record.keywords_fetched for movie_record in movie_records)
+        fields = DETAIL_FIELDS if keywords_fetched else DETAIL_FIELDS[:-1]
+        return self.check("detail", movie_records[:self.sample_size], fields, self.detail_coverage)
+
+    @classmethod
+    def check(cls, stage: str, movie_records: list, fields: list, expected: dict):
+        """
+        Computes the coverage of the fields over the sampled movies.
+        Args:
+            stage (str): list or detail.
+            movie_records (list): Sampled movie records.
+            fields (list): Fields to report.
+            expected (dict): Field to minimum coverage, fields not in it are only reported.
+        Returns:
+            dict: Drift report with the stage, sample size, coverage and expected coverage per field,
+                failing fields and the failing sampled movies. None for an empty sample.
+        Raises:
+            ParseHealthError: A field is below its expected coverage.
+        """
+        if not movie_records:
+            return None
+        parsed = {field: [_PARSED_CHECKS[field](movie_record) for movie_record in movie_records] for field in fields}
+        coverage = {field: round(sum(values) / len(movie_records), 3) for field, values in parsed.items()}
+        failing_fields = [field for field in fields if field in expected and coverage[field] < expected[field]]
+        report = {
+            "stage": stage,
+            "sample_size": len(movie_records),
+            "coverage": coverage,
+            "expected": {field: expected[field] for field in fields if field in expected},
+            "failing_fields": failing_fields,
+            "samples": [
+                {"imdb_id": movie_record.imdb_id, "movie_info_url": movie_record.movie_info_url,
+                 "missing": [field for field in failing_fields if not parsed[field][position]]}
+                for position, movie_record in enumerate(movie_records)
+                if any(not parsed[field][position] for field in failing_fields)
+            ][:REPORT_SAMPLES],
+        }
+        if failing_fields:
+            metrics.inc("scraper_parse_health_failures_total", stage=stage)
+            raise ParseHealthError(report)
+        return report
@@ -0,0 +1,190 @@
+""" Opt-in profiling of the scraping hot path, cProfile statistics and collapsed stacks of sampled call stacks. """
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+
+PROFILE_MODES = ["cprofile", "sample"]
+
+
+class StackSampler:
+    """
+    Samples the call stack of a thread at a fixed interval from a background thread, in the collapsed stack
+    format of flame graph tools: one "outer;...;inner count" line per distinct stack.
+    """
+
+    def __init__(self, thread_id: int = None, interval: float = 0.005):
+        """
+        Args:
+            thread_id (int) (Optional): Sampled thread, defaults to the calling thread.
+            interval (float): Seconds between two samples.
+        """
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """ Collapsed stacks, the heaviest first. """
+        return "".join(f"{stack} {count}\n"
+                       for stack, count in sorted(self.stacks.items(), key=lambda item: item[1], reverse=True))
+
+
+def frame_label(code) -> str:
+    """ Label of a function in the collapsed stacks, e.g. find_all (element.py:2001). """
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StatsSource:
+    """ Loads marshalled cProfile statistics into pstats.Stats, which accepts objects with `create_stats`. """
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def create_stats(self):
+        self.stats = marshal.loads(self.data)
+
+
+def load_stats(data: bytes) -> pstats.Stats:
+    """
+    Loads statistics stored by `TaskProfiler.stats_data`, or read from a file written by cProfile.
+    Args:
+        data (bytes): Marshalled cProfile statistics.
+    Returns:
+        pstats.Stats: The statistics.
+    """
+    return pstats.Stats(_StatsSource(data))
+
+
+class TaskProfiler:
+    """
+    Profiles the calling thread within a with block. The cprofile mode records every call with cProfile and
+    samples the stacks, the sample mode only samples the stacks and costs next to nothing.
+    Work handed over to other threads or processes is not profiled.
+    """
+
+    def __init__(self, mode: str = "cprofile", interval: float = 0.005):
+        """
+        Args:
+            mode (str): cprofile or sample.
+            interval (float): Seconds between two stack samples.
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profile mode: {mode}. Use one of {PROFILE_MODES}")
+        self.mode = mode
+        self.sampler = StackSampler(interval=interval)
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.wall_seconds = 0.0
+        self._started_at = None
+
+    def __enter__(self):
+        self._started_at = time.perf_counter()
+        self.sampler.start()
+        if self.profile:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profile:
+            self.profile.disable()
+        self.sampler.stop()
+        self.wall_seconds = time.perf_counter() - self._started_at
+
+    @property
+    def stats_data(self) -> bytes:
+        """ Marshalled cProfile statistics, the format of `cProfile.Profile.dump_stats`. None in sample mode. """
+        if not self.profile:
+            return None
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+    def top_functions(self, limit: int = 20) -> list:
+        """
+        Functions with the most own time, from the cProfile statistics or the sampled stacks.
+        Returns:
+            list: Dictionaries with function, calls, tottime and cumtime in cprofile mode, function and the
+                fraction of the samples spent in the function itself in sample mode.
+        """
+        if self.profile:
+            return stats_rows(load_stats(self.stats_data), limit)
+        own_samples = {}
+        for stack, count in self.sampler.stacks.items():
+            function = stack.rsplit(";", 1)[-1]
+            own_samples[function] = own_samples.get(function, 0) + count
+        ranked = sorted(own_samples.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{"function": function, "samples": round(count / self.sampler.samples, 4)}
+                for function, count in ranked]
+
+
+def function_label(function: tuple) -> str:
+    """ Label of a pstats function key (filename, line, name), matching the collapsed stacks labels. """
+    filename, line, name = function
+    return f"{name} ({os.path.basename(filename)}:{line})" if line else name
+
+
+def stats_rows(stats: pstats.Stats, limit: int = 20, sort: str = "tottime") -> list:
+    """
+    Functions of the statistics with their call counts and times.
+    Args:
+        stats (pstats.Stats): cProfile statistics.
+        limit (int): Number of functions.
+        sort (str): tottime or cumtime.
+    Returns:
+        list: Dictionaries with function, calls, tottime and cumtime, the most expensive first.
+    """
+    rows = [{"function": function_label(function), "calls": calls, "tottime": round(tottime, 6),
+             "cumtime": round(cumtime, 6)}
+            for function, (_, calls, tottime, cumtime, _) in stats.stats.items()]
+    return sorted(rows, key=lambda row: row[sort], reverse=True)[:limit]
+
+
+def diff_stats(before: pstats.Stats, after: pstats.Stats, sort: str = "tottime", limit: int = 20) -> list:
+    """
+    Compares two profiles function by function.
+    Args:
+        before (pstats.Stats): Statistics of the reference profile.
+        after (pstats.Stats): Statistics of the compared profile.
+        sort (str): tottime or cumtime, compared time.
+        limit (int): Number of functions.
+    Returns:
+        list: Dictionaries with function, the calls and times of both profiles and the time delta, the largest
+            changes first. Functions missing in one profile count as zero there.
+    """
+    position = {"tottime": 2, "cumtime": 3}[sort]
+    rows = []
+    for function in set(before.stats).union(after.stats):
+        before_row = before.stats.get(function, (0, 0, 0.0, 0.0, {}))
+        after_row = after.stats.get(function, (0, 0, 0.0, 0.0, {}))
+        rows.append({
+            "function": function_label(function),
+            "before_calls": before_row[1], "after_calls": after_row[1],
+            "before": round(before_row[position], 6), "after": round(after_row[position], 6),
+            "delta": round(after_row[position] - before_row[position], 6),
+        })
+    return sorted(rows, key=lambda row: abs(row["delta"]), reverse=True)[:limit]
@@ -0,0 +1,105 @@
+""" Splits the search of a large genre or keyword into disjoint release year shards of a few pages each. """
+import datetime
+import math
+import re
+
+from .base import BaseScraper
+from .constants import BASE_URL, FIRST_RELEASE_YEAR
+from .incremental_movie_scraper import MovieScraper
+from .metrics import metrics
+
+_TOTAL_PATTERN = re.compile(r"^\s*[\d,]+-[\d,]+ of ([\d,]+)\s*$")
+
+
+class QueryShardPlanner(BaseScraper):
+    """
+    Plans release year shards of a genre or keyword search. A very large tag scraped through a single search
+    needs an ever deepening "See more" chain, shards are independent searches which fit in a few pages and
+    can be scraped in parallel.
+    """
+
+    def __init__(self, genre: str = None, keyword: str = None, max_shard_movies: int = 1000,
+                 first_year: int = FIRST_RELEASE_YEAR, last_year: int = None):
+        """
+        Initialize the planner for given genre or keyword.
+        Args:
+            genre (str) (Optional): Genre of the search.
+            keyword (str) (Optional): Keyword of the search.
+            max_shard_movies (int): Maximum movies per shard. Single years above it are kept as one shard.
+            first_year (int): First release year covered by the shards.
+            last_year (int) (Optional): Last release year covered, defaults to five years ahead so that
+                announced movies are covered too.
+        """
+        super().__init__(BASE_URL)
+
+        self.genre = genre
+        self.keyword = keyword
+        self.max_shard_movies = max_shard_movies
+        self.first_year = first_year
+        self.last_year = last_year or datetime.date.today().year + 5
+
+    def count_movies(self, release_years: tuple = None) -> int:
+        """
+        Fetches the total number of movies of the search, restricted to the release years.
+        Args:
+            release_years (tuple) (Optional): First and last release year.
+        Returns:
+            int: Number of movies, 0 when the search has no results.
+        """
+        with metrics.timer("count_shard_movies"):
+            soup = self.fetch_page(MovieScraper._search_endpoint(1, self.genre, self.keyword, release_years))
+        return self._parse_total(soup)
+
+    @classmethod
+    def _parse_total(cls, soup) -> int:
+        """ Parses the total of the "1-50 of 12,345" search page header. """
+        total = soup.find(string=_TOTAL_PATTERN)
+        return int(_TOTAL_PATTERN.match(total).group(1).replace(",", "")) if total else 0
+
+    def plan(self) -> list:
+        """
+        Splits the release years in halves until every shard holds at most `max_shard_movies` movies.
+        Returns:
+            list: A list of tuples (first_year, last_year, movies_count) in year order, empty ranges are dropped.
+        """
+        shards = []
+        pending = [(self.first_year, self.last_year)]
+        while pending:
+            first_year, last_year = pending.pop()
+            movies_count = self.count_movies((first_year, last_year))
+            if not movies_count:
+                continue
+            if movies_count <= self.max_shard_movies or first_year == last_year:
+                shards.append((first_year, last_year, movies_count))
+                continue
+            middle_year = (first_year + last_year) // 2
+            pending.extend([(middle_year + 1, last_year), (first_year, middle_year)])
+        print(f"Planned {len(shards)} shards, Movies: {sum(count for _, _, count in shards)}")
+        return sorted(shards)
+
+
+def shard_coverage(shards: list, movies_count: int) -> float:
+    """
+    Fraction of the movies of the tag covered by the shards. Movies without a release year are in no shard.
+    Args:
+        shards (list): Shards of `QueryShardPlanner.plan`.
+        movies_count (int): Movies of the tag.
+    Returns:
+        float: Covered fraction, 1.0 for an empty tag.
+    """
+    if movies_count <= 0:
+        return 1.0
+    return sum(count for _, _, count in shards) / movies_count
+
+
+def compute_shard_batches(movies_count: int, movie_page_size: int) -> list:
+    """
+    Splits a shard into one batch per page, every page is scraped by its own task.
+    Args:
+        movies_count (int): Movies of the shard.
+        movie_page_size (int): Number of movies per page.
+    Returns:
+        list: A list of tuples (num_of_clicks, parse_movies_data_count), as `compute_clicks_and_parse_count_required`.
+    """
+    return [(page, min(movie_page_size, movies_count - page * movie_page_size))
+            for page in range(math.ceil(movies_count / movie_page_size))]
@@ -0,0 +1,77 @@
+""" Compact record of a scraped movie, passed from the scrapers to the database writes. """
+
+
+class MovieRecord:
+    """
+    Scraped movie. Records are slotted, a batch of them takes a fraction of the memory of the equivalent dicts.
+    Records with `detail_fetched` False only hold the list level fields of the search page, e.g. known movies,
+    their list fields share an empty tuple until the detail pages are parsed.
+    """
+    __slots__ = ("title", "year", "rating", "plot_summary", "imdb_id", "movie_info_url",
+                 "directors", "casts", "genres", "keywords", "detail_fetched", "keywords_fetched")
+
+    def __init__(self, title: str = "N/A", year=0, rating=0, plot_summary: str = "N/A", imdb_id: str = None,
+                 movie_info_url: str = None, directors: list = None, casts: list = None, genres: list = None,
+                 keywords: list = None, detail_fetched: bool = False, keywords_fetched: bool = False):
+        """
+        Args:
+            title (str): Title of the movie.
+            year (str or int): Release year, 0 when unknown.
+            rating (str or float): IMDb rating, 0 when unknown.
+            plot_summary (str): Plot summary of the search page.
+            imdb_id (str) (Optional): IMDb title id, e.g. tt0111161.
+            movie_info_url (str) (Optional): URL of the movie page.
+            directors (list): Directors, from the movie page.
+            casts (list): Stars, from the movie page.
+            genres (list): Genres, from the movie page.
+            keywords (list): Keywords, from the keywords page.
+            detail_fetched (bool): True once the movie page was scraped.
+            keywords_fetched (bool): True once the keywords page was scraped.
+        """
+        self.title = title
+        self.year = year
+        self.rating = rating
+        self.plot_summary = plot_summary
+        self.imdb_id = imdb_id
+        self.movie_info_url = movie_info_url
+        self.directors = directors or ()
+        self.casts = casts or ()
+        self.genres = genres or ()
+        self.keywords = keywords or ()
+        self.detail_fetched = detail_fetched
+        self.keywords_fetched = keywords_fetched
+
+    def set_details(self, directors: list, casts: list, genres: list):
+        """ Sets the fields of the movie page. """
+        self.directors = directors
+        self.casts = casts
+        self.genres = genres
+        self.detail_fetched = True
+
+    def set_keywords(self, keywords: list):
+        """ Sets the keywords of the keywords page. """
+        self.keywords = keywords
+        self.keywords_fetched = True
+
+    def as_dict(self) -> dict:
+        """ JSON serializable form of the record, for task arguments and the pending writes buffer. """
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """ Builds a record from `as_dict` output. """
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+    def __eq__(self, other):
+        if not isinstance(other, MovieRecord):
+            return NotImplemented
+        return all(_comparable(getattr(self, field)) == _comparable(getattr(other, field))
+                   for field in self.__slots__)
+
+    def __repr__(self):
+        return f"MovieRecord(imdb_id={self.imdb_id!r}, title={self.title!r}, detail_fetched={self.detail_fetched})"
+
+
+def _comparable(value):
+    """ List fields compare equal as lists or tuples, records restored from JSON hold lists. """
+    return tuple(value) if isinstance(value, list) else value
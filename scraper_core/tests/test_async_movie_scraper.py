@@ -0,0 +1,110 @@
+import asyncio
+import json
+from unittest import TestCase
+from urllib.request import urlopen
+
+from scraper_core.async_movie_scraper import (
+    AsyncBaseScraper, AsyncIncrementalMovieScraper, async_batch_scrape, async_scrape_keywords)
+from scraper_core import async_movie_scraper, incremental_movie_scraper
+from scraper_core.base import SeleniumBase
+from scraper_core.benchmarks.offline import extract_movies_rows
+from scraper_core.incremental_movie_scraper import MovieScraper, _EXTRACT_MOVIES_SCRIPT
+from scraper_core.loadtest.fake_imdb import FakeImdbConfig, FakeImdbServer
+from scraper_core.records import MovieRecord
+
+
+class _SearchPageDriver:
+    """ Chrome stand-in, loads the search page over HTTP and runs the extraction script with BeautifulSoup. """
+
+    def __init__(self):
+        self.page_source = None
+        self.quit_count = 0
+
+    def get(self, url: str):
+        self.page_source = urlopen(url).read().decode()
+
+    def execute_script(self, script: str, *args):
+        if script != _EXTRACT_MOVIES_SCRIPT:
+            raise ValueError("Search page driver only runs the movies extraction script")
+        return extract_movies_rows(self.page_source, *args)
+
+    def quit(self):
+        self.quit_count += 1
+
+
+class TestAsyncBaseScraper(TestCase):
+
+    def setUp(self):
+        self.server = FakeImdbServer(config=FakeImdbConfig(latency_ms=20))
+        self.server.start_in_background()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_fetch_pages_concurrently(self):
+        async def fetch_all():
+            async with AsyncBaseScraper(self.server.base_url, max_in_flight=50) as scraper:
+                return await asyncio.gather(*(scraper.fetch_page(f"title/tt{9000000 + i}/") for i in range(50)))
+
+        soups = asyncio.run(fetch_all())
+        self.assertEqual(len(soups), 50)
+        self.assertTrue(all(soup.find("span", string="Director") for soup in soups))
+
+    def test_http_errors_are_raised_as_value_error(self):
+        async def fetch_missing():
+            async with AsyncBaseScraper(self.server.base_url) as scraper:
+                await scraper.fetch_page("missing/")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(fetch_missing())
+
+    def test_scrape_keywords_skips_failed_pages(self):
+        async_movie_scraper.BASE_URL, base_url = self.server.base_url, async_movie_scraper.BASE_URL
+        self.addCleanup(setattr, async_movie_scraper, "BASE_URL", base_url)
+        keywords = asyncio.run(async_scrape_keywords(["tt0111161", "bad"]))
+        self.assertEqual(list(keywords), ["tt0111161"])
+        self.assertEqual(len(keywords["tt0111161"]), 20)
+
+
+class TestAsyncIncrementalMovieScraper(TestCase):
+
+    def setUp(self):
+        self.server = FakeImdbServer(config=FakeImdbConfig(total_movies=100, page_size=50, latency_ms=5,
+                                                           latency_jitter_ms=20))
+        self.server.start_in_background()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        for module in (async_movie_scraper, incremental_movie_scraper):
+            self.addCleanup(setattr, module, "BASE_URL", module.BASE_URL)
+            module.BASE_URL = self.server.base_url
+
+    def test_batch_keeps_the_search_page_order_and_skips_known_movies(self):
+        driver = SeleniumBase._spare_driver = _SearchPageDriver()
+        self.addCleanup(setattr, SeleniumBase, "_spare_driver", None)
+        known_imdb_ids = set()
+
+        def known_movies_lookup(movie_records):
+            known_imdb_ids.update(movie_record.imdb_id for movie_record in movie_records[:5])
+            return known_imdb_ids
+
+        movie_records = asyncio.run(async_batch_scrape(100, "Drama", None, 50, 0, 30, 20, known_movies_lookup))
+        # Details arrive out of order with the latency jitter, the records keep the order of the last 30 rows
+        rows = json.loads(extract_movies_rows(driver.page_source, 30))
+        self.assertEqual([movie_record.imdb_id for movie_record in movie_records],
+                         [MovieScraper._movie_record(*row).imdb_id for row in rows])
+        self.assertEqual([movie_record.detail_fetched for movie_record in movie_records], [False] * 5 + [True] * 25)
+        self.assertTrue(all(movie_record.directors and movie_record.keywords for movie_record in movie_records[5:]))
+        responses = self.server.stats.as_dict()["responses"]
+        self.assertEqual((responses["title:200"], responses["keywords:200"]), (25, 25))
+        self.assertEqual(driver.quit_count, 1)
+
+    def test_detail_failures_are_raised_as_value_error(self):
+        movie_records = [MovieRecord(title=f" Movie {position}", imdb_id=f"tt{position}",
+                                     movie_info_url=f"/missing/tt{position}/") for position in range(3)]
+
+        async def parse_details():
+            async with AsyncIncrementalMovieScraper(3, "Drama", fetch_keywords=False) as scraper:
+                return await scraper._parse_movies_details(movie_records)
+
+        with self.assertRaises(ValueError) as raised:
+            asyncio.run(parse_details())
+        self.assertIn("Movie data parsing Issue", str(raised.exception))
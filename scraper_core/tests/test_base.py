@@ -0,0 +1,53 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+from scraper_core.base import SeleniumBase
+from scraper_core.benchmarks.runner import Benchmark
+from scraper_core.benchmarks.suite import PROJECT_DIR, cold_peak_memory_kb, run_cold
+
+
+class _Driver:
+
+    def __init__(self):
+        self.quit_count = 0
+
+    def quit(self):
+        self.quit_count += 1
+
+
+class TestLazyBackends(TestCase):
+
+    def test_importing_the_scrapers_does_not_load_the_backends(self):
+        script = ("import sys, scraper_core.incremental_movie_scraper, scraper_core.genre_keywords_scraper, "
+                  "scraper_core.async_movie_scraper; "
+                  "print(sorted(m for m in ('selenium', 'bs4', 'aiohttp') if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_DIR, check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def test_cold_start_memory_is_measured_in_the_child(self):
+        script = "payload = bytearray(8 * 1024 * 1024)"
+        benchmark = Benchmark("cold", lambda _: run_cold(script), memory=lambda _: cold_peak_memory_kb(script))
+        self.assertGreater(benchmark.run(repeat=1)["peak_memory_kb"], 8 * 1024)
+
+    def test_browser_is_started_on_first_use_from_the_spare(self):
+        selenium = SeleniumBase("http://localhost/")
+        selenium.close()  # Never started, nothing to quit
+        spare = _Driver()
+        SeleniumBase._spare_driver = spare
+        try:
+            self.assertIs(selenium.driver, spare)
+            self.assertIsNone(SeleniumBase._spare_driver)
+            selenium.close()
+            self.assertEqual(spare.quit_count, 1)
+        finally:
+            SeleniumBase._spare_driver = None
+
+    def test_unused_spare_browser_is_quit(self):
+        spare = _Driver()
+        SeleniumBase._spare_driver = spare
+        SeleniumBase.quit_spare()
+        SeleniumBase.quit_spare()
+        self.assertEqual(spare.quit_count, 1)
+        self.assertIsNone(SeleniumBase._spare_driver)
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from scraper_core.base import BaseScraper
+from scraper_core.egress import Egress, EgressPool, set_egress_pool
+from scraper_core.loadtest.fake_imdb import FakeImdbConfig, FakeImdbServer
+from scraper_core.loadtest.fake_proxy import FakeProxyServer
+
+
+class _Clock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEgressPool(TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.pool = EgressPool([Egress(name, rate=2, burst=2, clock=self.clock) for name in ("a", "b")],
+                               eject_seconds=30, clock=self.clock)
+        self.a, self.b = self.pool.egresses
+
+    def test_rate_budgets_are_per_egress(self):
+        acquired = [self.pool.try_acquire()[0] for _ in range(4)]
+        self.assertEqual(sorted(egress.name for egress in acquired), ["a", "a", "b", "b"])
+        egress, wait = self.pool.try_acquire()
+        self.assertIsNone(egress)
+        self.assertAlmostEqual(wait, 0.5)
+        self.clock.now += 0.5
+        self.assertIsNotNone(self.pool.try_acquire()[0])
+
+    def test_throttled_egress_is_ejected_until_it_recovers(self):
+        egress, _ = self.pool.try_acquire(self.a)
+        self.pool.release(egress, 429, retry_after=60)
+        self.assertTrue(self.a.is_ejected(self.clock.now))
+        self.assertIs(self.pool.pick(), self.b)
+        with self.assertRaises(ValueError):
+            self.pool.try_acquire(self.a)
+        # The last egress is kept even when throttled
+        egress, _ = self.pool.try_acquire()
+        self.pool.release(egress, 429)
+        self.assertFalse(self.b.is_ejected(self.clock.now))
+        self.clock.now += 60
+        self.assertFalse(self.a.is_ejected(self.clock.now))
+        # Back on probation, the next failure ejects it again for twice as long
+        egress, _ = self.pool.try_acquire(self.a)
+        self.pool.release(egress, 500)
+        self.assertEqual(self.a.ejected_until - self.clock.now, 60)
+        self.assertEqual(self.a.ejections, 2)
+
+    def test_budgets_are_split_between_the_processes(self):
+        pool = EgressPool.from_config(["http://10.0.0.1:3128"], rate=8, burst=4, max_in_flight=3, processes=4)
+        self.assertEqual([(egress.bucket.rate, egress.bucket.burst, egress.max_in_flight) for egress in pool.egresses],
+                         [(2, 1, 1), (2, 1, 1)])
+
+
+class TestEgressThroughProxies(TestCase):
+
+    def _start(self, server):
+        server.start_in_background()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_requests_are_spread_over_the_proxies_within_the_client_rate(self):
+        server = self._start(FakeImdbServer(config=FakeImdbConfig(client_rate=50)))
+        proxies = [self._start(FakeProxyServer(identity=f"proxy{position}")) for position in (1, 2)]
+        set_egress_pool(EgressPool.from_config([proxy.proxy_url for proxy in proxies], direct=False, rate=50))
+        self.addCleanup(set_egress_pool, None)
+        scraper = BaseScraper(server.base_url)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda index: scraper.fetch_page(f"/title/tt{index:07d}/"), range(40)))
+        stats = server.stats.as_dict()
+        self.assertEqual(stats["responses"], {"title:200": 40})
+        self.assertEqual(sorted(stats["clients"]), ["proxy1", "proxy2"])
+        self.assertEqual(sum(proxy.relayed for proxy in proxies), 40)
@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from unittest import TestCase, skipUnless
+
+from scraper_core.base import BaseScraper, SeleniumBase
+from scraper_core.benchmarks.offline import OfflineMovieScraper
+from scraper_core.benchmarks.suite import PROJECT_DIR
+from scraper_core.incremental_movie_scraper import MovieScraper, _EXTRACT_MOVIES_SCRIPT
+from scraper_core.loadtest.fake_imdb import FakeImdbConfig, FakeImdbServer
+
+
+class TestFakeImdbServer(TestCase):
+
+    def _server(self, **config):
+        server = FakeImdbServer(config=FakeImdbConfig(total_movies=120, page_size=50, **config))
+        server.start_in_background()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server, BaseScraper(server.base_url)
+
+    def test_search_page_renders_requested_rows_and_see_more(self):
+        server, scraper = self._server()
+        soup = scraper.fetch_page("search/title/?title_type=feature&count=50&genres=Drama")
+        self.assertEqual(len(soup.find_all("li", class_="ipc-metadata-list-summary-item")), 50)
+        self.assertIsNotNone(soup.select_one("span.single-page-see-more-button button"))
+        self.assertIn("1-50 of 120", soup.text)
+
+    def test_release_date_filter_returns_a_slice_of_the_rows(self):
+        server, scraper = self._server(first_year=2001, last_year=2010)
+        soup = scraper.fetch_page("search/title/?title_type=feature&count=50&genres=Drama"
+                                  "&release_date=2003-01-01,2004-12-31")
+        titles = [title.text for title in soup.find_all("h3", class_="ipc-title__text")]
+        self.assertEqual(len(titles), 24)
+        self.assertTrue(titles[0].startswith("25. "))
+        self.assertIn("1-24 of 24", soup.text)
+
+    def test_see_more_rows_stop_at_total(self):
+        server, scraper = self._server()
+        soup = scraper.fetch_page("_fake/rows?start=100&count=50")
+        self.assertEqual(len(soup.find_all("li", class_="ipc-metadata-list-summary-item")), 20)
+
+    def test_title_and_keyword_pages(self):
+        server, scraper = self._server()
+        self.assertIsNotNone(scraper.fetch_page("/title/tt0111161/?ref_=sr_t_1").find("span", string="Director"))
+        keywords = scraper.fetch_page("/title/tt0111161/keywords/").find_all("li", {"data-testid": "list-summary-item"})
+        self.assertEqual(len(keywords), 20)
+
+    def test_throttling_is_injected(self):
+        server, scraper = self._server(throttle_rate=1)
+        with self.assertRaises(ValueError):
+            scraper.fetch_page("/title/tt0111161/")
+        self.assertEqual(server.stats.as_dict()["responses"], {"throttled:429": 1})
+
+    def test_load_test_scrapers_target_the_stand_in_server(self):
+        # Fresh interpreter, the runner must set IMDB_BASE_URL before scraper_core.constants is imported
+        script = ("import argparse; from scraper_core.loadtest.__main__ import _add_server_arguments, _start_server; "
+                  "parser = argparse.ArgumentParser(); _add_server_arguments(parser); "
+                  "server = _start_server(parser.parse_args([])); "
+                  "from scraper_core.incremental_movie_scraper import IncrementalMovieScraper; "
+                  "scraper = IncrementalMovieScraper(100, genre='Drama'); "
+                  "print(server.base_url, scraper.base_url, scraper._selenium.base_url); server.server_close()")
+        env = {key: value for key, value in os.environ.items() if key != "IMDB_BASE_URL"}
+        output = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_DIR, check=True, env=env,
+                                capture_output=True, text=True).stdout
+        server_url, scraper_url, selenium_url = output.split()
+        self.assertTrue(server_url.startswith("http://127.0.0.1:"))
+        self.assertEqual(scraper_url, server_url)
+        self.assertEqual(selenium_url, server_url)
+
+
+def _chrome_available() -> bool:
+    try:
+        import selenium  # noqa: F401
+    except ImportError:
+        return False
+    return any(shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"))
+
+
+@skipUnless(_chrome_available(), "Chrome is not installed")
+class TestInBrowserExtraction(TestCase):
+
+    def test_extraction_script_matches_the_page_source_parser(self):
+        server = FakeImdbServer(config=FakeImdbConfig(total_movies=120, page_size=50))
+        server.start_in_background()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        selenium = SeleniumBase(server.base_url)
+        self.addCleanup(selenium.close)
+        selenium.load_page("search/title/?title_type=feature&count=50&genres=Drama")
+        rows = json.loads(selenium.execute_script(_EXTRACT_MOVIES_SCRIPT, 20))
+        page_source = selenium.get_page_source()
+        self.assertEqual(len(rows), 20)
+        self.assertEqual([MovieScraper._movie_record(*row).as_dict() for row in rows],
+                         [movie_record.as_dict() for movie_record in
+                          OfflineMovieScraper(page_source)._parse_movies_list(page_source, 20)])
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from scraper_core.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counters_and_timers_are_aggregated(self):
+        self.registry.inc("scraper_http_requests_total", status=200)
+        self.registry.inc("scraper_http_requests_total", status=200)
+        self.registry.inc("scraper_http_response_bytes_total", 512)
+        self.registry.observe("fetch_page", 0.5)
+        self.registry.observe("fetch_page", 1.5)
+        summary = self.registry.summary()
+        self.assertEqual(summary["counters"]["scraper_http_requests_total{status=200}"], 2)
+        self.assertEqual(summary["counters"]["scraper_http_response_bytes_total"], 512)
+        self.assertEqual(summary["stages"]["fetch_page"], {"count": 2, "seconds": 2.0, "max_seconds": 1.5})
+
+    def test_job_scope_only_collects_samples_of_the_block(self):
+        self.registry.inc("scraper_movies_parsed_total")
+        with self.registry.job_scope() as job:
+            self.registry.inc("scraper_movies_parsed_total", 3)
+            with self.registry.timer("parse_movies"):
+                pass
+        self.registry.inc("scraper_movies_parsed_total")
+        self.assertEqual(job.summary()["counters"], {"scraper_movies_parsed_total": 3})
+        self.assertEqual(job.summary()["stages"]["parse_movies"]["count"], 1)
+        self.assertEqual(self.registry.summary()["counters"]["scraper_movies_parsed_total"], 5)
+
+    def test_render_prometheus(self):
+        self.registry.inc("scraper_cache_hits_total", cache='tag"listing')
+        self.registry.observe("get_soup", 0.25)
+        text = self.registry.render_prometheus()
+        self.assertIn("# TYPE scraper_cache_hits_total counter\n", text)
+        self.assertIn('scraper_cache_hits_total{cache="tag\\"listing"} 1\n', text)
+        self.assertIn('scraper_stage_seconds_count{stage="get_soup"} 1\n', text)
+        self.assertIn('scraper_stage_seconds_sum{stage="get_soup"} 0.250000\n', text)
+        self.assertIn('scraper_stage_seconds_max{stage="get_soup"} 0.250000\n', text)
+
+    def test_render_prometheus_with_mixed_label_types(self):
+        self.registry.inc("scraper_http_requests_total", status=200)
+        self.registry.inc("scraper_http_requests_total", status="error")
+        self.registry.inc("scraper_http_requests_total", status=200)
+        text = self.registry.render_prometheus()
+        self.assertIn('scraper_http_requests_total{status="200"} 2\n', text)
+        self.assertIn('scraper_http_requests_total{status="error"} 1\n', text)
+        self.assertEqual(text.count("# TYPE scraper_http_requests_total counter"), 1)
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from scraper_core.benchmarks.corpus import build_search_page
+from scraper_core.benchmarks.offline import OfflineMovieScraper
+from scraper_core.parse_health import ParseHealthError, ParseHealthSampler
+from scraper_core.records import MovieRecord
+
+
+class CountingOfflineMovieScraper(OfflineMovieScraper):
+    """ Offline movie scraper counting the fetched detail pages. """
+    fetched_pages = 0
+
+    def fetch_page(self, endpoint: str = ""):
+        self.fetched_pages += 1
+        return super().fetch_page(endpoint)
+
+
+class TestParseHealthSampler(TestCase):
+
+    def test_healthy_batch_is_fully_scraped(self):
+        page = build_search_page(30)
+        scraper = CountingOfflineMovieScraper(page, parse_health=ParseHealthSampler(5))
+        movies = scraper._parse_movies(page, 30)
+        self.assertEqual(len(movies), 30)
+        self.assertEqual(scraper.fetched_pages, 60)
+
+    def test_list_drift_aborts_before_detail_fetches(self):
+        # Renamed hashed year class, the parser falls back to 0 for every movie
+        page = build_search_page(30).replace("sc-300a8231-7", "sc-9f2d5b1c-3")
+        scraper = CountingOfflineMovieScraper(page, parse_health=ParseHealthSampler(5))
+        with self.assertRaises(ParseHealthError) as raised:
+            scraper._parse_movies(page, 30)
+        report = raised.exception.report
+        self.assertEqual(report["stage"], "list")
+        self.assertEqual(report["failing_fields"], ["year"])
+        self.assertEqual(report["coverage"]["year"], 0)
+        self.assertEqual(report["coverage"]["title"], 1)
+        self.assertEqual(len(report["samples"]), 5)
+        self.assertEqual(scraper.fetched_pages, 0)
+
+    def test_detail_drift_is_reported(self):
+        movie_records = [MovieRecord(title=f" Movie {position}", imdb_id=f"tt{position}", detail_fetched=True,
+                                     directors=["Director"], casts=["Cast"]) for position in range(10)]
+        with self.assertRaises(ParseHealthError) as raised:
+            ParseHealthSampler(5).check_details(movie_records)
+        report = raised.exception.report
+        self.assertEqual((report["stage"], report["sample_size"]), ("detail", 5))
+        self.assertEqual(report["failing_fields"], ["genres"])
+        self.assertNotIn("keywords", report["coverage"])  # Deferred keywords are not reported
+        self.assertIsInstance(raised.exception, ValueError)
@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from scraper_core.benchmarks.corpus import build_search_page, load_fixture, SEARCH_PAGE
+from scraper_core.benchmarks.offline import OfflineMovieScraper, OfflineGenreKeywordScraper
+
+
+class TestParsersOnRecordedCorpus(TestCase):
+
+    def test_parse_movies_tail(self):
+        page = load_fixture(SEARCH_PAGE)
+        movies = OfflineMovieScraper(page)._parse_movies(page, 2)
+        self.assertEqual([movie.title for movie in movies],
+                         [" The Lord of the Rings: The Fellowship of the Ring", " Forrest Gump"])
+        self.assertEqual(movies[1].year, "1994")
+        self.assertEqual(movies[1].rating, "8.8")
+        self.assertEqual(movies[1].directors, ["Frank Darabont"])
+        self.assertEqual(movies[1].casts, ["Tim Robbins", "Morgan Freeman", "Bob Gunton"])
+        self.assertIn("Drama", movies[1].genres)
+        self.assertEqual(len(movies[1].keywords), 20)
+
+    def test_synthetic_search_page_has_unique_rows(self):
+        page = build_search_page(30)
+        movies = OfflineMovieScraper(page)._parse_movies(page, 30)
+        self.assertEqual(len(movies), 30)
+        self.assertEqual(len({movie.title for movie in movies}), 30)
+
+    def test_in_browser_extraction_matches_page_source_parsing(self):
+        page = build_search_page(30)
+        extracted = OfflineMovieScraper(page, in_browser_extraction=True)._load_movies_list(0, 30, 5)
+        parsed = OfflineMovieScraper(page)._load_movies_list(0, 30, 5)
+        self.assertEqual(extracted, parsed)
+        self.assertEqual(len(extracted), 5)
+
+    def test_extract_genres_and_keywords(self):
+        scraped = OfflineGenreKeywordScraper().scrape()
+        genres = {genre["name"]: genre["count"] for genre in scraped["genres"]}
+        self.assertEqual(genres["Drama"], 381000)
+        self.assertNotIn("Game-Show", genres)  # Zero movies
+        self.assertIn({"name": "superhero", "count": 2900}, scraped["keywords"])
+
+    def test_only_changed_tags_are_emitted(self):
+        scraped = OfflineGenreKeywordScraper(expand_keywords=False).scrape()
+        known_counts = {tag["name"]: tag["count"] for tag in scraped["genres"] + scraped["keywords"]}
+        known_counts["Drama"] = 380000
+        del known_counts["superhero"]
+        changed = OfflineGenreKeywordScraper().scrape(known_counts)
+        self.assertEqual(changed, {"genres": [{"name": "Drama", "count": 381000}],
+                                   "keywords": [{"name": "superhero", "count": 2900}]})
@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from scraper_core.benchmarks.corpus import build_search_page
+from scraper_core.benchmarks.offline import OfflineMovieScraper
+from scraper_core.profiling import TaskProfiler, diff_stats, load_stats
+
+
+class TestTaskProfiler(TestCase):
+
+    def _profile(self, movies_count: int, mode: str = "cprofile") -> TaskProfiler:
+        page = build_search_page(movies_count)
+        with TaskProfiler(mode, interval=0.001) as profiler:
+            OfflineMovieScraper(page)._parse_movies(page, movies_count)
+        return profiler
+
+    def test_profile_captures_the_parsers(self):
+        profiler = self._profile(20)
+        stats = load_stats(profiler.stats_data)
+        self.assertTrue(any(name == "_parse_movies" for _, _, name in stats.stats))
+        self.assertEqual(len(profiler.top_functions(5)), 5)
+        self.assertGreater(profiler.sampler.samples, 0)
+        self.assertIn("_parse_movies", profiler.sampler.collapsed())
+
+    def test_sample_mode_has_no_statistics(self):
+        profiler = self._profile(20, "sample")
+        self.assertIsNone(profiler.stats_data)
+        self.assertAlmostEqual(sum(row["samples"] for row in profiler.top_functions(1000)), 1, places=2)
+        with self.assertRaises(ValueError):
+            TaskProfiler("perf")
+
+    def test_diff_ranks_the_largest_changes_first(self):
+        before, after = load_stats(self._profile(5).stats_data), load_stats(self._profile(40).stats_data)
+        rows = diff_stats(before, after, "cumtime", limit=10)
+        self.assertEqual(len(rows), 10)
+        self.assertEqual([abs(row["delta"]) for row in rows], sorted((abs(row["delta"]) for row in rows), reverse=True))
+        parse_movies = next(row for row in diff_stats(before, after, limit=1000) if "_parse_movies " in row["function"])
+        self.assertEqual((parse_movies["before_calls"], parse_movies["after_calls"]), (1, 1))
@@ -0,0 +1,33 @@
+from unittest import TestCase
+
+from scraper_core.loadtest.fake_imdb import FakeImdbConfig, FakeImdbServer
+from scraper_core.query_shard_planner import QueryShardPlanner, compute_shard_batches, shard_coverage
+
+
+class TestQueryShardPlanner(TestCase):
+
+    def setUp(self):
+        self.server = FakeImdbServer(config=FakeImdbConfig(total_movies=5000, first_year=1900, last_year=2024))
+        self.server.start_in_background()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def _planner(self, max_shard_movies):
+        planner = QueryShardPlanner("Drama", max_shard_movies=max_shard_movies, first_year=1874, last_year=2030)
+        planner.base_url = self.server.base_url
+        return planner
+
+    def test_shards_are_disjoint_and_cover_the_query(self):
+        shards = self._planner(500).plan()
+        self.assertTrue(all(count <= 500 for _, _, count in shards))
+        self.assertTrue(all(previous[1] < shard[0] for previous, shard in zip(shards, shards[1:])))
+        self.assertEqual(shard_coverage(shards, self._planner(500).count_movies()), 1.0)
+
+    def test_single_year_shard_is_kept_above_the_limit(self):
+        shards = self._planner(10).plan()
+        self.assertEqual(len(shards), 125)  # One shard per year, 40 movies each
+        self.assertEqual(shards[0], (1900, 1900, 40))
+
+    def test_compute_shard_batches(self):
+        self.assertEqual(compute_shard_batches(600, 250), [(0, 250), (1, 250), (2, 100)])
+        self.assertEqual(compute_shard_batches(0, 250), [])